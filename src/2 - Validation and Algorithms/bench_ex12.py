@@ -0,0 +1,39 @@
+"""
+Benchmarks dos algoritmos de ordenação (ex12).
+
+Uso:
+    python ../bench.py -k ex12
+"""
+
+import random
+
+from ex12 import bubble_sort, merge_sort
+
+# O bubble sort é quadrático: tamanhos menores para não travar a execução
+SIZES = {
+    "bench_bubble_sort": [100, 1_000],
+    "bench_merge_sort": [1_000, 10_000, 100_000],
+}
+
+
+def _lista_aleatoria(n):
+    gerador = random.Random(n)  # Semente fixa: mesma entrada a cada execução
+    return [gerador.randint(0, n) for _ in range(n)]
+
+
+def bench_bubble_sort(n):
+    lista = _lista_aleatoria(n)
+
+    def run():
+        bubble_sort(lista.copy())
+
+    return run
+
+
+def bench_merge_sort(n):
+    lista = _lista_aleatoria(n)
+
+    def run():
+        merge_sort(lista)
+
+    return run
@@ -0,0 +1,61 @@
+"""
+Benchmarks do motor e do solucionador do Jogo da Forca (ex13).
+
+Uso:
+    python ../bench.py -k ex13
+"""
+
+import random
+
+from ex13 import IndiceDePalavras, jogar_automatico, mostrar_palavra
+
+SIZES = {
+    "bench_indice": [1_000, 10_000],
+    "bench_jogar_automatico": [100, 1_000],
+    "bench_mostrar_palavra": [1_000, 10_000],
+}
+
+
+def _dicionario(n):
+    gerador = random.Random(n)  # Semente fixa: mesmo dicionário a cada execução
+    palavras = (
+        "".join(
+            gerador.choice("etaoinshrdlucmfwyp") for _ in range(gerador.randint(4, 12))
+        )
+        for _ in range(n)
+    )
+    return list(dict.fromkeys(palavras))
+
+
+def bench_indice(n):
+    """Construção do índice para um dicionário de n palavras."""
+    palavras = _dicionario(n)
+
+    def run():
+        IndiceDePalavras(palavras)
+
+    return run
+
+
+def bench_jogar_automatico(n):
+    """n partidas do solucionador sobre um dicionário de 10 mil palavras."""
+    palavras = _dicionario(10_000)
+    indice = IndiceDePalavras(palavras)
+    sorteadas = random.Random(n).sample(palavras, n)
+
+    def run():
+        for palavra in sorteadas:
+            jogar_automatico(palavra, indice)
+
+    return run
+
+
+def bench_mostrar_palavra(n):
+    palavras = _dicionario(n)
+    letras = set("aeiou")
+
+    def run():
+        for palavra in palavras:
+            mostrar_palavra(palavra, letras)
+
+    return run
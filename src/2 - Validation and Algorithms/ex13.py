@@ -1,49 +1,316 @@
+import argparse
 import random
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
+PALAVRAS_PADRAO = [
+    "python",
+    "programacao",
+    "computador",
+    "algoritmo",
+    "desenvolvimento",
+    "openai",
+]
 
-def escolher_palavra():
-    palavras = [
-        "python",
-        "programacao",
-        "computador",
-        "algoritmo",
-        "desenvolvimento",
-        "openai",
-    ]
-    return random.choice(palavras)
+
+def escolher_palavra(palavras=None):
+    return random.choice(palavras or PALAVRAS_PADRAO)
 
 
 def mostrar_palavra(palavra, letras_corretas):
-    resultado = ""
-    for letra in palavra:
-        if letra in letras_corretas:
-            resultado += letra + " "
+    return " ".join(letra if letra in letras_corretas else "_" for letra in palavra)
+
+
+def carregar_palavras(caminho):
+    """
+    Carrega um dicionário de palavras (uma por linha).
+
+    Palavras com caracteres que não são letras são ignoradas e as
+    repetidas são removidas mantendo a ordem do arquivo.
+
+    Args:
+        caminho (str): Caminho do arquivo de palavras
+
+    Returns:
+        list: Palavras em minúsculas
+    """
+    with open(caminho, encoding="utf-8") as arquivo:
+        palavras = (linha.strip().lower() for linha in arquivo)
+        return list(dict.fromkeys(p for p in palavras if p.isalpha()))
+
+
+class IndiceDePalavras:
+    """
+    Índice do dicionário por tamanho da palavra e por posição das letras.
+
+    Para cada tamanho guarda os conjuntos de ids das palavras que têm uma
+    letra numa posição e das que contêm a letra, o que permite filtrar os
+    candidatos de uma partida com operações de conjuntos.
+    """
+
+    def __init__(self, palavras):
+        self.palavras = list(palavras)
+        self.por_tamanho = defaultdict(set)  # tamanho -> ids
+        self.por_posicao = defaultdict(set)  # (tamanho, posição, letra) -> ids
+        self.por_letra = defaultdict(set)  # (tamanho, letra) -> ids
+        # Para cada palavra: pares (letra, máscara de bits das posições)
+        self.mascaras = []
+        # Melhor letra já calculada para estados com muitos candidatos
+        self.jogadas_calculadas = {}
+
+        for id_palavra, palavra in enumerate(self.palavras):
+            tamanho = len(palavra)
+            self.por_tamanho[tamanho].add(id_palavra)
+            bits = defaultdict(int)
+            for posicao, letra in enumerate(palavra):
+                self.por_posicao[(tamanho, posicao, letra)].add(id_palavra)
+                bits[letra] |= 1 << posicao
+            for letra in bits:
+                self.por_letra[(tamanho, letra)].add(id_palavra)
+            self.mascaras.append(tuple(bits.items()))
+
+    def candidatos(self, tamanho):
+        """Retorna uma cópia dos ids das palavras com o tamanho indicado."""
+        return set(self.por_tamanho.get(tamanho, ()))
+
+    def filtrar(self, candidatos, tamanho, letra, posicoes):
+        """
+        Remove dos candidatos as palavras incompatíveis com um palpite.
+
+        Args:
+            candidatos (set): Ids ainda possíveis (alterado no lugar)
+            tamanho (int): Tamanho da palavra da partida
+            letra (str): Letra jogada
+            posicoes (list): Posições onde a letra apareceu (vazia = erro)
+        """
+        if not posicoes:
+            candidatos -= self.por_letra.get((tamanho, letra), set())
+            return
+
+        for posicao in posicoes:
+            candidatos &= self.por_posicao.get((tamanho, posicao, letra), set())
+        # A letra não pode aparecer em nenhuma outra posição
+        for posicao in set(range(tamanho)) - set(posicoes):
+            candidatos -= self.por_posicao.get((tamanho, posicao, letra), set())
+
+
+class JogoDaForca:
+    """Estado de uma partida com a máscara da palavra atualizada a cada palpite."""
+
+    def __init__(self, palavra, tentativas_maximas=6):
+        self.palavra = palavra
+        self.tentativas_maximas = tentativas_maximas
+        self.tentativas = 0
+        self.letras_corretas = set()
+        self.letras_erradas = set()
+        self._mascara = ["_"] * len(palavra)
+        self._faltam = len(palavra)
+        self._posicoes = defaultdict(list)
+        for posicao, letra in enumerate(palavra):
+            self._posicoes[letra].append(posicao)
+
+    @property
+    def mascara(self):
+        return " ".join(self._mascara)
+
+    @property
+    def venceu(self):
+        return self._faltam == 0
+
+    @property
+    def perdeu(self):
+        return self.tentativas >= self.tentativas_maximas
+
+    @property
+    def terminado(self):
+        return self.venceu or self.perdeu
+
+    def ja_tentou(self, letra):
+        return letra in self.letras_corretas or letra in self.letras_erradas
+
+    def palpite(self, letra):
+        """
+        Registra um palpite e atualiza apenas as posições reveladas.
+        Uma letra já jogada não altera o estado nem conta como erro.
+
+        Args:
+            letra (str): Letra jogada
+
+        Returns:
+            list: Posições onde a letra aparece (vazia se errou)
+        """
+        posicoes = self._posicoes.get(letra, [])
+        if self.ja_tentou(letra):
+            return posicoes
+        if posicoes:
+            self.letras_corretas.add(letra)
+            for posicao in posicoes:
+                self._mascara[posicao] = letra
+            self._faltam -= len(posicoes)
         else:
-            resultado += "_ "
-    return resultado.strip()
+            self.letras_erradas.add(letra)
+            self.tentativas += 1
+        return posicoes
+
+
+class SolucionadorForca:
+    """
+    Escolhe a próxima letra particionando os candidatos restantes pelo
+    padrão de posições que cada letra revelaria. A letra escolhida é a que
+    minimiza o tamanho esperado da partição resultante.
+
+    As primeiras jogadas de cada tamanho de palavra se repetem entre as
+    partidas, então a escolha para estados com muitos candidatos fica
+    guardada no índice e é reaproveitada.
+    """
 
+    LIMITE_CACHE = 200  # Abaixo disso recalcular é mais barato que guardar
 
-def jogar_forca():
-    palavra = escolher_palavra()
-    letras_corretas = set()
-    letras_erradas = set()
-    tentativas_maximas = 6
-    tentativas = 0
+    def __init__(self, indice, tamanho):
+        self.indice = indice
+        self.tamanho = tamanho
+        self.candidatos = indice.candidatos(tamanho)
+        self.jogadas = set()
+        self.historico = ()  # ((letra, posições), ...) na ordem jogada
+
+    def escolher_letra(self):
+        """
+        Returns:
+            str | None: Melhor letra a jogar (None se não houver candidatos)
+        """
+        if len(self.candidatos) < self.LIMITE_CACHE:
+            return self._calcular_letra()
+
+        chave = (self.tamanho, self.historico)
+        cache = self.indice.jogadas_calculadas
+        if chave not in cache:
+            cache[chave] = self._calcular_letra()
+        return cache[chave]
+
+    def _calcular_letra(self):
+        particoes = Counter()  # (letra, máscara) -> quantidade de palavras
+        contem = Counter()  # letra -> palavras que contêm a letra
+        mascaras = self.indice.mascaras
+        for id_palavra in self.candidatos:
+            for letra, bits in mascaras[id_palavra]:
+                if letra not in self.jogadas:
+                    particoes[(letra, bits)] += 1
+                    contem[letra] += 1
+
+        if not contem:
+            return None
+
+        total = len(self.candidatos)
+        custo = Counter()
+        for (letra, _), quantidade in particoes.items():
+            custo[letra] += quantidade * quantidade
+        # Soma dos quadrados: tamanho esperado (x total) do que sobra
+        return min(
+            contem,
+            key=lambda letra: (
+                custo[letra] + (total - contem[letra]) ** 2,
+                -contem[letra],
+                letra,
+            ),
+        )
+
+    def registrar(self, letra, posicoes):
+        self.jogadas.add(letra)
+        self.historico += ((letra, tuple(posicoes)),)
+        self.indice.filtrar(self.candidatos, self.tamanho, letra, posicoes)
+
+
+def jogar_automatico(palavra, indice, tentativas_maximas=6):
+    """
+    Joga uma partida completa usando o SolucionadorForca.
+
+    Returns:
+        tuple: (venceu, quantidade de erros)
+    """
+    jogo = JogoDaForca(palavra, tentativas_maximas)
+    solucionador = SolucionadorForca(indice, len(palavra))
+
+    while not jogo.terminado:
+        letra = solucionador.escolher_letra()
+        if letra is None:  # Palavra fora do dicionário
+            break
+        solucionador.registrar(letra, jogo.palpite(letra))
+
+    return jogo.venceu, jogo.tentativas
+
+
+# Índice construído uma única vez em cada processo do pool
+_indice_do_processo = None
+
+
+def _iniciar_processo(palavras):
+    global _indice_do_processo
+    _indice_do_processo = IndiceDePalavras(palavras)
+
+
+def _jogar_lote(palavras):
+    return [jogar_automatico(palavra, _indice_do_processo) for palavra in palavras]
+
+
+def simular_partidas(palavras, quantidade, processos=None, semente=0, lote=200):
+    """
+    Joga várias partidas em paralelo para medir a taxa de vitória e a
+    velocidade do solucionador.
+
+    Args:
+        palavras (list): Dicionário usado pelo índice e para sortear palavras
+        quantidade (int): Número de partidas
+        processos (int): Processos do pool (padrão: número de CPUs)
+        semente (int): Semente do sorteio das palavras
+        lote (int): Partidas enviadas de uma vez para cada processo
+
+    Returns:
+        dict: Estatísticas da simulação
+    """
+    sorteio = random.Random(semente)
+    escolhidas = [sorteio.choice(palavras) for _ in range(quantidade)]
+    lotes = [escolhidas[i : i + lote] for i in range(0, quantidade, lote)]
+
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=processos, initializer=_iniciar_processo, initargs=(palavras,)
+    ) as executor:
+        resultados = [
+            r for parcial in executor.map(_jogar_lote, lotes) for r in parcial
+        ]
+    duracao = time.perf_counter() - inicio
+
+    vitorias = sum(1 for venceu, _ in resultados if venceu)
+    return {
+        "partidas": quantidade,
+        "vitorias": vitorias,
+        "taxa_vitoria": vitorias / quantidade if quantidade else 0.0,
+        "erros_medios": (
+            sum(erros for _, erros in resultados) / quantidade if quantidade else 0.0
+        ),
+        "segundos": duracao,
+        "partidas_por_segundo": quantidade / duracao if duracao else 0.0,
+    }
+
+
+def jogar_forca(palavras=None):
+    jogo = JogoDaForca(escolher_palavra(palavras))
 
     print("Bem-vindo ao Jogo da Forca!")
     print("Adivinhe a palavra (dica: temas de tecnologia/programação)")
 
     while True:
-        print("\n" + mostrar_palavra(palavra, letras_corretas))
-        print(f"Letras erradas: {' '.join(letras_erradas)}")
-        print(f"Tentativas restantes: {tentativas_maximas - tentativas}")
+        print("\n" + jogo.mascara)
+        print(f"Letras erradas: {' '.join(jogo.letras_erradas)}")
+        print(f"Tentativas restantes: {jogo.tentativas_maximas - jogo.tentativas}")
 
-        if "_" not in mostrar_palavra(palavra, letras_corretas):
+        if jogo.venceu:
             print("\nParabéns! Você acertou a palavra!")
             break
 
-        if tentativas >= tentativas_maximas:
-            print(f"\nGame over! A palavra era: {palavra}")
+        if jogo.perdeu:
+            print(f"\nGame over! A palavra era: {jogo.palavra}")
             break
 
         palpite = input("Digite uma letra: ").lower()
@@ -52,18 +319,37 @@ def jogar_forca():
             print("Por favor, digite apenas uma letra válida.")
             continue
 
-        if palpite in letras_corretas or palpite in letras_erradas:
+        if jogo.ja_tentou(palpite):
             print("Você já tentou esta letra. Tente outra.")
             continue
 
-        if palpite in palavra:
-            letras_corretas.add(palpite)
+        if jogo.palpite(palpite):
             print("Letra correta!")
         else:
-            letras_erradas.add(palpite)
-            tentativas += 1
             print("Letra incorreta!")
 
 
 if __name__ == "__main__":
-    jogar_forca()
+    parser = argparse.ArgumentParser(description="Jogo da Forca")
+    parser.add_argument("--dicionario", help="Arquivo com uma palavra por linha")
+    parser.add_argument(
+        "--simular", type=int, metavar="N", help="Joga N partidas com o solucionador"
+    )
+    parser.add_argument("--processos", type=int, help="Processos usados na simulação")
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    palavras = (
+        carregar_palavras(args.dicionario) if args.dicionario else PALAVRAS_PADRAO
+    )
+
+    if args.simular:
+        estatisticas = simular_partidas(
+            palavras, args.simular, args.processos, args.semente
+        )
+        print(f"Partidas: {estatisticas['partidas']}")
+        print(f"Taxa de vitória: {estatisticas['taxa_vitoria']:.1%}")
+        print(f"Erros médios: {estatisticas['erros_medios']:.2f}")
+        print(f"Partidas por segundo: {estatisticas['partidas_por_segundo']:.0f}")
+    else:
+        jogar_forca(palavras)
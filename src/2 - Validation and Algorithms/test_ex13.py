@@ -0,0 +1,25 @@
+import unittest
+from ex13 import JogoDaForca
+
+
+class TesteJogoDaForca(unittest.TestCase):
+    def setUp(self):
+        """Cria uma partida nova para cada teste."""
+        self.jogo = JogoDaForca("banana")
+
+    def test_letra_correta_repetida(self):
+        """Testa que repetir uma letra certa não revela a palavra"""
+        self.jogo.palpite("a")
+        self.assertEqual(self.jogo.palpite("a"), [1, 3, 5])
+        self.assertFalse(self.jogo.venceu)
+        self.assertEqual(self.jogo.mascara, "_ a _ a _ a")
+
+    def test_letra_errada_repetida(self):
+        """Testa que repetir uma letra errada não gasta outra tentativa"""
+        self.jogo.palpite("z")
+        self.jogo.palpite("z")
+        self.assertEqual(self.jogo.tentativas, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+"""
+Benchmarks das operações da classe ContaBancaria (ex21).
+
+Uso:
+    python ../bench.py -k ex21
+"""
+
+from ex21 import ContaBancaria
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+def bench_depositar_dinheiro(n):
+    """n depósitos seguidos na mesma conta."""
+
+    def run():
+        conta = ContaBancaria(0, 0)
+        for _ in range(n):
+            conta.depositar_dinheiro(10)
+
+    return run
+
+
+def bench_levantar_dinheiro(n):
+    """n levantamentos, metade deles com saldo insuficiente."""
+
+    def run():
+        conta = ContaBancaria(n * 5, 0)
+        for _ in range(n):
+            conta.levantar_dinheiro(10)
+
+    return run
+
+
+def bench_transferir_dinheiro(n):
+    """n transferências para a conta de destino."""
+
+    def run():
+        conta = ContaBancaria(n * 10, 0)
+        for _ in range(n):
+            conta.transferir_dinheiro(10)
+
+    return run
@@ -0,0 +1,58 @@
+"""
+Benchmarks da atualização de estoque do ex22.
+
+Compara n chamadas de Produto.atualizar_estoque com um único lote de n
+ajustes aplicado pelo InventarioColunar.
+
+Uso:
+    python ../bench.py -k ex22
+"""
+
+import contextlib
+import io
+import random
+
+import numpy as np
+
+from ex22 import Produto
+from inventario_ex22 import InventarioColunar
+
+SIZES = [1_000, 10_000, 100_000]
+PRODUTOS = 1_000
+
+
+def _ajustes(n):
+    sorteio = random.Random(n)
+    codigos = [sorteio.randrange(PRODUTOS) for _ in range(n)]
+    deltas = [sorteio.randint(-3, 5) for _ in range(n)]
+    return codigos, deltas
+
+
+def bench_atualizar_estoque_objetos(n):
+    """n ajustes, um objeto Produto por vez."""
+    codigos, deltas = _ajustes(n)
+
+    def run():
+        produtos = [Produto("item", 10, i, n) for i in range(PRODUTOS)]
+        # atualizar_estoque imprime as recusas; o custo de I/O não interessa
+        with contextlib.redirect_stdout(io.StringIO()):
+            for codigo, delta in zip(codigos, deltas):
+                produtos[codigo].atualizar_estoque(delta)
+        return sum(p.get_preco() * p.get_quantidade() for p in produtos)
+
+    return run
+
+
+def bench_aplicar_ajustes_colunar(n):
+    """Os mesmos n ajustes num único lote vetorizado."""
+    codigos, deltas = _ajustes(n)
+    codigos, deltas = np.array(codigos), np.array(deltas)
+
+    def run():
+        inventario = InventarioColunar(capacidade=PRODUTOS)
+        for i in range(PRODUTOS):
+            inventario.adicionar("item", 10, i, n)
+        inventario.aplicar_ajustes_arrays(codigos, deltas)
+        return inventario.valor_total()
+
+    return run
@@ -0,0 +1,106 @@
+"""
+Benchmarks do parser JSON incremental (ex24).
+
+Compara o parser em streaming com o json.loads da biblioteca padrão em
+dois aspectos: vazão (MB/s) e pico de memória (tracemalloc) ao percorrer
+uma exportação com N pedidos.
+
+Uso:
+    python bench_ex24.py 10000 100000
+    python ../bench.py -k ex24
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+
+from ex24 import items
+
+CHUNK_SIZE = 64 * 1024
+SIZES = [1_000, 10_000]
+
+
+def gerar_exportacao(n):
+    """
+    Gera uma exportação de pedidos em pedaços de bytes, sem montar o
+    documento inteiro em memória.
+
+    Args:
+        n (int): Quantidade de pedidos
+
+    Returns:
+        Gerador de pedaços de bytes com aproximadamente CHUNK_SIZE cada
+    """
+    partes = ['{"exportado_em": "2025-06-10", "pedidos": [']
+    tamanho = len(partes[0])
+    for i in range(n):
+        pedido = json.dumps(
+            {
+                "id": i,
+                "numero_pedido": f"PED-202506-{i:04X}",
+                "cliente": {"id": i % 997, "name": "Cliente Exemplo"},
+                "valor_total": round(i * 1.37, 2),
+                "status": "pendente",
+                "entregue": False,
+                "observacoes": None,
+            }
+        )
+        partes.append(pedido if i == 0 else ", " + pedido)
+        tamanho += len(pedido) + 2
+        if tamanho >= CHUNK_SIZE:
+            yield "".join(partes).encode()
+            partes, tamanho = [], 0
+    partes.append("]}")
+    yield "".join(partes).encode()
+
+
+def bench_items_streaming(n):
+    """Percorre os pedidos com items() direto do gerador de pedaços."""
+
+    def run():
+        total = 0
+        for pedido in items(gerar_exportacao(n), "pedidos.item"):
+            total += pedido["id"]
+        return total
+
+    return run
+
+
+def bench_json_loads(n):
+    """Referência: junta o documento inteiro e usa json.loads."""
+
+    def run():
+        documento = json.loads(b"".join(gerar_exportacao(n)))
+        return sum(pedido["id"] for pedido in documento["pedidos"])
+
+    return run
+
+
+def _medir(funcao):
+    """
+    Retorna (segundos, pico de memória em bytes) de uma execução.
+    O tempo é medido sem o tracemalloc ativo, que deixa tudo mais lento.
+    """
+    inicio = time.perf_counter()
+    funcao()
+    duracao = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duracao, pico
+
+
+if __name__ == "__main__":
+    tamanhos = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    for n in tamanhos:
+        megabytes = sum(len(chunk) for chunk in gerar_exportacao(n)) / 1024**2
+        print(f"\n{n} pedidos ({megabytes:.1f} MB)")
+        for bench in (bench_items_streaming, bench_json_loads):
+            duracao, pico = _medir(bench(n))
+            print(
+                f"  {bench.__name__:<24} {megabytes / duracao:8.2f} MB/s"
+                f"  pico de memória: {pico / 1024**2:8.2f} MB"
+            )
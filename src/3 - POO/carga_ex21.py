@@ -0,0 +1,315 @@
+"""
+Gerador de carga para a classe ContaBancaria (ex21).
+
+Cria N contas e reproduz uma agenda aleatória (mas determinística, a
+partir de uma semente) de depósitos, levantamentos e transferências.
+
+As contas são divididas em shards (conta i pertence ao shard i % S) e
+cada shard tem a sua própria agenda, com operações apenas entre as suas
+contas. Assim os três modos de execução produzem exatamente os mesmos
+saldos finais e podem ser comparados entre si:
+
+    - sequencial: os shards são executados um após o outro
+    - threads: cada shard roda numa thread do ThreadPoolExecutor
+    - processos: cada shard roda num processo do ProcessPoolExecutor
+
+Como nenhuma operação cruza shards, no modo threads duas threads nunca
+disputam a mesma conta: a carga mede a vazão das contas em paralelo, não
+a contenção sobre uma conta compartilhada (ContaBancaria não tem lock).
+
+Há no máximo um shard por conta: com menos contas que shards, o número
+de shards é reduzido ao número de contas.
+
+Uso:
+    python carga_ex21.py --contas 1000 --operacoes 1000000 --shards 4
+"""
+
+import argparse
+import os
+import random
+import time
+from array import array
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from ex21 import ContaBancaria
+
+TIPOS = ("deposito", "levantamento", "transferencia")
+MODOS = ("sequencial", "threads", "processos")
+
+Operacao = namedtuple("Operacao", ["tipo", "origem", "destino", "valor"])
+ResultadoShard = namedtuple(
+    "ResultadoShard", ["saldos", "enviados", "latencias", "totais"]
+)
+
+
+def gerar_agenda(n_contas, n_operacoes, semente, shard=0, n_shards=1):
+    """
+    Gera a agenda de operações de um shard.
+
+    Args:
+        n_contas (int): Total de contas da simulação
+        n_operacoes (int): Operações deste shard
+        semente (int): Semente da simulação
+        shard (int): Índice do shard
+        n_shards (int): Quantidade de shards
+
+    Returns:
+        Gerador de Operacao (40% depósitos, 40% levantamentos,
+        20% transferências)
+    """
+    gerador = random.Random(f"{semente}-{shard}-{n_shards}")
+    contas = range(shard, n_contas, n_shards)
+
+    for _ in range(n_operacoes):
+        sorteio = gerador.random()
+        origem = gerador.choice(contas)
+        valor = gerador.randint(1, 500)
+        if sorteio < 0.4:
+            yield Operacao("deposito", origem, None, valor)
+        elif sorteio < 0.8:
+            yield Operacao("levantamento", origem, None, valor)
+        else:
+            yield Operacao("transferencia", origem, gerador.choice(contas), valor)
+
+
+def _operacoes_do_shard(n_operacoes, shard, n_shards):
+    """Divide as operações entre os shards o mais igualmente possível."""
+    return n_operacoes // n_shards + (1 if shard < n_operacoes % n_shards else 0)
+
+
+def executar_shard(
+    n_contas, n_operacoes, semente, shard, n_shards, saldo_inicial, contas=None
+):
+    """
+    Executa a agenda de um shard medindo a latência de cada operação.
+
+    Args:
+        contas (dict): Contas do shard (id -> ContaBancaria). Se não for
+            informado, as contas são criadas aqui (modo processos).
+
+    Returns:
+        ResultadoShard: Saldos finais, total enviado por conta, latências
+        em nanossegundos por tipo de operação e totais movimentados
+    """
+    if contas is None:
+        contas = {
+            i: ContaBancaria(saldo_inicial, 0) for i in range(shard, n_contas, n_shards)
+        }
+
+    latencias = {tipo: array("q") for tipo in TIPOS}
+    totais = {"depositado": 0, "levantado": 0, "transferido": 0, "recusadas": 0}
+    relogio = time.perf_counter_ns
+
+    agenda = gerar_agenda(
+        n_contas,
+        _operacoes_do_shard(n_operacoes, shard, n_shards),
+        semente,
+        shard,
+        n_shards,
+    )
+    for tipo, origem, destino, valor in agenda:
+        conta = contas[origem]
+        saldo_antes = conta.amount
+
+        inicio = relogio()
+        if tipo == "deposito":
+            conta.depositar_dinheiro(valor)
+        elif tipo == "levantamento":
+            conta.levantar_dinheiro(valor)
+        else:
+            conta.transferir_dinheiro(valor)
+            if conta.amount != saldo_antes:
+                # Credita a conta de destino apenas se o débito aconteceu
+                contas[destino].depositar_dinheiro(valor)
+        latencias[tipo].append(relogio() - inicio)
+
+        if tipo == "deposito":
+            totais["depositado"] += valor
+        elif valor > saldo_antes:  # A conta recusou por saldo insuficiente
+            totais["recusadas"] += 1
+        elif tipo == "levantamento":
+            totais["levantado"] += valor
+        else:
+            totais["transferido"] += valor
+
+    return ResultadoShard(
+        saldos={i: conta.amount for i, conta in contas.items()},
+        enviados={i: conta.account_to_send_amount for i, conta in contas.items()},
+        latencias=latencias,
+        totais=totais,
+    )
+
+
+def _percentil(valores_ordenados, fracao):
+    if not valores_ordenados:
+        return 0
+    return valores_ordenados[int(fracao * (len(valores_ordenados) - 1))]
+
+
+def _juntar(resultados, n_contas, saldo_inicial):
+    """Junta os resultados dos shards e verifica a consistência final."""
+    saldos, enviados = {}, {}
+    latencias = {tipo: array("q") for tipo in TIPOS}
+    totais = dict.fromkeys(resultados[0].totais, 0)
+
+    for resultado in resultados:
+        saldos.update(resultado.saldos)
+        enviados.update(resultado.enviados)
+        for tipo in TIPOS:
+            latencias[tipo].extend(resultado.latencias[tipo])
+        for chave, valor in resultado.totais.items():
+            totais[chave] += valor
+
+    esperado = n_contas * saldo_inicial + totais["depositado"] - totais["levantado"]
+    problemas = []
+    if len(saldos) != n_contas:
+        problemas.append(f"{n_contas - len(saldos)} conta(s) sem resultado")
+    if sum(saldos.values()) != esperado:
+        problemas.append(
+            f"soma dos saldos {sum(saldos.values())} diferente do esperado {esperado}"
+        )
+    if sum(enviados.values()) != totais["transferido"]:
+        problemas.append("total enviado difere do total transferido")
+    negativos = [i for i, saldo in saldos.items() if saldo < 0]
+    if negativos:
+        problemas.append(f"{len(negativos)} conta(s) com saldo negativo")
+
+    return saldos, latencias, totais, problemas
+
+
+def simular(modo, n_contas, n_operacoes, semente=42, n_shards=None, saldo_inicial=1000):
+    """
+    Executa a simulação num dos modos disponíveis.
+
+    Args:
+        modo (str): "sequencial", "threads" ou "processos"
+        n_contas (int): Quantidade de contas
+        n_operacoes (int): Total de operações da agenda
+        semente (int): Semente da agenda
+        n_shards (int): Shards (e trabalhadores); padrão: número de CPUs,
+            limitado ao número de contas
+        saldo_inicial (int): Saldo de cada conta no início
+
+    Returns:
+        dict: Operações por segundo, latências p50/p99 por tipo (em µs),
+        totais, saldos finais e problemas de consistência encontrados
+    """
+    if modo not in MODOS:
+        raise ValueError(f"Modo inválido: {modo}. Use um de {', '.join(MODOS)}.")
+    if n_contas < 1:
+        raise ValueError("A simulação precisa de pelo menos uma conta.")
+    # Um shard sem contas não teria de onde sortear as suas operações
+    n_shards = min(n_shards or os.cpu_count() or 1, n_contas)
+    parametros = (n_contas, n_operacoes, semente)
+
+    inicio = time.perf_counter()
+    if modo == "processos":
+        with ProcessPoolExecutor(max_workers=n_shards) as executor:
+            futuros = [
+                executor.submit(
+                    executar_shard, *parametros, shard, n_shards, saldo_inicial
+                )
+                for shard in range(n_shards)
+            ]
+            resultados = [futuro.result() for futuro in futuros]
+    else:
+        contas = [
+            {i: ContaBancaria(saldo_inicial, 0) for i in range(s, n_contas, n_shards)}
+            for s in range(n_shards)
+        ]
+        if modo == "sequencial":
+            resultados = [
+                executar_shard(*parametros, s, n_shards, saldo_inicial, contas[s])
+                for s in range(n_shards)
+            ]
+        else:
+            with ThreadPoolExecutor(max_workers=n_shards) as executor:
+                futuros = [
+                    executor.submit(
+                        executar_shard,
+                        *parametros,
+                        s,
+                        n_shards,
+                        saldo_inicial,
+                        contas[s],
+                    )
+                    for s in range(n_shards)
+                ]
+                resultados = [futuro.result() for futuro in futuros]
+    duracao = time.perf_counter() - inicio
+
+    saldos, latencias, totais, problemas = _juntar(resultados, n_contas, saldo_inicial)
+
+    latencia_us = {}
+    for tipo, valores in latencias.items():
+        ordenados = sorted(valores)
+        latencia_us[tipo] = {
+            "p50": _percentil(ordenados, 0.50) / 1000,
+            "p99": _percentil(ordenados, 0.99) / 1000,
+        }
+
+    return {
+        "modo": modo,
+        "operacoes": n_operacoes,
+        "segundos": duracao,
+        "operacoes_por_segundo": n_operacoes / duracao if duracao else 0.0,
+        "latencia_us": latencia_us,
+        "totais": totais,
+        "saldos": saldos,
+        "problemas": problemas,
+    }
+
+
+def _inteiro_positivo(valor):
+    numero = int(valor)
+    if numero < 1:
+        raise argparse.ArgumentTypeError(f"deve ser maior que zero: {valor}")
+    return numero
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Carga para ContaBancaria")
+    parser.add_argument("--contas", type=_inteiro_positivo, default=1_000)
+    parser.add_argument("--operacoes", type=int, default=1_000_000)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument(
+        "--shards",
+        type=_inteiro_positivo,
+        help="Padrão: número de CPUs (no máximo uma por conta)",
+    )
+    parser.add_argument("--saldo-inicial", type=int, default=1_000)
+    parser.add_argument("--modos", nargs="+", choices=MODOS, default=list(MODOS))
+    args = parser.parse_args()
+
+    referencia = None
+    for modo in args.modos:
+        resultado = simular(
+            modo,
+            args.contas,
+            args.operacoes,
+            args.semente,
+            args.shards,
+            args.saldo_inicial,
+        )
+
+        # Todos os modos devem terminar com os mesmos saldos
+        if referencia is None:
+            referencia = resultado["saldos"]
+        elif resultado["saldos"] != referencia:
+            resultado["problemas"].append("saldos finais diferentes do primeiro modo")
+
+        print(f"\n=== {modo} ===")
+        print(f"Operações/s: {resultado['operacoes_por_segundo']:,.0f}")
+        for tipo, latencia in resultado["latencia_us"].items():
+            print(
+                f"  {tipo:<14} p50: {latencia['p50']:8.2f} µs"
+                f"  p99: {latencia['p99']:8.2f} µs"
+            )
+        print(f"Totais: {resultado['totais']}")
+        if resultado["problemas"]:
+            print("Consistência: FALHOU")
+            for problema in resultado["problemas"]:
+                print(f"  - {problema}")
+        else:
+            print("Consistência: OK")
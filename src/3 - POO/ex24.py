@@ -1,3 +1,8 @@
+import codecs
+import re
+from json.decoder import scanstring
+
+
 class JSONSerializer:
     """
     Classe responsável por serializar objetos Python para o formato JSON.
@@ -124,3 +129,374 @@ def to_json(obj):
     """
     serializer = JSONSerializer()
     return serializer.serialize(obj)
+
+
+# ==================== PARSER JSON INCREMENTAL (STREAMING) ====================
+
+# Expressões regulares usadas pelo tokenizador
+_ESPACOS = re.compile(r"[ \t\n\r]*")
+_ASPA_OU_ESCAPE = re.compile(r'["\\]')
+_CARACTERES_NUMERO = re.compile(r"[-+0-9.eE]+")
+_NUMERO = re.compile(r"-?(?:0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?")
+_CARACTERES_LITERAL = re.compile(r"[a-z]+")
+_LITERAIS = {"true": True, "false": False, "null": None}
+_PONTUACAO = frozenset("{}[],:")
+
+
+class JSONStreamError(ValueError):
+    """Erro levantado quando o fluxo de entrada não é um JSON válido."""
+
+
+class JSONPullParser:
+    """
+    Parser JSON incremental (pull parser) que consome pedaços de bytes
+    e emite eventos sem nunca carregar o documento inteiro em memória.
+
+    Cada evento é uma tupla (prefixo, evento, valor), onde o prefixo é o
+    caminho até o elemento atual com as chaves separadas por ponto e os
+    elementos de arrays representados por "item" (ex.: "pedidos.item.id").
+
+    Eventos emitidos:
+        start_object, end_object, start_array, end_array, key, value
+
+    Examples:
+        >>> parser = JSONPullParser()
+        >>> parser.feed(b'{"a": [1, ') + parser.feed(b"2]}") + parser.close()
+        [('', 'start_object', None), ('', 'key', 'a'), ('a', 'start_array', None), \
+('a.item', 'value', 1), ('a.item', 'value', 2), ('a', 'end_array', None), \
+('', 'end_object', None)]
+    """
+
+    def __init__(self, encoding="utf-8"):
+        """
+        Inicializa o parser.
+
+        Args:
+            encoding (str): Codificação dos bytes recebidos em feed()
+        """
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._buffer = ""  # Texto ainda não consumido pelo tokenizador
+        self._stack = []  # Containers abertos: "object" ou "array"
+        self._path = []  # Componentes do prefixo atual
+        self._prefix = ""
+        self._expect = "value"  # Próximo token esperado pela gramática
+        self._closed = False
+        # String ainda sem a aspa final: os pedaços novos ficam em _partes e
+        # só o pedaço recebido é examinado (nada é varrido de novo)
+        self._string_aberta = False
+        self._partes = []
+        self._escape = False  # O último pedaço terminou com "\" sem par
+
+    def feed(self, data):
+        """
+        Entrega um novo pedaço de dados ao parser.
+
+        Args:
+            data (bytes | str): Pedaço do documento JSON
+
+        Returns:
+            list: Eventos completados com este pedaço
+
+        Raises:
+            JSONStreamError: Se o conteúdo recebido não for JSON válido
+        """
+        if self._closed:
+            raise JSONStreamError("O parser já foi fechado.")
+        if isinstance(data, (bytes, bytearray)):
+            data = self._decoder.decode(data)
+        if self._string_aberta:
+            self._partes.append(data)
+            if not self._fim_da_string(data, 0):
+                return []
+            data = "".join(self._partes)
+            self._partes = []
+            self._string_aberta = False
+        self._buffer += data
+        return self._parse(final=False)
+
+    def close(self):
+        """
+        Sinaliza o fim do fluxo e processa o que restou no buffer.
+
+        Returns:
+            list: Últimos eventos do documento
+
+        Raises:
+            JSONStreamError: Se o documento estiver incompleto
+        """
+        self._buffer += "".join(self._partes) + self._decoder.decode(b"", final=True)
+        self._partes = []
+        events = self._parse(final=True)
+        self._closed = True
+        if self._expect != "done":
+            raise JSONStreamError("Fim inesperado do documento JSON.")
+        return events
+
+    def _parse(self, final):
+        """Tokeniza o buffer e passa cada token pela máquina de estados."""
+        events = []
+        buf = self._buffer
+        pos = 0
+        end = len(buf)
+
+        while True:
+            pos = _ESPACOS.match(buf, pos).end()
+            if pos >= end:
+                break
+
+            char = buf[pos]
+            if char in _PONTUACAO:
+                self._token(char, None, events)
+                pos += 1
+            elif char == '"':
+                # String incompleta: aguarda o próximo pedaço
+                self._escape = False
+                if not self._fim_da_string(buf, pos + 1):
+                    if final:
+                        raise JSONStreamError(f"String não terminada na posição {pos}.")
+                    self._string_aberta = True
+                    break
+                try:
+                    value, pos = scanstring(buf, pos + 1)
+                except ValueError as exc:
+                    # Ex.: caractere de controle cru ou escape inválido
+                    raise JSONStreamError(
+                        f"String inválida na posição {pos}: {exc.args[0]}"
+                    ) from exc
+                self._token("string", value, events)
+            elif char == "-" or char.isdigit():
+                match = _CARACTERES_NUMERO.match(buf, pos)
+                if match.end() == end and not final:
+                    break  # O número pode continuar no próximo pedaço
+                number = _NUMERO.fullmatch(buf, pos, match.end())
+                if number is None:
+                    raise JSONStreamError(f"Número inválido na posição {pos}.")
+                text = number.group()
+                value = float(text) if number.group(1) or number.group(2) else int(text)
+                self._token("scalar", value, events)
+                pos = match.end()
+            else:
+                match = _CARACTERES_LITERAL.match(buf, pos)
+                word = match.group() if match else ""
+                if match and match.end() == end and not final:
+                    if any(lit.startswith(word) for lit in _LITERAIS):
+                        break
+                if word not in _LITERAIS:
+                    raise JSONStreamError(
+                        f"Caractere inesperado {char!r} na posição {pos}."
+                    )
+                self._token("scalar", _LITERAIS[word], events)
+                pos = match.end()
+
+        # Mantém apenas o trecho ainda não consumido
+        self._buffer = buf[pos:]
+        return events
+
+    def _fim_da_string(self, text, pos):
+        """
+        Procura a aspa que fecha a string aberta em text[pos:], guardando
+        em _escape se o texto terminou no meio de um escape.
+
+        Returns:
+            bool: Se a string termina neste texto
+        """
+        end = len(text)
+        if self._escape:
+            if pos >= end:
+                return False
+            pos += 1  # Caractere escapado no fim do pedaço anterior
+            self._escape = False
+        while True:
+            match = _ASPA_OU_ESCAPE.search(text, pos)
+            if match is None:
+                return False
+            if match.group() == '"':
+                return True
+            pos = match.end() + 1
+            if pos > end:
+                self._escape = True
+                return False
+
+    def _push(self, component):
+        self._path.append(component)
+        self._prefix = ".".join(self._path)
+
+    def _pop(self):
+        self._path.pop()
+        self._prefix = ".".join(self._path)
+
+    def _token(self, kind, value, events):
+        """Máquina de estados que valida a gramática e gera os eventos."""
+        expect = self._expect
+
+        if expect in ("value", "value_or_end"):
+            if kind == "]" and expect == "value_or_end":
+                self._end_array(events)
+            elif kind == "{":
+                events.append((self._prefix, "start_object", None))
+                self._stack.append("object")
+                self._expect = "key_or_end"
+            elif kind == "[":
+                events.append((self._prefix, "start_array", None))
+                self._stack.append("array")
+                self._push("item")
+                self._expect = "value_or_end"
+            elif kind in ("string", "scalar"):
+                events.append((self._prefix, "value", value))
+                self._after_value()
+            else:
+                self._unexpected(kind)
+        elif expect in ("key", "key_or_end"):
+            if kind == "}" and expect == "key_or_end":
+                self._end_object(events)
+            elif kind == "string":
+                events.append((self._prefix, "key", value))
+                self._push(value)
+                self._expect = "colon"
+            else:
+                self._unexpected(kind)
+        elif expect == "colon":
+            if kind != ":":
+                self._unexpected(kind)
+            self._expect = "value"
+        elif expect == "comma_or_end":
+            container = self._stack[-1]
+            if kind == ",":
+                self._expect = "key" if container == "object" else "value"
+            elif kind == "}" and container == "object":
+                self._end_object(events)
+            elif kind == "]" and container == "array":
+                self._end_array(events)
+            else:
+                self._unexpected(kind)
+        else:
+            self._unexpected(kind)
+
+    def _end_object(self, events):
+        self._stack.pop()
+        events.append((self._prefix, "end_object", None))
+        self._after_value()
+
+    def _end_array(self, events):
+        self._stack.pop()
+        self._pop()  # Remove o "item"
+        events.append((self._prefix, "end_array", None))
+        self._after_value()
+
+    def _after_value(self):
+        """Atualiza o estado depois de um valor completo."""
+        if not self._stack:
+            self._expect = "done"
+        else:
+            if self._stack[-1] == "object":
+                self._pop()  # Remove a chave do valor que acabou
+            self._expect = "comma_or_end"
+
+    def _unexpected(self, kind):
+        token = {"string": "string", "scalar": "valor"}.get(kind, repr(kind))
+        raise JSONStreamError(f"Token inesperado {token} (esperado: {self._expect}).")
+
+
+class _ObjectBuilder:
+    """Reconstrói objetos Python a partir de eventos do JSONPullParser."""
+
+    def __init__(self):
+        self.value = None
+        self._containers = []
+        self._key = None
+
+    @property
+    def depth(self):
+        return len(self._containers)
+
+    def event(self, event, value):
+        if event == "key":
+            self._key = value
+        elif event == "start_object":
+            self._add({})
+        elif event == "start_array":
+            self._add([])
+        elif event in ("end_object", "end_array"):
+            self._containers.pop()
+        else:
+            self._add(value)
+
+    def _add(self, value):
+        if not self._containers:
+            self.value = value
+        else:
+            container = self._containers[-1]
+            if isinstance(container, list):
+                container.append(value)
+            else:
+                container[self._key] = value
+        if isinstance(value, (dict, list)):
+            self._containers.append(value)
+
+
+def _iter_chunks(source, chunk_size):
+    """Normaliza arquivos, bytes/str ou iteráveis de pedaços."""
+    if hasattr(source, "read"):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    elif isinstance(source, (bytes, bytearray, str)):
+        yield source
+    else:
+        yield from source
+
+
+def parse(source, chunk_size=64 * 1024):
+    """
+    Gera os eventos de um documento JSON lido de forma incremental.
+
+    Args:
+        source: Arquivo aberto (modo binário ou texto), bytes/str ou
+            iterável de pedaços de bytes
+        chunk_size (int): Tamanho da leitura quando source é um arquivo
+
+    Returns:
+        Gerador de tuplas (prefixo, evento, valor)
+    """
+    parser = JSONPullParser()
+    for chunk in _iter_chunks(source, chunk_size):
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+def items(source, prefix, chunk_size=64 * 1024):
+    """
+    Gera, um de cada vez, os objetos Python encontrados no caminho indicado.
+
+    Apenas o objeto corrente é mantido em memória, o que permite percorrer
+    exportações muito grandes (ex.: a lista de pedidos de um backup).
+
+    Args:
+        source: Mesmo formato aceito por parse()
+        prefix (str): Caminho dos elementos (ex.: "pedidos.item")
+        chunk_size (int): Tamanho da leitura quando source é um arquivo
+
+    Returns:
+        Gerador de objetos Python (dict, list, str, int, float, bool, None)
+
+    Examples:
+        >>> list(items([b'{"pedidos": [{"id": 1}, ', b'{"id": 2}]}'], "pedidos.item"))
+        [{'id': 1}, {'id': 2}]
+    """
+    builder = None
+    for current, event, value in parse(source, chunk_size):
+        if builder is None:
+            if current != prefix:
+                continue
+            if event in ("start_object", "start_array"):
+                builder = _ObjectBuilder()
+                builder.event(event, value)
+            elif event == "value":
+                yield value
+        else:
+            builder.event(event, value)
+            if builder.depth == 0:
+                yield builder.value
+                builder = None
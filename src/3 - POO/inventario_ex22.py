@@ -0,0 +1,264 @@
+"""
+Inventário colunar para os produtos do ex22.
+
+Preços e quantidades ficam em arrays NumPy (uma linha por produto) e os
+objetos Produto são apenas "visões" sobre essas colunas. Isso permite
+aplicar milhares de ajustes de estoque numa única operação vetorizada e
+consultar o valor total do inventário em tempo constante.
+"""
+
+import numpy as np
+
+from ex22 import Produto
+
+
+class EstoqueInsuficienteError(ValueError):
+    """Levantado quando um lote de ajustes deixaria algum estoque negativo."""
+
+    def __init__(self, codigos):
+        self.codigos = list(codigos)
+        super().__init__(
+            "Quantidade em estoque insuficiente para os produtos: "
+            + ", ".join(str(codigo) for codigo in self.codigos)
+        )
+
+
+class ProdutoView(Produto):
+    """
+    Produto cujos atributos são lidos e escritos nas colunas do inventário.
+
+    Os atributos "privados" usados pela classe Produto (_preco,
+    _quantidade, ...) viram propriedades, então todos os métodos herdados
+    (get_preco, set_preco, atualizar_estoque, exibir_detalhes) continuam
+    funcionando sem alterações.
+    """
+
+    def __init__(self, inventario, linha):
+        # Não chama Produto.__init__: os dados já estão nas colunas
+        self._inventario = inventario
+        self._linha = linha
+
+    @property
+    def _nome(self):
+        return self._inventario._nomes[self._linha]
+
+    @_nome.setter
+    def _nome(self, nome):
+        self._inventario._nomes[self._linha] = nome
+
+    @property
+    def _codigo(self):
+        return int(self._inventario._codigos[self._linha])
+
+    @property
+    def _preco(self):
+        return float(self._inventario._precos[self._linha])
+
+    @_preco.setter
+    def _preco(self, preco):
+        self._inventario._definir_preco(self._linha, preco)
+
+    @property
+    def _quantidade(self):
+        return int(self._inventario._quantidades[self._linha])
+
+    @_quantidade.setter
+    def _quantidade(self, quantidade):
+        self._inventario._definir_quantidade(self._linha, quantidade)
+
+    def __repr__(self):
+        return f"ProdutoView(codigo={self._codigo}, nome={self._nome!r})"
+
+
+class InventarioColunar:
+    """
+    Inventário com preço e quantidade armazenados em colunas NumPy,
+    indexadas pelo código do produto.
+    """
+
+    def __init__(self, capacidade=1024):
+        """
+        Args:
+            capacidade (int): Linhas reservadas inicialmente (cresce sozinho)
+        """
+        self._codigos = np.empty(capacidade, dtype=np.int64)
+        self._precos = np.empty(capacidade, dtype=np.float64)
+        self._quantidades = np.empty(capacidade, dtype=np.int64)
+        self._nomes = []
+        self._linhas = {}  # código -> linha
+        self._tamanho = 0
+        self._valor_total = 0.0
+        # Códigos ordenados para converter lotes de códigos em linhas
+        self._ordem = None
+        self._codigos_ordenados = None
+
+    def __len__(self):
+        return self._tamanho
+
+    def __contains__(self, codigo):
+        return codigo in self._linhas
+
+    def __iter__(self):
+        return (ProdutoView(self, linha) for linha in range(self._tamanho))
+
+    def adicionar(self, nome, preco, codigo, quantidade):
+        """
+        Cadastra um produto no inventário.
+
+        Returns:
+            ProdutoView: Visão do produto cadastrado
+
+        Raises:
+            ValueError: Se o código já existir ou preço/quantidade forem negativos
+        """
+        if codigo in self._linhas:
+            raise ValueError(f"Já existe um produto com o código {codigo}.")
+        if preco < 0 or quantidade < 0:
+            raise ValueError("Preço e quantidade não podem ser negativos.")
+
+        if self._tamanho == len(self._codigos):
+            self._crescer()
+
+        linha = self._tamanho
+        self._codigos[linha] = codigo
+        self._precos[linha] = preco
+        self._quantidades[linha] = quantidade
+        self._nomes.append(nome)
+        self._linhas[codigo] = linha
+        self._tamanho += 1
+        self._valor_total += preco * quantidade
+        self._ordem = None
+        return ProdutoView(self, linha)
+
+    def adicionar_produto(self, produto):
+        """Copia um Produto (ou subclasse) para as colunas do inventário."""
+        return self.adicionar(
+            produto.get_nome(),
+            produto.get_preco(),
+            produto.get_codigo(),
+            produto.get_quantidade(),
+        )
+
+    def produto(self, codigo):
+        """
+        Returns:
+            ProdutoView: Visão do produto com o código informado
+
+        Raises:
+            KeyError: Se o código não existir
+        """
+        return ProdutoView(self, self._linhas[codigo])
+
+    def aplicar_ajustes(self, ajustes):
+        """
+        Aplica um lote de ajustes de estoque de forma atômica.
+
+        Os deltas de um mesmo código são somados e o lote inteiro é
+        rejeitado se qualquer estoque ficar negativo. Para lotes já em
+        arrays, use aplicar_ajustes_arrays.
+
+        Args:
+            ajustes: Iterável de pares (codigo, delta)
+
+        Raises:
+            KeyError: Se algum código não existir
+            EstoqueInsuficienteError: Se algum estoque ficaria negativo
+
+        Um lote de dois pares é tratado como dois ajustes:
+
+        >>> inventario = InventarioColunar()
+        >>> for codigo in (1, 2, 5):
+        ...     _ = inventario.adicionar("item", 1.0, codigo, 10)
+        >>> inventario.aplicar_ajustes(((1, 5), (2, -3)))
+        >>> [p.get_quantidade() for p in inventario]
+        [15, 7, 10]
+        """
+        ajustes = list(ajustes)
+        codigos, deltas = zip(*ajustes) if ajustes else ((), ())
+        self.aplicar_ajustes_arrays(codigos, deltas)
+
+    def aplicar_ajustes_arrays(self, codigos, deltas):
+        """
+        Aplica um lote de ajustes em forma colunar, como aplicar_ajustes.
+
+        Args:
+            codigos: Array (ou sequência) com o código de cada ajuste
+            deltas: Array (ou sequência) com o delta de cada ajuste
+
+        Raises:
+            ValueError: Se os dois arrays tiverem tamanhos diferentes
+            KeyError: Se algum código não existir
+            EstoqueInsuficienteError: Se algum estoque ficaria negativo
+        """
+        codigos = np.asarray(codigos, dtype=np.int64)
+        deltas = np.asarray(deltas, dtype=np.int64)
+        if codigos.shape != deltas.shape:
+            raise ValueError("codigos e deltas devem ter o mesmo tamanho.")
+
+        n = self._tamanho
+        soma = np.zeros(n, dtype=np.int64)
+        np.add.at(soma, self._linhas_de(codigos), deltas)
+
+        novas = self._quantidades[:n] + soma
+        negativas = novas < 0
+        if negativas.any():
+            raise EstoqueInsuficienteError(self._codigos[:n][negativas].tolist())
+
+        self._quantidades[:n] = novas
+        self._valor_total += float(np.dot(self._precos[:n], soma))
+
+    def valor_total(self):
+        """Valor total do inventário (preço x quantidade), em tempo constante."""
+        return self._valor_total
+
+    def recalcular_valor_total(self):
+        """Recalcula o valor total a partir das colunas (corrige arredondamentos)."""
+        n = self._tamanho
+        self._valor_total = float(np.dot(self._precos[:n], self._quantidades[:n]))
+        return self._valor_total
+
+    def valor_por_produto(self):
+        """
+        Returns:
+            dict: código -> preço x quantidade
+        """
+        n = self._tamanho
+        valores = self._precos[:n] * self._quantidades[:n]
+        return dict(zip(self._codigos[:n].tolist(), valores.tolist()))
+
+    def _linhas_de(self, codigos):
+        """Converte um array de códigos em linhas usando busca binária."""
+        n = self._tamanho
+        if self._ordem is None:
+            self._ordem = np.argsort(self._codigos[:n], kind="stable")
+            self._codigos_ordenados = self._codigos[:n][self._ordem]
+
+        posicoes = np.searchsorted(self._codigos_ordenados, codigos)
+        posicoes = np.minimum(posicoes, max(n - 1, 0))
+        encontrados = (
+            self._codigos_ordenados[posicoes] == codigos
+            if n
+            else np.zeros(len(codigos), dtype=bool)
+        )
+        if not encontrados.all():
+            faltando = codigos[~encontrados].tolist()
+            raise KeyError(f"Produtos não encontrados: {faltando}")
+        return self._ordem[posicoes]
+
+    def _definir_preco(self, linha, preco):
+        quantidade = int(self._quantidades[linha])
+        self._valor_total += (preco - float(self._precos[linha])) * quantidade
+        self._precos[linha] = preco
+
+    def _definir_quantidade(self, linha, quantidade):
+        delta = quantidade - int(self._quantidades[linha])
+        self._valor_total += float(self._precos[linha]) * delta
+        self._quantidades[linha] = quantidade
+
+    def _crescer(self):
+        capacidade = max(2 * len(self._codigos), 16)
+        for nome in ("_codigos", "_precos", "_quantidades"):
+            antigo = getattr(self, nome)
+            novo = np.empty(capacidade, dtype=antigo.dtype)
+            novo[: self._tamanho] = antigo[: self._tamanho]
+            setattr(self, nome, novo)
@@ -0,0 +1,118 @@
+import json
+import unittest
+from ex24 import JSONPullParser, JSONStreamError, items, parse, to_json
+
+DOCUMENTO = (
+    '{"cliente": {"nome": "Jos\\u00e9 \\"Zé\\" \\\\ Silva", "ativo": true},'
+    ' "pedidos": [{"id": 1, "valor": -12.5e1, "tags": ["a", []]},'
+    ' {"id": 2, "valor": 0, "extra": null}], "total": false}'
+).encode("utf-8")
+
+
+class TesteJSONPullParser(unittest.TestCase):
+    def eventos_em_pedacos(self, dados, tamanho):
+        """Eventos do documento entregue em pedaços de `tamanho` bytes"""
+        parser = JSONPullParser()
+        eventos = []
+        for inicio in range(0, len(dados), tamanho):
+            eventos += parser.feed(dados[inicio : inicio + tamanho])
+        return eventos + parser.close()
+
+    def test_divisao_em_qualquer_ponto(self):
+        """Testa o documento dividido em cada posição possível"""
+        esperado = list(parse(DOCUMENTO))
+        for corte in range(1, len(DOCUMENTO)):
+            parser = JSONPullParser()
+            eventos = parser.feed(DOCUMENTO[:corte])
+            eventos += parser.feed(DOCUMENTO[corte:]) + parser.close()
+            self.assertEqual(eventos, esperado, f"corte na posição {corte}")
+
+        # Um byte por vez (inclui caracteres UTF-8 de vários bytes)
+        self.assertEqual(self.eventos_em_pedacos(DOCUMENTO, 1), esperado)
+
+    def test_valores_iguais_ao_json_loads(self):
+        """Testa os objetos reconstruídos contra o json.loads"""
+        esperado = json.loads(DOCUMENTO)
+        self.assertEqual(
+            list(
+                items([DOCUMENTO[i : i + 3] for i in range(0, len(DOCUMENTO), 3)], "")
+            ),
+            [esperado],
+        )
+        self.assertEqual(list(items(to_json(esperado), "")), [esperado])
+
+    def test_string_longa_em_muitos_pedacos(self):
+        """Testa uma string (com escapes) que atravessa muitos pedaços"""
+        texto = 'abc\\"\\\\' * 5000
+        dados = ('["' + texto + '"]').encode()
+        eventos = self.eventos_em_pedacos(dados, 7)
+        self.assertEqual(eventos[1], ("item", "value", json.loads(f'"{texto}"')))
+
+    def test_items_por_prefixo(self):
+        """Testa a seleção de elementos pelo caminho"""
+        self.assertEqual(
+            [pedido["id"] for pedido in items(DOCUMENTO, "pedidos.item")], [1, 2]
+        )
+        self.assertEqual(list(items(DOCUMENTO, "pedidos.item.tags.item")), ["a", []])
+        self.assertEqual(list(items(DOCUMENTO, "cliente.ativo")), [True])
+        self.assertEqual(list(items(DOCUMENTO, "inexistente")), [])
+
+    def test_eventos_aninhados(self):
+        """Testa os prefixos de arrays e objetos aninhados"""
+        eventos = list(parse(b'{"a": [[1], {"b": []}]}'))
+        self.assertEqual(
+            eventos,
+            [
+                ("", "start_object", None),
+                ("", "key", "a"),
+                ("a", "start_array", None),
+                ("a.item", "start_array", None),
+                ("a.item.item", "value", 1),
+                ("a.item", "end_array", None),
+                ("a.item", "start_object", None),
+                ("a.item", "key", "b"),
+                ("a.item.b", "start_array", None),
+                ("a.item.b", "end_array", None),
+                ("a.item", "end_object", None),
+                ("a", "end_array", None),
+                ("", "end_object", None),
+            ],
+        )
+
+    def test_entrada_invalida(self):
+        """Testa que documentos malformados levantam JSONStreamError"""
+        invalidos = [
+            b'{"a" 1}',
+            b'{"a": 1,}',
+            b"[1 2]",
+            b"[1, 2",
+            b'{"a": tru}',
+            b"[01]",
+            b'["sem fim',
+            b'{"a": "\\x"}',
+            b"[1]]",
+            b"",
+        ]
+        for dados in invalidos:
+            with self.assertRaises(JSONStreamError, msg=dados):
+                list(parse(dados))
+
+    def test_caractere_de_controle_em_string(self):
+        """Testa que um caractere de controle cru levanta JSONStreamError"""
+        parser = JSONPullParser()
+        with self.assertRaises(JSONStreamError) as ctx:
+            parser.feed(b'{"nome": "Ana\x01"}')
+        # A posição da string é informada na mensagem
+        self.assertIn("posição 9", str(ctx.exception))
+
+    def test_feed_depois_de_close(self):
+        """Testa o uso do parser depois de fechado"""
+        parser = JSONPullParser()
+        parser.feed(b"[]")
+        parser.close()
+        with self.assertRaises(JSONStreamError):
+            parser.feed(b"[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from inventario_ex22 import EstoqueInsuficienteError, InventarioColunar
+
+
+class TesteInventarioColunar(unittest.TestCase):
+    def setUp(self):
+        """Inventário com três produtos (códigos fora de ordem)"""
+        self.inventario = InventarioColunar(capacidade=4)
+        self.inventario.adicionar("Caneta", 2.5, 30, 10)
+        self.inventario.adicionar("Caderno", 12.0, 10, 5)
+        self.inventario.adicionar("Mochila", 80.0, 20, 2)
+
+    def quantidades(self):
+        return {p.get_codigo(): p.get_quantidade() for p in self.inventario}
+
+    def test_lote_com_um_ajuste_invalido_e_rejeitado(self):
+        """Testa que um ajuste negativo demais rejeita o lote inteiro"""
+        antes = self.quantidades()
+        with self.assertRaises(EstoqueInsuficienteError) as ctx:
+            self.inventario.aplicar_ajustes([(30, -1), (10, 3), (20, -3)])
+        self.assertEqual(ctx.exception.codigos, [20])
+        self.assertEqual(self.quantidades(), antes)
+        self.assertEqual(self.inventario.valor_total(), 25 + 60 + 160)
+
+    def test_deltas_do_mesmo_codigo_sao_somados(self):
+        """Testa que o estoque é validado pela soma dos deltas de um código"""
+        with self.assertRaises(EstoqueInsuficienteError):
+            self.inventario.aplicar_ajustes([(20, -2), (20, -1)])
+        self.inventario.aplicar_ajustes([(20, 5), (20, -7)])
+        self.assertEqual(self.inventario.produto(20).get_quantidade(), 0)
+
+    def test_codigo_desconhecido(self):
+        """Testa códigos inexistentes, no lote e na consulta"""
+        antes = self.quantidades()
+        with self.assertRaises(KeyError):
+            self.inventario.aplicar_ajustes([(10, 1), (99, 1)])
+        with self.assertRaises(KeyError):
+            self.inventario.aplicar_ajustes_arrays([5], [1])
+        with self.assertRaises(KeyError):
+            self.inventario.produto(99)
+        self.assertEqual(self.quantidades(), antes)
+        self.assertNotIn(99, self.inventario)
+
+    def test_ajustes_e_ajustes_arrays_iguais(self):
+        """Testa que as duas formas do lote dão o mesmo resultado"""
+        rng = np.random.default_rng(7)
+        codigos = rng.choice([10, 20, 30], size=50)
+        deltas = rng.integers(0, 5, size=50)
+
+        outro = InventarioColunar()
+        for produto in self.inventario:
+            outro.adicionar_produto(produto)
+
+        self.inventario.aplicar_ajustes(zip(codigos.tolist(), deltas.tolist()))
+        outro.aplicar_ajustes_arrays(codigos, deltas)
+        self.assertEqual(
+            self.quantidades(), {p.get_codigo(): p.get_quantidade() for p in outro}
+        )
+        self.assertAlmostEqual(self.inventario.valor_total(), outro.valor_total())
+
+    def test_valor_total_depois_de_set_preco_e_atualizar_estoque(self):
+        """Testa o valor total mantido pelos métodos herdados de Produto"""
+        caneta = self.inventario.produto(30)
+        caneta.set_preco(3.0)
+        self.assertTrue(caneta.atualizar_estoque(-4))
+        with redirect_stdout(io.StringIO()):
+            self.assertFalse(caneta.atualizar_estoque(-100))
+            caneta.set_preco(-1)
+
+        self.assertEqual(caneta.get_preco(), 3.0)
+        self.assertEqual(caneta.get_quantidade(), 6)
+        esperado = 3.0 * 6 + 12.0 * 5 + 80.0 * 2
+        self.assertAlmostEqual(self.inventario.valor_total(), esperado)
+        self.assertAlmostEqual(self.inventario.recalcular_valor_total(), esperado)
+        self.assertEqual(self.inventario.valor_por_produto()[30], 18.0)
+
+    def test_capacidade_cresce(self):
+        """Testa o cadastro além da capacidade inicial"""
+        for codigo in range(100, 120):
+            self.inventario.adicionar(f"Item {codigo}", 1.0, codigo, 1)
+
+        self.assertEqual(len(self.inventario), 23)
+        self.assertEqual(self.inventario.produto(10).get_nome(), "Caderno")
+        self.assertEqual(self.inventario.produto(119).get_quantidade(), 1)
+        self.inventario.aplicar_ajustes([(119, 4), (30, 1)])
+        self.assertEqual(self.inventario.produto(119).get_quantidade(), 5)
+        self.assertAlmostEqual(self.inventario.valor_total(), 245 + 20 + 4 + 2.5)
+
+    def test_cadastro_invalido(self):
+        """Testa códigos repetidos e valores negativos"""
+        with self.assertRaises(ValueError):
+            self.inventario.adicionar("Outra caneta", 1.0, 30, 1)
+        with self.assertRaises(ValueError):
+            self.inventario.adicionar("Negativo", -1.0, 40, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+"""
+Registro em lote de last_login (User) e last_seen (UserProfile).
+
+Logins e requisições autenticadas só anotam o horário num buffer em
+memória (um dict por usuário, sob um lock). Uma thread do processo grava
+o buffer a cada ACTIVITY_FLUSH_INTERVAL segundos, com um UPDATE ... CASE
+por lote de usuários, e o que restar é gravado na saída do processo.
+Nenhuma escrita fica no caminho da requisição, e como as gravações usam
+QuerySet.update() não disparam os sinais de User (perfil, cache de grupos).
+
+Com ACTIVITY_FLUSH_INTERVAL = 0 cada registro é gravado na hora (sem
+thread), como nos testes (core/test_runner.py).
+"""
+
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import close_old_connections
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+from .models import UserProfile
+
+logger = logging.getLogger(__name__)
+
+# Usuários por UPDATE ... CASE
+FLUSH_BATCH_SIZE = 500
+
+
+def _bulk_update(queryset, key, field, values):
+    """
+    Grava {chave: horário} num UPDATE por lote:
+    UPDATE ... SET field = CASE key WHEN ... THEN ... END WHERE key IN (...)
+    """
+    items = sorted(values.items())
+    for start in range(0, len(items), FLUSH_BATCH_SIZE):
+        lote = items[start : start + FLUSH_BATCH_SIZE]
+        queryset.filter(**{f"{key}__in": [pk for pk, _ in lote]}).update(
+            **{
+                field: Case(
+                    *[When(**{key: pk}, then=Value(momento)) for pk, momento in lote],
+                    output_field=DateTimeField(),
+                )
+            }
+        )
+
+
+class ActivityRecorder:
+    def __init__(self, interval=None, autostart=True):
+        self._lock = threading.Lock()
+        self._logins = {}  # user_id -> last_login
+        self._seen = {}  # user_id -> last_seen
+        self._interval = interval
+        self._autostart = autostart
+        self._wakeup = threading.Event()
+        self._worker = None
+        self._pid = None
+
+    @property
+    def interval(self):
+        if self._interval is not None:
+            return self._interval
+        return getattr(settings, "ACTIVITY_FLUSH_INTERVAL", 5)
+
+    def pending(self):
+        """Quantidade de registros ainda não gravados"""
+        with self._lock:
+            return len(self._logins) + len(self._seen)
+
+    def record_login(self, user_id, momento=None):
+        """Anota um login (também conta como atividade)"""
+        momento = momento or timezone.now()
+        with self._lock:
+            self._logins[user_id] = max(momento, self._logins.get(user_id, momento))
+            self._seen[user_id] = max(momento, self._seen.get(user_id, momento))
+        self._after_record()
+
+    def record_seen(self, user_id, momento=None):
+        """Anota uma requisição autenticada do usuário"""
+        momento = momento or timezone.now()
+        with self._lock:
+            self._seen[user_id] = max(momento, self._seen.get(user_id, momento))
+        self._after_record()
+
+    def _after_record(self):
+        if not self.interval:
+            self.flush()
+        elif self._autostart:
+            self._ensure_worker()
+
+    def flush(self):
+        """
+        Grava o buffer no banco
+
+        Returns:
+            int: Registros gravados
+        """
+        with self._lock:
+            logins, self._logins = self._logins, {}
+            seen, self._seen = self._seen, {}
+        if not logins and not seen:
+            return 0
+
+        try:
+            _bulk_update(User.objects.all(), "pk", "last_login", logins)
+            _bulk_update(UserProfile.objects.all(), "user_id", "last_seen", seen)
+        except Exception:
+            # Devolve ao buffer (sem perder horários mais novos) e tenta de novo
+            # na próxima gravação
+            logger.exception("Falha ao gravar a atividade dos usuários")
+            with self._lock:
+                for pendentes, falhos in ((self._logins, logins), (self._seen, seen)):
+                    for pk, momento in falhos.items():
+                        pendentes[pk] = max(momento, pendentes.get(pk, momento))
+            return 0
+        return len(logins) + len(seen)
+
+    def _ensure_worker(self):
+        # Threads não sobrevivem ao fork: cada processo inicia a sua
+        if self._pid == os.getpid() and self._worker and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._worker and self._worker.is_alive():
+                return
+            self._pid = os.getpid()
+            self._worker = threading.Thread(
+                target=self._run, name="activity-recorder", daemon=True
+            )
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+recorder = ActivityRecorder()
+atexit.register(recorder.flush)
+
+
+def record_login(user):
+    """Anota o login do usuário (e atualiza user.last_login na memória)"""
+    user.last_login = timezone.now()
+    recorder.record_login(user.pk, user.last_login)
+
+
+def record_user_logged_in(sender, request, user, **kwargs):
+    """
+    Receiver de user_logged_in (login por sessão), no lugar do
+    update_last_login do Django (veja AccountsConfig.ready)
+    """
+    record_login(user)
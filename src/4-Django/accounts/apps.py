@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.contrib.auth.signals import user_logged_in
 
 
 class AccountsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "accounts"
+
+    def ready(self):
+        from django.conf import settings
+        from .activity import record_user_logged_in
+
+        if getattr(settings, "JWT_STATELESS_AUTH", False):
+            from .authentication import check_shared_cache
+
+            check_shared_cache()
+
+        # last_login em lote (accounts/activity.py) no lugar do UPDATE
+        # síncrono do django.contrib.auth a cada login
+        user_logged_in.disconnect(dispatch_uid="update_last_login")
+        user_logged_in.connect(record_user_logged_in, dispatch_uid="record_last_login")
@@ -0,0 +1,66 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from clients.cache import cache_backend, is_shared_cache
+from clients.groups import permissions_version
+from .serializers import PERMISSIONS_VERSION_CLAIM
+
+
+class ClaimsUser(TokenUser):
+    """
+    Usuário montado só com as claims do token: os grupos vêm da claim
+    "groups", então get_user_groups() (clients/groups.py) não consulta o
+    banco
+    """
+
+    def __init__(self, token):
+        super().__init__(token)
+        self._group_names = frozenset(token.get("groups", []))
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Autenticação JWT sem consulta ao banco (opt-in, JWT_STATELESS_AUTH)
+
+    O usuário é montado a partir das claims, sem carregar a linha de User.
+    A claim permissions_version é comparada com a versão atual do usuário
+    no cache: quando os grupos (ou is_active/is_staff/is_superuser) mudam,
+    a versão muda e o token é recusado, forçando um refresh que grava as
+    claims novas. Exige um cache compartilhado entre os processos (veja
+    check_shared_cache).
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+            version = validated_token[PERMISSIONS_VERSION_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token sem as claims de permissões"))
+
+        if version != permissions_version(user_id):
+            raise InvalidToken(_("As permissões do usuário mudaram; renove o token"))
+
+        return ClaimsUser(validated_token)
+
+
+def check_shared_cache():
+    """
+    Recusa o modo sem estado (JWT_STATELESS_AUTH) com um cache por processo
+
+    As versões de permissões só existem no cache; num cache compartilhado,
+    uma versão descartada (expulsa pelo backend) só força um refresh dos
+    tokens do usuário, igual em todos os processos.
+
+    Raises:
+        ImproperlyConfigured: Se CACHES["default"] for por processo
+    """
+    # Num cache por processo, cada worker criaria a sua versão de
+    # permissões e recusaria os tokens emitidos pelos outros
+    if not is_shared_cache():
+        raise ImproperlyConfigured(
+            "JWT_STATELESS_AUTH exige um cache compartilhado entre os "
+            f"processos (Redis/Memcached); CACHES['default'] usa {cache_backend()}."
+        )
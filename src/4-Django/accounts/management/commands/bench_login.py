@@ -0,0 +1,106 @@
+import time
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import base_user
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import reverse
+from accounts.activity import recorder
+
+USERNAME = "bench_login"
+PASSWORD = "bench-login-senha"
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede a vazão de logins JWT da API (api_login) num banco de teste "
+        "temporário: logins/s, verificações de senha e consultas por login"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=100,
+            help="Logins cronometrados (padrão: 100)",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=5,
+            help="Logins de aquecimento, fora da medição (padrão: 5)",
+        )
+        parser.add_argument(
+            "--hasher",
+            default=settings.PASSWORD_HASHERS[0],
+            help="Hasher de senha usado na medição (padrão: o primeiro de "
+            "PASSWORD_HASHERS), para comparar execuções com o mesmo custo",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("--requests deve ser maior que zero")
+
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            with override_settings(PASSWORD_HASHERS=[options["hasher"]]):
+                resultado = self.medir(options["requests"], options["warmup"])
+        finally:
+            # Grava o last_login pendente ainda no banco de teste
+            recorder.flush()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        total, segundos, verificacoes, consultas = resultado
+        self.stdout.write(f"Hasher: {options['hasher']}")
+        self.stdout.write(f"{total} logins em {segundos:.2f}s")
+        self.stdout.write(
+            self.style.SUCCESS(f"{total / segundos:.1f} logins/s")
+            + f" ({segundos / total * 1000:.1f} ms por login)"
+        )
+        self.stdout.write(
+            f"Por login: {verificacoes / total:.1f} verificação(ões) de senha, "
+            f"{consultas / total:.1f} consulta(s)"
+        )
+
+    def medir(self, total, aquecimento):
+        """
+        Faz os logins e devolve (total, segundos, verificações de senha,
+        consultas)
+        """
+        User.objects.create_user(username=USERNAME, password=PASSWORD)
+        client = Client()
+        url = reverse("api_login")
+        dados = {"username": USERNAME, "password": PASSWORD}
+
+        def login():
+            response = client.post(url, dados, content_type="application/json")
+            if response.status_code != 200:
+                raise CommandError(f"Login falhou com status {response.status_code}")
+
+        for _ in range(aquecimento):
+            login()
+
+        # Conta as verificações de senha (cada uma paga o custo do hasher)
+        with patch.object(
+            base_user, "check_password", wraps=base_user.check_password
+        ) as check_password, CaptureQueriesContext(connection) as queries:
+            inicio = time.perf_counter()
+            for _ in range(total):
+                login()
+            segundos = time.perf_counter() - inicio
+
+        return total, segundos, check_password.call_count, len(queries)
@@ -0,0 +1,20 @@
+from .activity import recorder
+
+
+class LastSeenMiddleware:
+    """
+    Anota o last_seen dos usuários autenticados (sessão ou JWT) no buffer de
+    accounts/activity.py, sem gravar no banco durante a requisição
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        # Depois da view: o DRF também grava em request.user o usuário do JWT
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated and user.pk:
+            recorder.record_seen(user.pk)
+        return response
@@ -44,6 +44,12 @@ class UserProfile(models.Model):
 
     birth_date = models.DateField(null=True, blank=True, help_text="Data de nascimento")
 
+    last_seen = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Última requisição autenticada (gravada em lote, veja activity.py)",
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -54,6 +60,35 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"Perfil de {self.user.username}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Guarda os valores como estavam no banco, para que has_changes()
+        saiba se há o que gravar
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance._field_values()
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = self._field_values()
+
+    def _field_values(self):
+        return {
+            field.attname: field.value_to_string(self)
+            for field in self._meta.concrete_fields
+            if field.attname not in self.get_deferred_fields()
+        }
+
+    def has_changes(self):
+        """
+        Se algum campo difere do que foi carregado (ou gravado) por último;
+        um perfil que ainda não foi gravado sempre tem alterações
+        """
+        loaded = getattr(self, "_loaded_values", None)
+        return loaded is None or self._field_values() != loaded
+
     @property
     def profile_image_url(self):
         """
@@ -90,11 +125,18 @@ def create_user_profile(sender, instance, created, **kwargs):
 
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
+def save_user_profile(sender, instance, update_fields=None, **kwargs):
     """
     Salva o perfil do usuário quando o usuário é salvo
+
+    Gravações parciais do usuário (ex.: last_login no login) não mexem no
+    perfil, um perfil que não foi carregado nesse objeto não tem o que
+    gravar (hasattr() faria uma consulta só para descobrir isso) e um
+    perfil carregado só é gravado se algum campo dele mudou
     """
-    if hasattr(instance, "profile"):
+    if update_fields is not None:
+        return
+    if User.profile.is_cached(instance) and instance.profile.has_changes():
         instance.profile.save()
 
 
@@ -1,13 +1,40 @@
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth.models import User
 from django.utils.translation import gettext_lazy as _
+from clients.groups import get_user_groups, get_user_permissions, permissions_version
+from .activity import record_login
 from .models import UserProfile
 from PIL import Image
 import io
 from django.core.files.uploadedfile import InMemoryUploadedFile
 
 
+# Claim com a versão das permissões do usuário (clients.groups)
+PERMISSIONS_VERSION_CLAIM = "permissions_version"
+
+
+def add_permission_claims(token, user):
+    """
+    Grava no token os dados de autorização do usuário: flags, grupos,
+    permissões e a versão das permissões (usada pela autenticação sem
+    estado em accounts/authentication.py)
+    """
+    token["is_staff"] = user.is_staff
+    token["is_superuser"] = user.is_superuser
+
+    # Grupos e permissões (as mesmas de /api/auth/permissions/)
+    token["groups"] = sorted(get_user_groups(user))
+    token["permissions"] = get_user_permissions(user)
+    token[PERMISSIONS_VERSION_CLAIM] = permissions_version(user.pk)
+    return token
+
+
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """
     Serializer customizado para JWT token com informações adicionais do usuário
@@ -22,28 +49,15 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         token["email"] = user.email
         token["first_name"] = user.first_name
         token["last_name"] = user.last_name
-        token["is_staff"] = user.is_staff
-        token["is_superuser"] = user.is_superuser
-
-        # Adicionar grupos do usuário
-        token["groups"] = [group.name for group in user.groups.all()]
-
-        # Adicionar permissões específicas
-        permissions = []
-        if user.groups.filter(name="Administradores").exists():
-            permissions = ["all"]
-        elif user.groups.filter(name="Gerentes").exists():
-            permissions = ["read", "write", "update"]
-        elif user.groups.filter(name="Funcionários").exists():
-            permissions = ["read", "update_status"]
 
-        token["permissions"] = permissions
-
-        return token
+        return add_permission_claims(token, user)
 
     def validate(self, attrs):
         data = super().validate(attrs)
 
+        # last_login em lote, fora da requisição (UPDATE_LAST_LOGIN = False)
+        record_login(self.user)
+
         # Adicionar informações do usuário na resposta
         data["user"] = {
             "id": self.user.id,
@@ -52,7 +66,7 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
             "first_name": self.user.first_name,
             "last_name": self.user.last_name,
             "is_staff": self.user.is_staff,
-            "groups": [group.name for group in self.user.groups.all()],
+            "groups": sorted(get_user_groups(self.user)),
             "last_login": self.user.last_login,
             "profile_image": (
                 self.user.profile.profile_image_url
@@ -64,6 +78,52 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         return data
 
 
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh que regrava no novo access token os grupos, as permissões e a
+    versão atuais do usuário (o access token copiaria os do refresh token)
+
+    Refaz o validate() do TokenRefreshSerializer para que o usuário seja
+    carregado uma vez só e as claims entrem no access token antes de ele
+    ser codificado.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        user = None
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM, None)
+        if user_id:
+            user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+            if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+                raise AuthenticationFailed(
+                    self.error_messages["no_active_account"],
+                    "no_active_account",
+                )
+
+        access = refresh.access_token
+        if user is not None:
+            add_permission_claims(access, user)
+        data = {"access": str(access)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:
+                    # Sem o app token_blacklist não há o método blacklist()
+                    pass
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+
+            data["refresh"] = str(refresh)
+
+        return data
+
+
 class UserProfileSerializer(serializers.ModelSerializer):
     """
     Serializer para perfil estendido do usuário
@@ -1,11 +1,25 @@
-from django.test import TestCase, Client
+from django.contrib.auth import base_user
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.core.exceptions import ImproperlyConfigured
+from django.test import RequestFactory, TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User, Group
 from django.urls import reverse
 from django.contrib.messages import get_messages
 from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.test import APITestCase, APIClient
 from unittest.mock import patch
+from clients.api_views import ClientViewSet
+from clients.groups import get_user_groups, get_user_permissions
+from .activity import ActivityRecorder
+from .authentication import StatelessJWTAuthentication, check_shared_cache
+from .models import UserProfile
+from .serializers import CustomTokenObtainPairSerializer, CustomTokenRefreshSerializer
 
 # TESTES PARA VIEWS TRADICIONAIS (TEMPLATES)
 
@@ -437,3 +451,225 @@ class APIAuthTestCase(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["permissions"], ["read", "update_status"])
+
+
+# TESTES PARA A AUTENTICAÇÃO JWT SEM ESTADO
+
+
+class StatelessJWTAuthTestCase(APITestCase):
+    """Testes para a autenticação JWT a partir das claims"""
+
+    def setUp(self):
+        """Configuração inicial para cada teste"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword123"
+        )
+        self.employee_group = Group.objects.create(name="Funcionários")
+        self.manager_group = Group.objects.create(name="Gerentes")
+        self.user.groups.add(self.employee_group)
+        self.refresh = CustomTokenObtainPairSerializer.get_token(self.user)
+
+    def authenticate(self, access):
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access}")
+        return StatelessJWTAuthentication().authenticate(request)
+
+    def test_user_built_from_claims(self):
+        """Testa o usuário montado a partir do token, sem consultas"""
+        access = str(self.refresh.access_token)
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate(access)
+            self.assertEqual(user.pk, self.user.pk)
+            self.assertEqual(get_user_groups(user), {"Funcionários"})
+
+    def test_permission_claims_match_user_permissions(self):
+        """Testa as permissões do token iguais às de get_user_permissions()"""
+        self.assertEqual(self.refresh["permissions"], ["read", "update_status"])
+
+        self.user.groups.add(self.manager_group)
+        token = CustomTokenObtainPairSerializer.get_token(self.user)
+        self.assertEqual(
+            token["permissions"], ["read", "write", "update", "delete_own"]
+        )
+        self.assertEqual(token["permissions"], get_user_permissions(self.user))
+
+    def test_list_without_auth_queries(self):
+        """Testa a listagem da API sem consultar usuários ou grupos"""
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {self.refresh.access_token}"
+        )
+        with patch.object(
+            ClientViewSet, "authentication_classes", [StatelessJWTAuthentication]
+        ), CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/clients/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        sql = " ".join(query["sql"] for query in queries.captured_queries)
+        self.assertNotIn("auth_user", sql)
+        self.assertNotIn("auth_group", sql)
+
+    def test_group_change_forces_refresh(self):
+        """Testa que mudar os grupos recusa o token até o refresh"""
+        self.user.groups.add(self.manager_group)
+        with self.assertRaises(InvalidToken):
+            self.authenticate(str(self.refresh.access_token))
+
+        # Sem rotação: outstand() exige o app token_blacklist
+        serializer = CustomTokenRefreshSerializer(data={"refresh": str(self.refresh)})
+        with patch.object(
+            api_settings, "ROTATE_REFRESH_TOKENS", False
+        ), CaptureQueriesContext(connection) as queries:
+            serializer.is_valid(raise_exception=True)
+        user_queries = [
+            q["sql"]
+            for q in queries.captured_queries
+            if q["sql"].startswith("SELECT") and 'FROM "auth_user"' in q["sql"]
+        ]
+        self.assertEqual(len(user_queries), 1)
+        user, token = self.authenticate(serializer.validated_data["access"])
+        self.assertEqual(token["groups"], ["Funcionários", "Gerentes"])
+        self.assertEqual(get_user_groups(user), {"Funcionários", "Gerentes"})
+
+    def test_stateless_auth_requires_shared_cache(self):
+        """Testa a recusa do modo sem estado com um cache por processo"""
+        with self.assertRaises(ImproperlyConfigured):
+            check_shared_cache()
+
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+        with override_settings(CACHES=redis):
+            check_shared_cache()
+
+    def test_refresh_rejects_inactive_user(self):
+        """Testa o refresh recusado para um usuário desativado"""
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        serializer = CustomTokenRefreshSerializer(data={"refresh": str(self.refresh)})
+        with patch.object(api_settings, "ROTATE_REFRESH_TOKENS", False):
+            with self.assertRaises(AuthenticationFailed):
+                serializer.is_valid(raise_exception=True)
+
+
+class LoginFlowTestCase(APITestCase):
+    """Testes para o custo do login da API"""
+
+    def setUp(self):
+        """Configuração inicial para cada teste"""
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword123"
+        )
+
+    def test_login_hashes_once_and_skips_profile(self):
+        """Testa o login com uma verificação de senha e um UPDATE de last_login"""
+        with patch.object(
+            base_user, "check_password", wraps=base_user.check_password
+        ) as check_password, CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("api_login"),
+                {"username": "testuser", "password": "testpassword123"},
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(check_password.call_count, 1)
+        updates = [
+            q["sql"]
+            for q in queries.captured_queries
+            if q["sql"].startswith('UPDATE "auth_user"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"last_login"', updates[0])
+
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+    def test_user_save_writes_profile_only_when_changed(self):
+        """Testa o save do usuário sem regravar um perfil carregado e inalterado"""
+
+        def profile_updates(queries):
+            return [
+                q["sql"]
+                for q in queries.captured_queries
+                if q["sql"].startswith('UPDATE "accounts_userprofile"')
+            ]
+
+        user = User.objects.select_related("profile").get(pk=self.user.pk)
+        user.first_name = "Test"
+        with CaptureQueriesContext(connection) as queries:
+            user.save()
+        self.assertEqual(profile_updates(queries), [])
+
+        user.profile.bio = "Nova biografia"
+        with CaptureQueriesContext(connection) as queries:
+            user.save()
+        self.assertEqual(len(profile_updates(queries)), 1)
+        self.assertEqual(UserProfile.objects.get(user=user).bio, "Nova biografia")
+
+        # Depois de gravado, o perfil volta a não ter alterações
+        with CaptureQueriesContext(connection) as queries:
+            user.save()
+        self.assertEqual(profile_updates(queries), [])
+
+
+class ActivityRecorderTestCase(APITestCase):
+    """Testes para a gravação em lote de last_login/last_seen"""
+
+    def setUp(self):
+        """Configuração inicial para cada teste"""
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword123"
+        )
+        self.other = User.objects.create_user(
+            username="otheruser", password="testpassword123"
+        )
+        self.recorder = ActivityRecorder(interval=60, autostart=False)
+        for target in ("accounts.activity.recorder", "accounts.middleware.recorder"):
+            patcher = patch(target, self.recorder)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def updates(self, queries):
+        """UPDATEs de usuários e perfis (a sessão do login é gravada à parte)"""
+        return [
+            q["sql"]
+            for q in queries.captured_queries
+            if q["sql"].startswith(
+                ('UPDATE "auth_user"', 'UPDATE "accounts_userprofile"')
+            )
+        ]
+
+    def test_logins_are_buffered_and_flushed_in_bulk(self):
+        """Testa logins (JWT e sessão) sem escrita na requisição e o flush em lote"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("api_login"),
+                {"username": "testuser", "password": "testpassword123"},
+            )
+            self.assertTrue(
+                self.client.login(username="otheruser", password="testpassword123")
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.updates(queries), [])
+        self.assertEqual(self.recorder.pending(), 4)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.recorder.flush(), 4)
+        updates = self.updates(queries)
+        self.assertEqual(len(updates), 2)
+        self.assertTrue(all("CASE" in sql for sql in updates))
+
+        for user in (self.user, self.other):
+            user.refresh_from_db()
+            self.assertIsNotNone(user.last_login)
+            self.assertEqual(user.profile.last_seen, user.last_login)
+        self.assertEqual(self.recorder.flush(), 0)
+
+    def test_failed_flush_keeps_entries(self):
+        """Testa que uma falha na gravação devolve os registros ao buffer"""
+        self.recorder.record_seen(self.user.pk)
+        with patch(
+            "accounts.activity._bulk_update", side_effect=DatabaseError
+        ), self.assertLogs("accounts.activity", "ERROR"):
+            self.assertEqual(self.recorder.flush(), 0)
+        self.assertEqual(self.recorder.pending(), 1)
+
+        self.assertEqual(self.recorder.flush(), 1)
+        self.user.profile.refresh_from_db()
+        self.assertIsNotNone(self.user.profile.last_seen)
@@ -100,9 +100,8 @@ from rest_framework_simplejwt.tokens import RefreshToken, TokenError
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.utils.crypto import get_random_string
 from django.core.mail import send_mail
-from django.utils import timezone
 from django.conf import settings
-from django.contrib.auth import authenticate
+from clients.groups import get_user_groups, get_user_permissions
 from .models import UserProfile
 from .serializers import (
     CustomTokenObtainPairSerializer,
@@ -125,18 +124,12 @@ class CustomTokenObtainPairView(TokenObtainPairView):
 
     def post(self, request, *args, **kwargs):
         try:
+            # O serializer autentica (um único hash da senha) e anota o
+            # last_login no ActivityRecorder (accounts/activity.py), que o
+            # grava em lote fora da requisição
             response = super().post(request, *args, **kwargs)
 
             if response.status_code == 200:
-                # Log do login bem-sucedido
-                user = authenticate(
-                    username=request.data.get("username"),
-                    password=request.data.get("password"),
-                )
-                if user:
-                    user.last_login = timezone.now()
-                    user.save(update_fields=["last_login"])
-
                 # Adicionar informações extras na resposta
                 response.data["message"] = "Login realizado com sucesso"
                 response.data["expires_in"] = settings.SIMPLE_JWT[
@@ -573,25 +566,9 @@ def user_info(request):
             "last_name": user.last_name,
             "is_staff": user.is_staff,
             "is_superuser": user.is_superuser,
-            "groups": [group.name for group in user.groups.all()],
+            "groups": sorted(get_user_groups(user)),
             "permissions": get_user_permissions(user),
             "last_login": user.last_login,
             "date_joined": user.date_joined,
         }
     )
-
-
-def get_user_permissions(user):
-    """
-    Função auxiliar para obter permissões do usuário
-    """
-    permissions = []
-
-    if user.groups.filter(name="Administradores").exists():
-        permissions = ["all"]
-    elif user.groups.filter(name="Gerentes").exists():
-        permissions = ["read", "write", "update", "delete_own"]
-    elif user.groups.filter(name="Funcionários").exists():
-        permissions = ["read", "update_status"]
-
-    return permissions
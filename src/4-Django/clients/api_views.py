@@ -2,13 +2,19 @@ from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.pagination import PageNumberPagination
 from django_filters.rest_framework import DjangoFilterBackend
 from django.contrib.auth.models import User, Group
-from django.db.models import Count, Sum
+from django.conf import settings
+from django.db.models import Count, F, Q, Sum
 from django.utils import timezone
+from . import charts
+from .autocomplete import client_index
+from .cache import get_or_compute
+from .filters import FullTextSearchFilter, RankedOrderingFilter
+from .export import keyset_rows, ndjson_response, parse_export_cursor
 from .models import Client
-from order.models import Pedido
+from order.dates import filtrar_periodo, q_periodo
+from order.models import STATUS_EM_ABERTO, Pedido
 from .serializers import (
     ClientListSerializer,
     ClientStatsSerializer,
@@ -18,17 +24,10 @@ from .serializers import (
     GroupSerializer,
     DashboardStatsSerializer,
 )
+from .pagination import OptionalCursorPagination, StandardResultsSetPagination
 from .permissions import GroupPermission
 
 
-class StandardResultsSetPagination(PageNumberPagination):
-    """Paginação padrão para a API"""
-
-    page_size = 20
-    page_size_query_param = "page_size"
-    max_page_size = 100
-
-
 class ClientViewSet(viewsets.ModelViewSet):
     """
     ViewSet para gerenciamento de clientes
@@ -43,20 +42,31 @@ class ClientViewSet(viewsets.ModelViewSet):
     - pedidos: Listar pedidos de um cliente
     - stats: Estatísticas de clientes
     - bulk_delete: Exclusão em lote (Admin apenas)
+    - autocomplete: Sugestões de clientes por prefixo
+    - export: Exportação completa em NDJSON por cursor
     """
 
     queryset = Client.objects.all()
     permission_classes = [IsAuthenticated, GroupPermission]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = OptionalCursorPagination
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter,
+        FullTextSearchFilter,
+        RankedOrderingFilter,
     ]
     filterset_fields = ["age"]
+    search_index = "clients"
     search_fields = ["name", "email"]
-    ordering_fields = ["name", "email", "age", "created_at"]
-    ordering = ["name"]
+    ordering_fields = [
+        "name",
+        "email",
+        "age",
+        "created_at",
+        "total_pedidos",
+        "valor_total_pedidos",
+    ]
+    ordering = ["name", "id"]
+    export_fields = ["id", "name", "email", "age", "created_at", "updated_at"]
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -135,16 +145,46 @@ class ClientViewSet(viewsets.ModelViewSet):
         stats = Client.get_age_statistics()
 
         # Estatísticas por faixa etária
-        age_groups = {}
-        for client in Client.objects.all():
-            group = client.get_age_group()
-            age_groups[group] = age_groups.get(group, 0) + 1
-
-        stats["age_groups"] = age_groups
+        stats["age_groups"] = Client.get_age_group_statistics()
 
         serializer = ClientStatsSerializer(stats)
         return Response(serializer.data)
 
+    @action(detail=False, methods=["get"])
+    def autocomplete(self, request):
+        """
+        Sugestões de clientes por prefixo do nome (ou de uma palavra do
+        nome) ou do email, sem acentos nem diferença de maiúsculas
+        GET /api/clients/autocomplete/?q=joa&limit=10
+        """
+        try:
+            limit = min(int(request.query_params.get("limit", 10)), 50)
+        except ValueError:
+            limit = 10
+        return Response(client_index.search(request.query_params.get("q", ""), limit))
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Exportação completa em NDJSON (um cliente por linha), sem paginação
+        GET /api/clients/export/?since=2024-01-01T00:00:00Z&after_id=10
+
+        Ordenada por (updated_at, id); para uma carga incremental, repita com
+        since/after_id iguais ao updated_at/id da última linha recebida.
+        """
+        try:
+            since, after_id = parse_export_cursor(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = keyset_rows(
+            self.filter_queryset(self.get_queryset()),
+            self.export_fields,
+            since=since,
+            after_id=after_id,
+        )
+        return ndjson_response(rows)
+
     @action(detail=False, methods=["post"])
     def bulk_delete(self, request):
         """
@@ -222,24 +262,13 @@ class DashboardViewSet(viewsets.ViewSet):
         """
         # Estatísticas de clientes
         client_stats = Client.get_age_statistics()
-        age_groups = {}
-        for client in Client.objects.all():
-            group = client.get_age_group()
-            age_groups[group] = age_groups.get(group, 0) + 1
-        client_stats["age_groups"] = age_groups
+        client_stats["age_groups"] = Client.get_age_group_statistics()
 
         # Estatísticas de pedidos
         revenue_stats = Pedido.get_revenue_statistics()
         status_stats = Pedido.get_status_statistics()
-        priority_stats = dict(
-            Pedido.objects.values("prioridade")
-            .annotate(count=Count("id"))
-            .values_list("prioridade", "count")
-        )
-        overdue_count = Pedido.objects.filter(
-            data_entrega_prevista__lt=timezone.now().date(),
-            status__in=["pendente", "processando", "enviado"],
-        ).count()
+        priority_stats = Pedido.get_priority_statistics()
+        overdue_count = Pedido.objects.atrasados().count()
 
         pedido_stats = {
             "total_orders": revenue_stats["total_orders"],
@@ -258,11 +287,9 @@ class DashboardViewSet(viewsets.ViewSet):
         )[:10]
 
         # Top 5 clientes por valor total de pedidos
-        top_clients = (
-            Client.objects.annotate(total_spent=Sum("pedidos__valor_total"))
-            .filter(total_spent__gt=0)
-            .order_by("-total_spent")[:5]
-        )
+        top_clients = Client.objects.filter(valor_total_pedidos__gt=0).order_by(
+            "-valor_total_pedidos"
+        )[:5]
 
         dashboard_data = {
             "client_stats": client_stats,
@@ -280,65 +307,70 @@ class DashboardViewSet(viewsets.ViewSet):
         Estatísticas rápidas para widgets do dashboard
         GET /api/dashboard/quick_stats/
         """
-        today = timezone.now().date()
-        current_month = timezone.now().replace(day=1).date()
+        # Dia no fuso atual, o mesmo dos intervalos de q_periodo
+        today = timezone.localdate()
+        timeout = getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 10)
+
+        # Várias abas do dashboard fazendo polling disparam um único cálculo
+        stats = get_or_compute(
+            f"dashboard:quick_stats:{today}",
+            lambda: self._compute_quick_stats(today),
+            timeout,
+        )
+
+        return Response(stats)
+
+    @staticmethod
+    def _compute_quick_stats(today):
+        """
+        Calcula as estatísticas rápidas com duas agregações sobre Pedido
+        (Count/Sum condicionais): a da tabela inteira e a do mês atual, que
+        lê só o intervalo do índice de data_pedido; e uma contagem de clientes
+        """
+        current_month = today.replace(day=1)
+        stats = Pedido.objects.aggregate(
+            total_orders=Count("id"),
+            overdue_orders=Count(
+                "id",
+                filter=Q(
+                    data_entrega_prevista__lt=today,
+                    status__in=STATUS_EM_ABERTO,
+                ),
+            ),
+            pending_orders=Count("id", filter=Q(status="pendente")),
+            total_revenue=Sum("valor_total", filter=Q(status="entregue")),
+        )
+        stats.update(
+            filtrar_periodo(Pedido.objects.all(), current_month).aggregate(
+                orders_today=Count("id", filter=q_periodo(today, today)),
+                orders_this_month=Count("id"),
+                monthly_revenue=Sum("valor_total", filter=Q(status="entregue")),
+            )
+        )
 
-        # Estatísticas rápidas
-        stats = {
+        return {
             "total_clients": Client.objects.count(),
-            "total_orders": Pedido.objects.count(),
-            "orders_today": Pedido.objects.filter(data_pedido__date=today).count(),
-            "orders_this_month": Pedido.objects.filter(
-                data_pedido__date__gte=current_month
-            ).count(),
-            "overdue_orders": Pedido.objects.filter(
-                data_entrega_prevista__lt=today,
-                status__in=["pendente", "processando", "enviado"],
-            ).count(),
-            "pending_orders": Pedido.objects.filter(status="pendente").count(),
-            "total_revenue": Pedido.objects.filter(status="entregue").aggregate(
-                total=Sum("valor_total")
-            )["total"]
-            or 0,
-            "monthly_revenue": Pedido.objects.filter(
-                data_pedido__date__gte=current_month, status="entregue"
-            ).aggregate(total=Sum("valor_total"))["total"]
-            or 0,
+            "total_orders": stats["total_orders"],
+            "orders_today": stats["orders_today"],
+            "orders_this_month": stats["orders_this_month"],
+            "overdue_orders": stats["overdue_orders"],
+            "pending_orders": stats["pending_orders"],
+            "total_revenue": stats["total_revenue"] or 0,
+            "monthly_revenue": stats["monthly_revenue"] or 0,
         }
 
-        return Response(stats)
-
     @action(detail=False, methods=["get"])
     def charts_data(self, request):
         """
         Dados para gráficos do dashboard
         GET /api/dashboard/charts_data/
         """
-        from datetime import datetime, timedelta
-        from django.db.models import Count, Sum
-        from django.db.models.functions import TruncDate, TruncMonth
-
-        # Gráfico de pedidos dos últimos 30 dias
-        thirty_days_ago = timezone.now().date() - timedelta(days=30)
-        daily_orders = (
-            Pedido.objects.filter(data_pedido__date__gte=thirty_days_ago)
-            .extra({"date": "date(data_pedido)"})
-            .values("date")
-            .annotate(count=Count("id"), revenue=Sum("valor_total"))
-            .order_by("date")
-        )
+        # Dia no fuso atual, o mesmo dos buckets de TruncDate/TruncMonth
+        today = timezone.localdate()
 
-        # Gráfico de receita mensal dos últimos 12 meses
-        twelve_months_ago = timezone.now().replace(day=1).date() - timedelta(days=365)
-        monthly_revenue = (
-            Pedido.objects.filter(
-                data_pedido__date__gte=twelve_months_ago, status="entregue"
-            )
-            .extra({"month": "DATE_FORMAT(data_pedido, '%%Y-%%m')"})
-            .values("month")
-            .annotate(revenue=Sum("valor_total"), orders=Count("id"))
-            .order_by("month")
-        )
+        # Séries sem lacunas; dias e meses encerrados vêm do cache
+        daily_orders = charts.daily_orders(today, days=30)
+        monthly_revenue = charts.monthly_revenue(today, months=12)
 
         # Distribuição por status
         status_distribution = dict(
@@ -356,17 +388,19 @@ class DashboardViewSet(viewsets.ViewSet):
 
         # Top 10 clientes por valor
         top_clients_data = (
-            Client.objects.annotate(
-                total_spent=Sum("pedidos__valor_total"), total_orders=Count("pedidos")
+            Client.objects.filter(valor_total_pedidos__gt=0)
+            .order_by("-valor_total_pedidos")[:10]
+            .values(
+                "id",
+                "name",
+                total_spent=F("valor_total_pedidos"),
+                total_orders=F("total_pedidos"),
             )
-            .filter(total_spent__gt=0)
-            .order_by("-total_spent")[:10]
-            .values("id", "name", "total_spent", "total_orders")
         )
 
         charts_data = {
-            "daily_orders": list(daily_orders),
-            "monthly_revenue": list(monthly_revenue),
+            "daily_orders": daily_orders,
+            "monthly_revenue": monthly_revenue,
             "status_distribution": status_distribution,
             "priority_distribution": priority_distribution,
             "top_clients": list(top_clients_data),
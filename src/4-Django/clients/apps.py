@@ -1,6 +1,47 @@
 from django.apps import AppConfig
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_migrate,
+    post_save,
+)
 
 
 class ClientsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "clients"
+
+    def ready(self):
+        from django.contrib.auth.models import Group, User
+        from .search import create_indexes
+        from .signals import (
+            group_saved_or_deleted,
+            user_groups_changed,
+            user_initialized,
+            user_saved_or_deleted,
+        )
+
+        # Tabelas FTS5 da busca (clientes e pedidos) após o migrate
+        post_migrate.connect(create_indexes, sender=self)
+
+        # Cache de grupos e versão de permissões dos JWTs (clients/groups.py)
+        m2m_changed.connect(
+            user_groups_changed,
+            sender=User.groups.through,
+            dispatch_uid="clients_user_groups_changed",
+        )
+        post_init.connect(
+            user_initialized, sender=User, dispatch_uid="clients_user_initialized"
+        )
+        for signal in (post_save, post_delete):
+            signal.connect(
+                user_saved_or_deleted,
+                sender=User,
+                dispatch_uid="clients_user_saved_or_deleted",
+            )
+            signal.connect(
+                group_saved_or_deleted,
+                sender=Group,
+                dispatch_uid="clients_group_saved_or_deleted",
+            )
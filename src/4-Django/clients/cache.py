@@ -0,0 +1,113 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Backends em que cada processo tem (ou não tem) os seus próprios valores
+PER_PROCESS_CACHE_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+# Locks por chave distribuídos em faixas fixas (quantidade limitada de locks)
+_LOCK_STRIPES = [threading.Lock() for _ in range(64)]
+_MISSING = object()
+
+
+def _lock_for(key):
+    return _LOCK_STRIPES[hash(key) % len(_LOCK_STRIPES)]
+
+
+def cache_backend():
+    """Backend de CACHES["default"]"""
+    return settings.CACHES.get("default", {}).get("BACKEND")
+
+
+def is_shared_cache():
+    """Se o cache padrão é compartilhado entre os processos (Redis/Memcached)"""
+    return cache_backend() not in PER_PROCESS_CACHE_BACKENDS
+
+
+def get_or_compute(key, compute, timeout, wait=5.0):
+    """
+    Retorna o valor em cache ou calcula uma única vez por chave.
+
+    Requisições simultâneas pela mesma chave são agrupadas: dentro do
+    processo, só uma thread calcula enquanto as outras esperam o lock;
+    entre processos, cache.add() funciona como uma reserva, e quem não
+    conseguiu a reserva aguarda o valor aparecer no cache (até `wait`
+    segundos, depois calcula por conta própria).
+
+    Args:
+        key (str): Chave do cache
+        compute: Função sem argumentos que calcula o valor
+        timeout (int): Validade do valor em segundos (None = sem expiração)
+        wait (float): Tempo máximo de espera por outro processo
+
+    Returns:
+        O valor em cache ou o recém-calculado
+    """
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    with _lock_for(key):
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        lease_key = f"{key}:computing"
+        leased = cache.add(lease_key, True, timeout=int(wait) + 1)
+        if not leased:
+            # Outro processo está calculando: aguarda o resultado
+            deadline = time.monotonic() + wait
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                value = cache.get(key, _MISSING)
+                if value is not _MISSING:
+                    return value
+
+        try:
+            value = compute()
+            cache.set(key, value, timeout)
+        finally:
+            if leased:
+                cache.delete(lease_key)
+        return value
+
+
+def list_version(namespace):
+    """
+    Versão atual dos valores em cache de uma listagem (ex.: "pedidos").
+
+    As chaves das listagens incluem a versão; invalidate_list() troca a
+    versão e todas as chaves antigas deixam de ser usadas (expiram sozinhas).
+    """
+    key = f"{namespace}:version"
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def invalidate_list(namespace):
+    """Descarta contagens e estatísticas em cache de uma listagem."""
+    cache.set(f"{namespace}:version", time.time_ns(), timeout=None)
+
+
+def queryset_cache_key(namespace, queryset, suffix):
+    """
+    Chave de cache para um valor calculado sobre o queryset filtrado.
+
+    Ordenação e select_related são descartados, então os mesmos filtros
+    (em qualquer ordem na URL) geram a mesma chave.
+    """
+    sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    digest = hashlib.md5(
+        f"{sql}|{params!r}".encode(), usedforsecurity=False
+    ).hexdigest()
+    return f"{namespace}:{list_version(namespace)}:{suffix}:{digest}"
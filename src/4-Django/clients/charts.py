@@ -0,0 +1,190 @@
+"""
+Séries temporais dos gráficos do dashboard.
+
+Dias e meses já encerrados não mudam mais (exceto quando um pedido antigo
+é alterado, o que invalida o seu bucket via sinal em order/models.py, ou
+em lote, via PedidoQuerySet.update), então ficam no cache por
+DASHBOARD_CHARTS_CACHE_TIMEOUT segundos. A invalidação só alcança o cache
+do processo que gravou o pedido quando o backend é por processo
+(LocMemCache); a validade limita por quanto tempo os outros processos
+servem o valor antigo. A cada requisição só o bucket atual (hoje / mês
+corrente) é consultado no banco.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from order.dates import inicio_do_dia, parse_data
+
+DAILY_KEY = "dashboard:charts:daily:{}"
+MONTHLY_KEY = "dashboard:charts:monthly:{}"
+
+
+def _as_date(value):
+    """
+    Normaliza para date no fuso atual, o mesmo de TruncDate/TruncMonth
+    (TruncMonth sobre DateTimeField devolve datetime, e data_pedido vem
+    do banco em UTC).
+    """
+    return parse_data(value)
+
+
+def _next_month(month):
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _last_months(month, count):
+    """Primeiros dias dos `count` meses terminando em `month` (inclusive)."""
+    months = [month]
+    for _ in range(count - 1):
+        months.append((months[-1] - timedelta(days=1)).replace(day=1))
+    return months[::-1]
+
+
+def _daily_buckets(start, end):
+    """
+    Pedidos e receita por dia no intervalo [start, end)
+
+    Returns:
+        dict: date -> {"count", "revenue"}
+    """
+    from order.models import Pedido
+
+    rows = (
+        Pedido.objects.filter(
+            data_pedido__gte=inicio_do_dia(start), data_pedido__lt=inicio_do_dia(end)
+        )
+        .annotate(day=TruncDate("data_pedido"))
+        .values("day")
+        .annotate(count=Count("id"), revenue=Sum("valor_total"))
+        .order_by()
+    )
+    return {
+        row["day"]: {"count": row["count"], "revenue": row["revenue"]} for row in rows
+    }
+
+
+def _monthly_buckets(start, end):
+    """
+    Receita e pedidos entregues por mês no intervalo [start, end)
+
+    Returns:
+        dict: date (primeiro dia do mês) -> {"revenue", "orders"}
+    """
+    from order.models import Pedido
+
+    rows = (
+        Pedido.objects.filter(
+            data_pedido__gte=inicio_do_dia(start),
+            data_pedido__lt=inicio_do_dia(end),
+            status="entregue",
+        )
+        .annotate(month=TruncMonth("data_pedido"))
+        .values("month")
+        .annotate(revenue=Sum("valor_total"), orders=Count("id"))
+        .order_by()
+    )
+    return {
+        _as_date(row["month"]): {"revenue": row["revenue"], "orders": row["orders"]}
+        for row in rows
+    }
+
+
+def _series(buckets, end, key_format, fetch, empty):
+    """
+    Monta uma série completa (sem lacunas) a partir do cache.
+
+    Args:
+        buckets (list): Início de cada bucket, em ordem; o último é o atual
+        end: Início do bucket seguinte ao atual (fim do intervalo)
+        key_format (str): Formato da chave de cache de um bucket
+        fetch: Função (start, end) -> {bucket: valores}
+        empty (dict): Valores de um bucket sem pedidos
+
+    Returns:
+        list: Pares (bucket, valores)
+    """
+    closed = buckets[:-1]
+    keys = {bucket: key_format.format(bucket.isoformat()) for bucket in closed}
+    cached = cache.get_many(keys.values())
+
+    missing = [bucket for bucket in closed if keys[bucket] not in cached]
+    if missing:
+        # Uma consulta cobre todos os buckets encerrados que faltam
+        computed = fetch(missing[0], buckets[-1])
+        new_values = {keys[bucket]: computed.get(bucket, empty) for bucket in missing}
+        timeout = getattr(settings, "DASHBOARD_CHARTS_CACHE_TIMEOUT", 300)
+        cache.set_many(new_values, timeout=timeout)
+        cached.update(new_values)
+
+    current_values = fetch(buckets[-1], end).get(buckets[-1], empty)
+    return [(bucket, cached[keys[bucket]]) for bucket in closed] + [
+        (buckets[-1], current_values)
+    ]
+
+
+def daily_orders(today, days=30):
+    """
+    Pedidos e receita de cada dia, de `days` dias atrás até hoje.
+
+    Returns:
+        list: [{"date", "count", "revenue"}, ...] com todos os dias
+    """
+    buckets = [today - timedelta(days=offset) for offset in range(days, -1, -1)]
+    series = _series(
+        buckets,
+        today + timedelta(days=1),
+        DAILY_KEY,
+        _daily_buckets,
+        {"count": 0, "revenue": None},
+    )
+    return [
+        {
+            "date": day.isoformat(),
+            "count": values["count"],
+            "revenue": values["revenue"] or Decimal("0.00"),
+        }
+        for day, values in series
+    ]
+
+
+def monthly_revenue(today, months=12):
+    """
+    Receita e pedidos entregues de cada um dos últimos `months` meses
+    (incluindo o mês corrente).
+
+    Returns:
+        list: [{"month": "YYYY-MM", "revenue", "orders"}, ...] com todos os meses
+    """
+    current_month = today.replace(day=1)
+    buckets = _last_months(current_month, months)
+    series = _series(
+        buckets,
+        _next_month(current_month),
+        MONTHLY_KEY,
+        _monthly_buckets,
+        {"revenue": None, "orders": 0},
+    )
+    return [
+        {
+            "month": month.strftime("%Y-%m"),
+            "revenue": values["revenue"] or Decimal("0.00"),
+            "orders": values["orders"],
+        }
+        for month, values in series
+    ]
+
+
+def invalidate_buckets(moment):
+    """Remove do cache o dia e o mês de um pedido (data_pedido)."""
+    day = _as_date(moment)
+    cache.delete_many(
+        [
+            DAILY_KEY.format(day.isoformat()),
+            MONTHLY_KEY.format(day.replace(day=1).isoformat()),
+        ]
+    )
@@ -0,0 +1,11 @@
+from django.utils.functional import SimpleLazyObject
+from .groups import get_user_groups
+
+
+def user_groups(request):
+    """
+    Nomes dos grupos do usuário logado (user_groups) para os templates,
+    resolvidos só se usados e em cache (veja clients/groups.py)
+    """
+    user = getattr(request, "user", None)
+    return {"user_groups": SimpleLazyObject(lambda: sorted(get_user_groups(user)))}
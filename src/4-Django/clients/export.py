@@ -0,0 +1,201 @@
+"""
+Exportação em streaming (CSV e NDJSON).
+
+As linhas são geradas e enviadas uma a uma, então a memória usada não
+depende da quantidade de registros exportados.
+"""
+
+import csv
+import datetime
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+# Linhas lidas do banco por vez nos querysets exportados
+EXPORT_CHUNK_SIZE = 2000
+
+# Bytes acumulados antes de enviar um bloco compactado
+GZIP_FLUSH_SIZE = 64 * 1024
+
+
+class Echo:
+    """Pseudo-arquivo: write() devolve a linha em vez de guardá-la."""
+
+    def write(self, value):
+        return value
+
+
+def formato_brasileiro(valor):
+    """Formata um número com duas casas e vírgula decimal (ex.: 10,50)."""
+    return f"{valor or 0:.2f}".replace(".", ",")
+
+
+def csv_rows(header, rows):
+    """
+    Gera o CSV linha a linha (BOM, cabeçalho e dados), separado por ";".
+
+    Args:
+        header (list): Nomes das colunas
+        rows: Iterável de listas de valores
+    """
+    writer = csv.writer(Echo(), delimiter=";")
+    # BOM para UTF-8 (compatibilidade com Excel)
+    yield "\ufeff"
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def gzip_stream(chunks):
+    """
+    Compacta um fluxo de textos em gzip sem montar o arquivo inteiro.
+
+    Os dados são enviados em blocos de até GZIP_FLUSH_SIZE bytes
+    compactados; o compressor mantém o dicionário entre os blocos.
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)  # cabeçalho gzip
+    pendente = 0
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        pendente += len(chunk)
+        if pendente >= GZIP_FLUSH_SIZE:
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pendente = 0
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def streaming_csv_response(filename, header, rows, compress=False):
+    """
+    Args:
+        filename (str): Nome do arquivo anexado
+        header (list): Nomes das colunas
+        rows: Iterável de listas de valores
+        compress (bool): Envia o CSV compactado em gzip (filename + ".gz")
+
+    Returns:
+        StreamingHttpResponse: Resposta com o CSV como anexo
+    """
+    if compress:
+        response = StreamingHttpResponse(
+            gzip_stream(csv_rows(header, rows)), content_type="application/gzip"
+        )
+        filename += ".gz"
+    else:
+        response = StreamingHttpResponse(
+            csv_rows(header, rows), content_type="text/csv; charset=utf-8"
+        )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def parse_export_cursor(params):
+    """
+    Lê o cursor de uma exportação incremental.
+
+    Parâmetros aceitos:
+        since: updated_at (ISO 8601) a partir do qual exportar (inclusive)
+        after_id: com since, retoma exatamente após o registro (since, after_id)
+
+    Returns:
+        tuple: (since, after_id), ambos podendo ser None
+
+    Raises:
+        ValueError: Se algum parâmetro for inválido
+    """
+    since = params.get("since")
+    after_id = params.get("after_id")
+
+    if since:
+        try:
+            since = parse_datetime(since)
+        except ValueError:
+            since = None
+        if since is None:
+            raise ValueError("Parâmetro 'since' deve ser uma data/hora ISO 8601.")
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+    else:
+        since = None
+
+    if after_id:
+        if since is None:
+            raise ValueError("Parâmetro 'after_id' exige 'since'.")
+        try:
+            after_id = int(after_id)
+        except ValueError:
+            raise ValueError("Parâmetro 'after_id' deve ser um número inteiro.")
+    else:
+        after_id = None
+
+    return since, after_id
+
+
+def keyset_rows(queryset, fields, since=None, after_id=None, batch_size=None):
+    """
+    Percorre o queryset em ordem de (updated_at, id) por cursor (keyset).
+
+    Cada lote é uma consulta "WHERE (updated_at, id) > último ... LIMIT",
+    sem OFFSET, então o custo por lote não cresce com o avanço da
+    exportação. Registros alterados durante a exportação são reenviados
+    mais adiante (com o novo updated_at).
+
+    Args:
+        queryset: Queryset do modelo (precisa ter updated_at)
+        fields (list): Campos exportados (values())
+        since (datetime): Exporta apenas updated_at >= since
+        after_id (int): Com since, começa após o registro (since, after_id)
+        batch_size (int): Registros por consulta
+
+    Yields:
+        dict: Valores de cada registro
+    """
+    batch_size = batch_size or EXPORT_CHUNK_SIZE
+    fields = list(dict.fromkeys([*fields, "id", "updated_at"]))
+    queryset = queryset.order_by("updated_at", "id").values(*fields)
+
+    if since is not None and after_id is None:
+        queryset = queryset.filter(updated_at__gte=since)
+        since = None
+
+    while True:
+        lote = queryset
+        if since is not None:
+            lote = lote.filter(
+                Q(updated_at__gt=since) | Q(updated_at=since, id__gt=after_id)
+            )
+        lote = list(lote[:batch_size])
+        yield from lote
+        if len(lote) < batch_size:
+            return
+        since, after_id = lote[-1]["updated_at"], lote[-1]["id"]
+
+
+class ExportJSONEncoder(DjangoJSONEncoder):
+    """
+    Mantém os microssegundos das datas (o DjangoJSONEncoder corta em
+    milissegundos), para que updated_at possa ser usado como cursor.
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def ndjson_response(rows):
+    """
+    Returns:
+        StreamingHttpResponse: Um objeto JSON por linha (application/x-ndjson)
+    """
+    lines = (
+        json.dumps(row, cls=ExportJSONEncoder, ensure_ascii=False) + "\n"
+        for row in rows
+    )
+    return StreamingHttpResponse(lines, content_type="application/x-ndjson")
@@ -0,0 +1,36 @@
+from rest_framework import filters
+from .search import search
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    ?search= usando o índice de busca (clients/search.py)
+
+    A view informa o índice em search_index ("clients" ou "pedidos"); sem
+    ele, funciona como o SearchFilter padrão do DRF.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        index = getattr(view, "search_index", None)
+        terms = self.get_search_terms(request)
+        if index is None or not terms:
+            return super().filter_queryset(request, queryset, view)
+        return search(queryset, " ".join(terms), index)
+
+
+class RankedOrderingFilter(filters.OrderingFilter):
+    """
+    OrderingFilter que, numa busca sem ?ordering=, ordena pela relevância
+    (search_rank) antes da ordenação padrão da view
+    """
+
+    def get_default_ordering(self, view):
+        ordering = super().get_default_ordering(view)
+        request = getattr(view, "request", None)
+        if (
+            request is not None
+            and getattr(view, "search_index", None)
+            and request.query_params.get(filters.SearchFilter.search_param)
+        ):
+            return ["-search_rank", *(ordering or [])]
+        return ordering
@@ -1,9 +1,40 @@
 from django import forms
 from django.core.exceptions import ValidationError
+from django.urls import reverse
 from .models import Client
 import re
 
 
+class ClientAutocompleteWidget(forms.Widget):
+    """
+    Seletor de cliente com busca por prefixo em /api/clients/autocomplete/
+
+    Renderiza um campo de texto com sugestões e um campo oculto com o id do
+    cliente escolhido. Só o cliente já selecionado é lido do banco, em vez
+    de um <option> para cada cliente.
+    """
+
+    template_name = "client_autocomplete_widget.html"
+    choices = ()  # Preenchido pelo ModelChoiceField
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context["widget"]["url"] = reverse("client-autocomplete")
+        context["widget"]["label"] = self.selected_label(context["widget"]["value"])
+        return context
+
+    def selected_label(self, value):
+        """Texto do cliente selecionado (o mesmo das sugestões)"""
+        queryset = getattr(self.choices, "queryset", None)
+        if not value or queryset is None:
+            return ""
+        try:
+            client = queryset.filter(pk=value).first()
+        except (ValueError, TypeError, ValidationError):
+            return ""
+        return self.choices.field.label_from_instance(client) if client else ""
+
+
 class ClientForm(forms.ModelForm):
     """
     ModelForm para o modelo Client com validações personalizadas
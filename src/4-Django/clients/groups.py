@@ -0,0 +1,123 @@
+"""
+Grupos do usuário (e as permissões derivadas deles) com cache.
+
+Os nomes dos grupos são resolvidos uma vez por requisição (memorizados no
+próprio objeto user) e, entre requisições, ficam no cache por id do
+usuário. Com o cache quente, o decorator group_required, o GroupPermission
+do DRF e os templates não consultam o banco.
+
+As chaves incluem a versão "groups" (clients.cache.list_version).
+Alterações em User.groups descartam a chave dos usuários afetados;
+renomear ou remover um Group troca a versão e descarta todas (sinais em
+clients/signals.py).
+
+Os JWTs do modo sem estado (accounts/authentication.py) carregam os
+grupos e a versão de permissões do usuário (permissions_version()), que
+muda nas mesmas invalidações e força a renovação dos tokens antigos.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from .cache import invalidate_list, list_version
+
+GROUPS_KEY = "auth:groups:{}:{}"
+PERMISSIONS_VERSION_KEY = "auth:permissions_version:{}"
+
+# Permissões da API por grupo, em ordem de precedência
+ROLE_PERMISSIONS = [
+    ("Administradores", ["all"]),
+    ("Gerentes", ["read", "write", "update", "delete_own"]),
+    ("Funcionários", ["read", "update_status"]),
+]
+
+
+def _key(user_id):
+    return GROUPS_KEY.format(list_version("groups"), user_id)
+
+
+def get_user_groups(user):
+    """
+    Nomes dos grupos do usuário
+
+    Returns:
+        frozenset: Nomes dos grupos (vazio para usuários anônimos)
+    """
+    if user is None or not user.is_authenticated:
+        return frozenset()
+
+    names = getattr(user, "_group_names", None)
+    if names is None:
+        key = _key(user.pk)
+        names = cache.get(key)
+        if names is None:
+            names = frozenset(user.groups.values_list("name", flat=True))
+            cache.set(key, names, getattr(settings, "GROUPS_CACHE_TIMEOUT", 300))
+        user._group_names = names
+    return names
+
+
+def in_groups(user, group_names):
+    """Se o usuário pertence a algum dos grupos"""
+    user_groups = get_user_groups(user)
+    return any(group in user_groups for group in group_names)
+
+
+def get_user_permissions(user):
+    """Permissões da API conforme o grupo de maior precedência do usuário"""
+    user_groups = get_user_groups(user)
+    for group, permissions in ROLE_PERMISSIONS:
+        if group in user_groups:
+            return list(permissions)
+    return []
+
+
+def permissions_version(user_id):
+    """
+    Versão das permissões do usuário, gravada nos JWTs
+
+    Muda quando os grupos do usuário (ou os grupos em geral) mudam. Se a
+    versão sair do cache, uma nova é criada e os tokens emitidos antes
+    precisam ser renovados.
+    """
+    key = PERMISSIONS_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return f"{list_version('groups')}.{version}"
+
+
+def rotate_permissions_version(user_ids):
+    """Troca a versão de permissões dos usuários (invalida os seus JWTs)"""
+    cache.set_many(
+        {
+            PERMISSIONS_VERSION_KEY.format(user_id): time.time_ns()
+            for user_id in user_ids
+        },
+        timeout=None,
+    )
+
+
+def invalidate_user_groups(user_ids):
+    """
+    Descarta os grupos em cache dos usuários, agora e após o commit (para
+    que uma leitura concorrente não grave no cache o valor antigo), e troca
+    a versão de permissões dos seus tokens
+    """
+    user_ids = list(user_ids)
+    keys = [_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    rotate_permissions_version(user_ids)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_all_groups():
+    """Descarta os grupos em cache de todos os usuários"""
+    invalidate_list("groups")
+    transaction.on_commit(lambda: invalidate_list("groups"))
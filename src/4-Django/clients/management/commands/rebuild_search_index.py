@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from clients.search import INDEXES, get_backend
+
+
+class Command(BaseCommand):
+    help = "Recria os índices de busca textual (FTS5) de clientes e pedidos"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "indexes",
+            nargs="*",
+            choices=sorted(INDEXES),
+            help="Índices a recriar (padrão: todos)",
+        )
+
+    def handle(self, *args, **options):
+        if get_backend() != "fts5":
+            raise CommandError(
+                f"O backend de busca atual ({get_backend()}) não usa índices próprios"
+            )
+
+        for name in options["indexes"] or sorted(INDEXES):
+            search_index = INDEXES[name]
+            search_index.create()
+            total = search_index.reindex()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{search_index.table}: {total} registro(s) indexado(s)"
+                )
+            )
@@ -0,0 +1,71 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, DecimalField, Max, Sum, Value
+from django.db.models.functions import Coalesce
+from clients.models import Client
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula total_pedidos, valor_total_pedidos e ultimo_pedido_em dos "
+        "clientes e corrige os que estiverem diferentes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas lista as diferenças, sem gravar",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        clientes = Client.objects.annotate(
+            real_total=Count("pedidos"),
+            real_valor=Coalesce(
+                Sum("pedidos__valor_total"),
+                Value(Decimal("0.00")),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            ),
+            real_ultimo=Max("pedidos__data_pedido"),
+        ).order_by("pk")
+
+        corrigidos = 0
+        for cliente in clientes.iterator(chunk_size=1000):
+            real = (
+                cliente.real_total,
+                Decimal(cliente.real_valor),
+                cliente.real_ultimo,
+            )
+            atual = (
+                cliente.total_pedidos,
+                cliente.valor_total_pedidos,
+                cliente.ultimo_pedido_em,
+            )
+            if real == atual:
+                continue
+
+            corrigidos += 1
+            self.stdout.write(
+                f"Cliente {cliente.pk}: {atual[0]} pedido(s) / {atual[1]} "
+                f"-> {real[0]} pedido(s) / {real[1]}"
+            )
+            if not dry_run:
+                # update() evita Client.save(), que não grava os contadores
+                Client.objects.filter(pk=cliente.pk).update(
+                    total_pedidos=real[0],
+                    valor_total_pedidos=real[1],
+                    ultimo_pedido_em=real[2],
+                )
+
+        if dry_run:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{corrigidos} cliente(s) com contadores divergentes"
+                )
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"{corrigidos} cliente(s) corrigido(s)")
+            )
@@ -1,6 +1,75 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.core.exceptions import ValidationError
 from django.urls import reverse
+from django.utils import timezone
+
+
+# Faixas etárias: (idade limite exclusiva, nome). Acima da última é "Idoso".
+AGE_GROUPS = [
+    (25, "Jovem Adulto"),
+    (40, "Adulto"),
+    (60, "Adulto Maduro"),
+]
+OLDEST_AGE_GROUP = "Idoso"
+
+# Campos atualizados apenas com F() pelas escritas em Pedido
+COUNTER_FIELDS = {"total_pedidos", "valor_total_pedidos", "ultimo_pedido_em"}
+
+
+class ClientQuerySet(models.QuerySet):
+    def with_age_group(self):
+        """
+        Anota a faixa etária (age_group) calculada no banco com Case/When,
+        usando as mesmas faixas de Client.get_age_group
+        """
+        from django.db.models import Case, CharField, Value, When
+
+        return self.annotate(
+            age_group=Case(
+                *[When(age__lt=limit, then=Value(name)) for limit, name in AGE_GROUPS],
+                default=Value(OLDEST_AGE_GROUP),
+                output_field=CharField(),
+            )
+        )
+
+    def update(self, **kwargs):
+        """
+        Atualização em lote que regrava o índice de busca quando nome ou
+        email mudam (o nome também é buscável nos pedidos do cliente) e
+        avisa o autocomplete
+        """
+        from .search import INDEXES, update_index
+
+        buscaveis = kwargs.keys() & {"name", "email"}
+        if not buscaveis:
+            return super().update(**kwargs)
+
+        # updated_at também avisa o autocomplete de outros processos
+        kwargs.setdefault("updated_at", timezone.now())
+        with transaction.atomic(using=self.db):
+            ids = list(self.values_list("pk", flat=True))
+            count = super().update(**kwargs)
+            update_index("clients", self.model.objects.filter(pk__in=ids))
+            if "name" in buscaveis:
+                pedidos = INDEXES["pedidos"].model.objects
+                update_index("pedidos", pedidos.filter(cliente_id__in=ids))
+
+        def depois_do_commit():
+            from .autocomplete import client_index
+            from .cache import invalidate_list
+
+            # Nova versão: contagens em cache descartadas e o autocomplete
+            # (deste e de outros processos) relê os alterados por updated_at
+            invalidate_list("clients")
+            if "name" in buscaveis:
+                # A listagem de pedidos filtra por cliente__name
+                invalidate_list("pedidos")
+            client_index.request_refresh()
+
+        transaction.on_commit(depois_do_commit, using=self.db)
+        return count
 
 
 class Client(models.Model):
@@ -16,6 +85,24 @@ class Client(models.Model):
     created_at = models.DateTimeField(verbose_name="Criado em", auto_now_add=True)
     updated_at = models.DateTimeField(verbose_name="Atualizado em", auto_now=True)
 
+    # Contadores desnormalizados, mantidos pelas escritas em Pedido
+    # (veja order/models.py) e corrigidos por reconcile_client_counters
+    total_pedidos = models.PositiveIntegerField(
+        verbose_name="Total de Pedidos", default=0, editable=False
+    )
+    valor_total_pedidos = models.DecimalField(
+        verbose_name="Valor Total em Pedidos",
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        editable=False,
+    )
+    ultimo_pedido_em = models.DateTimeField(
+        verbose_name="Último Pedido em", null=True, blank=True, editable=False
+    )
+
+    objects = ClientQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Cliente"
         verbose_name_plural = "Clientes"
@@ -24,6 +111,13 @@ class Client(models.Model):
             models.Index(fields=["name"]),
             models.Index(fields=["email"]),
             models.Index(fields=["age"]),
+            # "Top clientes" viram um ORDER BY ... LIMIT sobre o índice
+            models.Index(fields=["-valor_total_pedidos"], name="client_top_valor_idx"),
+            models.Index(fields=["-total_pedidos"], name="client_top_pedidos_idx"),
+            # Ordenação da listagem da API (paginação por cursor)
+            models.Index(fields=["name", "id"], name="client_list_cursor_idx"),
+            # Cursor das exportações incrementais (api/clients/export/)
+            models.Index(fields=["updated_at", "id"], name="client_export_cursor_idx"),
         ]
 
     def __str__(self):
@@ -57,6 +151,14 @@ class Client(models.Model):
         """
         self.validation_age()
         self.full_clean()  # Chama clean() e outras validações
+
+        # Não sobrescreve os contadores com valores possivelmente antigos
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in COUNTER_FIELDS
+            ]
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
@@ -69,14 +171,10 @@ class Client(models.Model):
         """
         Retorna a faixa etária do cliente
         """
-        if self.age < 25:
-            return "Jovem Adulto"
-        elif self.age < 40:
-            return "Adulto"
-        elif self.age < 60:
-            return "Adulto Maduro"
-        else:
-            return "Idoso"
+        for limit, name in AGE_GROUPS:
+            if self.age < limit:
+                return name
+        return OLDEST_AGE_GROUP
 
     @property
     def display_name(self):
@@ -85,6 +183,38 @@ class Client(models.Model):
         """
         return self.name.title() if self.name else ""
 
+    def get_pedidos_statistics(self):
+        """
+        Retorna as estatísticas dos pedidos do cliente numa única consulta,
+        usando agregação condicional para a contagem por status
+        """
+        from django.db.models import Avg, Count, Q, Sum
+        from order.models import Pedido
+
+        por_status = {
+            f"status_{status}": Count("id", filter=Q(status=status))
+            for status, _ in Pedido.STATUS_CHOICES
+        }
+        stats = self.pedidos.aggregate(
+            # Aliases diferentes do nome do campo: "valor_total" como alias
+            # faria o Avg seguinte referenciar o próprio Sum
+            total=Count("id"),
+            soma=Sum("valor_total"),
+            media=Avg("valor_total"),
+            **por_status,
+        )
+
+        return {
+            "total_pedidos": stats["total"] or 0,
+            "valor_total": stats["soma"],
+            "valor_medio": stats["media"],
+            "por_status": {
+                status: stats[f"status_{status}"]
+                for status, _ in Pedido.STATUS_CHOICES
+                if stats[f"status_{status}"]
+            },
+        }
+
     @classmethod
     def get_age_statistics(cls):
         """
@@ -105,3 +235,76 @@ class Client(models.Model):
             "youngest": stats["min_age"] or 0,
             "oldest": stats["max_age"] or 0,
         }
+
+    @classmethod
+    def get_age_group_statistics(cls):
+        """
+        Retorna a quantidade de clientes por faixa etária, agrupada no banco
+        """
+        from django.db.models import Count
+
+        groups = (
+            cls.objects.with_age_group()
+            .values("age_group")
+            .annotate(count=Count("id"))
+            .order_by()  # Sem a ordenação padrão, que entraria no GROUP BY
+        )
+        return {item["age_group"]: item["count"] for item in groups}
+
+
+# Signals do cliente: listagem em cache, busca e autocomplete
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def invalidate_client_list(sender, instance, **kwargs):
+    """
+    Descarta as contagens em cache da listagem de clientes e da de pedidos
+    (filtrada também pelo nome do cliente)
+    """
+    from .cache import invalidate_list
+
+    def depois_do_commit():
+        invalidate_list("clients")
+        invalidate_list("pedidos")
+
+    transaction.on_commit(depois_do_commit)
+
+
+@receiver(post_save, sender=Client)
+def update_search_index(sender, instance, created, **kwargs):
+    """
+    Regrava o cliente no índice de busca e, se o nome mudou, os seus
+    pedidos (que também são buscáveis pelo nome do cliente)
+    """
+    from .search import INDEXES, update_index, uses_index
+
+    if not uses_index():
+        return
+    anterior = None if created else INDEXES["clients"].indexed_values(instance.pk)
+    update_index("clients", Client.objects.filter(pk=instance.pk))
+    if anterior and anterior[0] != instance.name:
+        update_index("pedidos", instance.pedidos.all())
+
+
+@receiver(post_delete, sender=Client)
+def remove_from_search_index(sender, instance, **kwargs):
+    """Retira o cliente removido do índice de busca"""
+    from .search import remove_from_index
+
+    remove_from_index("clients", [instance.pk])
+
+
+@receiver(post_save, sender=Client)
+def update_autocomplete(sender, instance, **kwargs):
+    """Atualiza o índice do autocomplete deste processo após o commit"""
+    from .autocomplete import client_saved
+
+    transaction.on_commit(lambda: client_saved(instance))
+
+
+@receiver(post_delete, sender=Client)
+def remove_from_autocomplete(sender, instance, **kwargs):
+    """Retira o cliente removido do índice do autocomplete após o commit"""
+    from .autocomplete import client_deleted
+
+    pk = instance.pk
+    transaction.on_commit(lambda: client_deleted(pk))
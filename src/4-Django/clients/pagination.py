@@ -0,0 +1,283 @@
+import datetime
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination
+from .cache import get_or_compute, queryset_cache_key
+
+
+class StandardResultsSetPagination(PageNumberPagination):
+    """Paginação padrão para a API"""
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Paginação por cursor sobre a ordenação da view (OrderingFilter)
+
+    O cursor guarda os valores de todos os campos da ordenação do último
+    item da página, e a ordenação sempre termina em "id", então cada
+    posição é única. A próxima página filtra a partir dessa posição
+    (ex.: name > v OR (name = v AND id > i)) em vez de usar OFFSET:
+    páginas profundas custam o mesmo que a primeira, nomes repetidos não
+    geram varreduras e inserções concorrentes não deslocam os resultados.
+    Também não faz COUNT(*).
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = "-id"  # Só usado se a view não tiver OrderingFilter
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = self.cursor.position if self.cursor is not None else None
+
+        # Páginas anteriores são lidas na ordem inversa e desviradas depois
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(_after_position(ordering, position))
+
+        # Um item a mais indica se existe outra página nessa direção
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+        has_more = len(results) > len(self.page)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        # Página vazia (voltando antes do primeiro item): recomeça do início
+        position = (
+            self._get_position_from_instance(self.page[-1], self.ordering)
+            if self.page
+            else None
+        )
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = (
+            self._get_position_from_instance(self.page[0], self.ordering)
+            if self.page
+            else None
+        )
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Ordenação da view terminada em "id" (acrescentado se faltar)
+
+        Campos que aceitam NULL são ignorados, como o OrderingFilter faz com
+        campos inválidos (NULL não pode ser comparado com > / <); se nenhum
+        campo sobrar, usa a ordenação padrão da view.
+        """
+        model = queryset.model
+        ordering = [
+            order
+            for order in super().get_ordering(request, queryset, view)
+            if not _nullable(model, order)
+        ]
+        if not ordering:
+            default = getattr(view, "ordering", None) or self.ordering
+            if isinstance(default, str):
+                default = [default]
+            ordering = [order for order in default if not _nullable(model, order)]
+        if not ordering or ordering[-1].lstrip("-") not in ("id", "pk"):
+            ordering.append("id")
+        return tuple(ordering)
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return cursor
+        try:
+            position = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor._replace(position=position)
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            value = getattr(instance, order.lstrip("-"))
+            if isinstance(value, (datetime.date, datetime.time)):
+                value = value.isoformat()
+            elif isinstance(value, Decimal):
+                value = str(value)
+            values.append(value)
+        return json.dumps(values, separators=(",", ":"))
+
+
+def _nullable(model, order):
+    try:
+        return model._meta.get_field(order.lstrip("-")).null
+    except FieldDoesNotExist:
+        return False  # Anotação (ex.: search_rank)
+
+
+def _reverse_ordering(ordering):
+    return tuple(
+        order[1:] if order.startswith("-") else f"-{order}" for order in ordering
+    )
+
+
+def _after_position(ordering, position):
+    """
+    Itens depois de `position` na ordenação (comparação lexicográfica)
+
+    Ex.: ("name", "id") e ["Ana", 7] -> name > "Ana" OR (name = "Ana" AND id > 7)
+    """
+    condition = Q()
+    for index, order in enumerate(ordering):
+        lookup = "__lt" if order.startswith("-") else "__gt"
+        ties = {
+            field.lstrip("-"): value
+            for field, value in zip(ordering[:index], position[:index])
+        }
+        condition |= Q(**ties, **{order.lstrip("-") + lookup: position[index]})
+    return condition
+
+
+class OptionalCursorPagination(StandardResultsSetPagination):
+    """
+    Paginação por número de página, com paginação por cursor opcional
+
+    Na ação "list", ?pagination=cursor (ou um ?cursor=... recebido no
+    link "next"/"previous") usa KeysetPagination; sem isso a resposta
+    continua igual à do StandardResultsSetPagination.
+    """
+
+    cursor_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if getattr(view, "action", None) == "list" and (
+            request.query_params.get("pagination") == "cursor"
+            or self.cursor_pagination_class.cursor_query_param in request.query_params
+        ):
+            self.cursor_paginator = self.cursor_pagination_class()
+            page = self.cursor_paginator.paginate_queryset(queryset, request, view)
+            self.display_page_controls = self.cursor_paginator.display_page_controls
+            return page
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_html_context(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_html_context()
+        return super().get_html_context()
+
+    def to_html(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
+
+
+def estimated_row_count(model, using="default"):
+    """
+    Quantidade aproximada de linhas da tabela, lida das estatísticas do
+    banco (PostgreSQL/MySQL) sem percorrer a tabela.
+
+    Returns:
+        int: Estimativa, ou None se o banco não oferecer uma
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == "postgresql":
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass"
+        params = [connection.ops.quote_name(table)]
+    elif connection.vendor == "mysql":
+        sql = (
+            "SELECT table_rows FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = %s"
+        )
+        params = [table]
+    else:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    # reltuples é -1 em tabelas nunca analisadas
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+def cached_count(queryset, namespace):
+    """
+    COUNT(*) do queryset, em cache por conjunto de filtros.
+
+    Sem filtros, em tabelas maiores que LIST_ESTIMATED_COUNT_THRESHOLD,
+    usa a estimativa do banco em vez de contar.
+    """
+
+    def compute():
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if (
+                estimate is not None
+                and estimate >= settings.LIST_ESTIMATED_COUNT_THRESHOLD
+            ):
+                return estimate
+        return queryset.count()
+
+    return get_or_compute(
+        queryset_cache_key(namespace, queryset, "count"),
+        compute,
+        settings.LIST_CACHE_TIMEOUT,
+    )
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator das listagens HTML com a contagem em cache
+
+    Args:
+        namespace (str): Listagem, invalidada por invalidate_list(namespace)
+        count (int): Contagem já conhecida (ex.: das estatísticas da página)
+    """
+
+    def __init__(self, object_list, per_page, namespace, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.namespace = namespace
+        if count is not None:
+            self.__dict__["count"] = count
+
+    @cached_property
+    def count(self):
+        return cached_count(self.object_list, self.namespace)
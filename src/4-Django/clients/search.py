@@ -0,0 +1,273 @@
+"""
+Busca textual de clientes e pedidos.
+
+Backends (settings.SEARCH_BACKEND, "auto" escolhe pelo banco):
+    fts5: tabelas virtuais FTS5 do SQLite, mantidas pelos sinais e pelas
+        atualizações em lote dos modelos, com ranking bm25
+    postgres: SearchVector/SearchQuery com similaridade por trigramas
+        (requer a extensão pg_trgm)
+    basic: icontains em cada campo (sem índice)
+
+Os termos são combinados com E, e cada termo também casa como prefixo
+("ana sil" encontra "Ana Silva"). O queryset retornado recebe a anotação
+search_rank (maior = mais relevante).
+"""
+
+import re
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+# Linhas inseridas por comando ao reconstruir um índice
+REBUILD_BATCH_SIZE = 1000
+
+
+def get_backend(using="default"):
+    backend = getattr(settings, "SEARCH_BACKEND", "auto")
+    if backend != "auto":
+        return backend
+    vendor = connections[using].vendor
+    return {"sqlite": "fts5", "postgresql": "postgres"}.get(vendor, "basic")
+
+
+def _terms(text):
+    return re.findall(r"\w+", text or "")
+
+
+def fts5_query(text):
+    """
+    Converte o texto digitado numa consulta FTS5 segura: cada termo entre
+    aspas (sem operadores do usuário) e como prefixo.
+    """
+    return " ".join(f'"{term}"*' for term in _terms(text))
+
+
+class SearchIndex:
+    """
+    Índice FTS5 de um modelo: uma linha por registro (rowid = pk) com os
+    campos buscáveis (que podem atravessar relações, ex.: cliente__name)
+    """
+
+    def __init__(self, name, model_label, fields):
+        self.name = name
+        self.model_label = model_label
+        self.fields = fields
+        self.table = f"search_{name}"
+        self.columns = [field.replace("__", "_") for field in fields]
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def _quoted(self, connection):
+        return connection.ops.quote_name(self.table)
+
+    def exists(self, using="default"):
+        connection = connections[using]
+        return self.table in connection.introspection.table_names()
+
+    def create(self, using="default"):
+        connection = connections[using]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self._quoted(connection)} "
+                f"USING fts5({', '.join(self.columns)}, "
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+
+    def remove(self, pks, using="default"):
+        """Remove os registros do índice"""
+        pks = list(pks)
+        if not pks:
+            return
+        connection = connections[using]
+        placeholders = ", ".join(["%s"] * len(pks))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self._quoted(connection)} "
+                f"WHERE rowid IN ({placeholders})",
+                pks,
+            )
+
+    def reindex(self, queryset=None, using="default"):
+        """
+        Regrava no índice os registros do queryset (todos, se None)
+
+        Returns:
+            int: Registros indexados
+        """
+        connection = connections[using]
+        table = self._quoted(connection)
+        rows = (
+            queryset if queryset is not None else self.model.objects.using(using)
+        ).order_by()
+        placeholders = ", ".join(["%s"] * (len(self.columns) + 1))
+        insert = (
+            f"INSERT INTO {table} (rowid, {', '.join(self.columns)}) "
+            f"VALUES ({placeholders})"
+        )
+
+        total = 0
+        with connection.cursor() as cursor:
+            if queryset is None:
+                cursor.execute(f"DELETE FROM {table}")
+            lote = []
+            for row in rows.values_list("pk", *self.fields).iterator(
+                chunk_size=REBUILD_BATCH_SIZE
+            ):
+                lote.append(row)
+                if len(lote) >= REBUILD_BATCH_SIZE:
+                    total += self._write(cursor, table, insert, lote, queryset)
+                    lote = []
+            total += self._write(cursor, table, insert, lote, queryset)
+        return total
+
+    def _write(self, cursor, table, insert, rows, replace):
+        if not rows:
+            return 0
+        if replace is not None:
+            placeholders = ", ".join(["%s"] * len(rows))
+            cursor.execute(
+                f"DELETE FROM {table} WHERE rowid IN ({placeholders})",
+                [row[0] for row in rows],
+            )
+        cursor.executemany(
+            insert, [tuple("" if v is None else v for v in row) for row in rows]
+        )
+        return len(rows)
+
+    def indexed_values(self, pk, using="default"):
+        """Valores gravados no índice para um registro (ou None)"""
+        connection = connections[using]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {', '.join(self.columns)} FROM {self._quoted(connection)} "
+                "WHERE rowid = %s",
+                [pk],
+            )
+            return cursor.fetchone()
+
+    def search(self, queryset, text):
+        """Filtra e anota search_rank usando o índice FTS5"""
+        query = fts5_query(text)
+        if not query:
+            return queryset.none().annotate(
+                search_rank=Value(0.0, output_field=FloatField())
+            )
+
+        connection = connections[queryset.db]
+        table = self._quoted(connection)
+        outer = "{}.{}".format(
+            connection.ops.quote_name(queryset.model._meta.db_table),
+            connection.ops.quote_name(queryset.model._meta.pk.column),
+        )
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [query])
+        ).annotate(
+            # bm25 é menor para os mais relevantes
+            search_rank=RawSQL(
+                f"SELECT -bm25({table}) FROM {table} "
+                f"WHERE {table} MATCH %s AND rowid = {outer}",
+                [query],
+                output_field=FloatField(),
+            )
+        )
+
+
+INDEXES = {
+    "clients": SearchIndex("client", "clients.Client", ["name", "email"]),
+    "pedidos": SearchIndex(
+        "pedido", "order.Pedido", ["numero_pedido", "cliente__name", "descricao"]
+    ),
+}
+
+
+def _postgres_search(queryset, fields, text):
+    from django.contrib.postgres.search import (
+        SearchQuery,
+        SearchRank,
+        SearchVector,
+        TrigramSimilarity,
+    )
+
+    config = getattr(settings, "SEARCH_CONFIG", "simple")
+    vector = SearchVector(*fields, config=config)
+    query = SearchQuery(text, search_type="websearch", config=config)
+    return (
+        queryset.annotate(
+            _search_vector=vector,
+            _similarity=TrigramSimilarity(fields[0], text),
+        )
+        .filter(Q(_search_vector=query) | Q(_similarity__gt=0.3))
+        .annotate(
+            search_rank=SearchRank(vector, query) + TrigramSimilarity(fields[0], text)
+        )
+    )
+
+
+def _basic_search(queryset, fields, text):
+    terms = _terms(text) or [text]
+    for term in terms:
+        condition = Q()
+        for field in fields:
+            condition |= Q(**{f"{field}__icontains": term})
+        queryset = queryset.filter(condition)
+    return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def search(queryset, text, index):
+    """
+    Busca textual num queryset de Client ou Pedido
+
+    Args:
+        queryset: Queryset a filtrar (ordenação e filtros são mantidos)
+        text (str): Texto digitado pelo usuário
+        index (str): "clients" ou "pedidos"
+
+    Returns:
+        QuerySet: Registros encontrados, anotados com search_rank
+    """
+    search_index = INDEXES[index]
+    backend = get_backend(queryset.db)
+    if backend == "fts5":
+        return search_index.search(queryset, text)
+    if backend == "postgres":
+        return _postgres_search(queryset, search_index.fields, text)
+    return _basic_search(queryset, search_index.fields, text)
+
+
+def uses_index(using="default"):
+    """Se o backend atual mantém tabelas de índice (FTS5)"""
+    return get_backend(using) == "fts5"
+
+
+def update_index(index, queryset):
+    """Regrava registros no índice (sem efeito fora do FTS5)"""
+    if uses_index(queryset.db):
+        INDEXES[index].reindex(queryset, using=queryset.db)
+
+
+def remove_from_index(index, pks, using="default"):
+    """Remove registros do índice (sem efeito fora do FTS5)"""
+    if uses_index(using):
+        INDEXES[index].remove(pks, using=using)
+
+
+def create_indexes(using="default", verbosity=1, **kwargs):
+    """
+    Cria as tabelas FTS5 que ainda não existem e as preenche
+    (ligado ao post_migrate em ClientsConfig.ready)
+    """
+    if not uses_index(using):
+        return
+    for search_index in INDEXES.values():
+        if not search_index.exists(using):
+            search_index.create(using)
+            total = search_index.reindex(using=using)
+            if verbosity >= 2:
+                print(
+                    f"Índice de busca {search_index.table} criado ({total} registros)"
+                )
@@ -43,7 +43,9 @@ class ClientListSerializer(serializers.ModelSerializer):
 
     age_group = serializers.ReadOnlyField(source="get_age_group")
     display_name = serializers.ReadOnlyField()
-    total_pedidos = serializers.SerializerMethodField()
+    # Contadores mantidos no próprio Client: nenhuma consulta extra por linha
+    total_pedidos = serializers.ReadOnlyField()
+    valor_total = serializers.SerializerMethodField()
 
     class Meta:
         model = Client
@@ -55,12 +57,13 @@ class ClientListSerializer(serializers.ModelSerializer):
             "age_group",
             "display_name",
             "total_pedidos",
+            "valor_total",
             "created_at",
             "updated_at",
         ]
 
-    def get_total_pedidos(self, obj):
-        return obj.pedidos.count()
+    def get_valor_total(self, obj):
+        return str(obj.valor_total_pedidos.quantize(Decimal("0.01")))
 
 
 class ClientDetailSerializer(serializers.ModelSerializer):
@@ -88,19 +91,19 @@ class ClientDetailSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
 
+    def _get_stats(self, obj):
+        """Estatísticas dos pedidos, consultadas uma única vez por cliente"""
+        if not hasattr(obj, "_pedidos_statistics"):
+            obj._pedidos_statistics = obj.get_pedidos_statistics()
+        return obj._pedidos_statistics
+
     def get_total_pedidos(self, obj):
-        return obj.pedidos.count()
+        return self._get_stats(obj)["total_pedidos"]
 
     def get_pedidos_stats(self, obj):
-        from django.db.models import Count, Sum, Avg
-
-        stats = obj.pedidos.aggregate(
-            total_pedidos=Count("id"),
-            valor_total=Sum("valor_total"),
-            valor_medio=Avg("valor_total"),
-        )
+        stats = self._get_stats(obj)
         return {
-            "total_pedidos": stats["total_pedidos"] or 0,
+            "total_pedidos": stats["total_pedidos"],
             "valor_total": str(stats["valor_total"] or Decimal("0.00")),
             "valor_medio": str(
                 round(stats["valor_medio"], 2)
@@ -110,13 +113,7 @@ class ClientDetailSerializer(serializers.ModelSerializer):
         }
 
     def get_pedidos_por_status(self, obj):
-        from django.db.models import Count
-
-        return dict(
-            obj.pedidos.values("status")
-            .annotate(count=Count("id"))
-            .values_list("status", "count")
-        )
+        return self._get_stats(obj)["por_status"]
 
 
 class ClientCreateUpdateSerializer(serializers.ModelSerializer):
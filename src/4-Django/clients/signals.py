@@ -0,0 +1,83 @@
+"""
+Receivers de User e Group que mantêm o cache de grupos (clients/groups.py)
+e a versão de permissões dos JWTs sem estado. São conectados em
+ClientsConfig.ready().
+"""
+
+from .groups import (
+    invalidate_all_groups,
+    invalidate_user_groups,
+    rotate_permissions_version,
+)
+
+# Campos do usuário gravados nos JWTs sem estado (accounts/authentication.py)
+USER_TOKEN_FIELDS = {"is_active", "is_staff", "is_superuser"}
+
+# Campo adiado no carregamento: se foi atribuído depois, conta como alterado
+_NAO_CARREGADO = object()
+
+
+def _token_values(user):
+    # Campos adiados (only()/defer()) ficam de fora
+    return {
+        field: user.__dict__[field]
+        for field in USER_TOKEN_FIELDS
+        if field in user.__dict__
+    }
+
+
+def user_initialized(sender, instance, **kwargs):
+    """
+    Guarda is_active/is_staff/is_superuser como foram carregados, para que
+    user_saved_or_deleted() só troque a versão de permissões se mudarem
+    """
+    instance._token_values = _token_values(instance)
+
+
+def user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Descarta os grupos em cache dos usuários afetados por uma alteração em
+    User.groups (user.groups.add(...) ou group.user_set.add(...))
+    """
+    if action == "pre_clear" and reverse:
+        # Em group.user_set.clear() o post_clear não informa os usuários
+        instance._cleared_user_ids = list(
+            instance.user_set.values_list("pk", flat=True)
+        )
+    elif action in ("post_add", "post_remove", "post_clear"):
+        if not reverse:
+            instance._group_names = None
+            invalidate_user_groups([instance.pk])
+        elif action == "post_clear":
+            invalidate_user_groups(getattr(instance, "_cleared_user_ids", []))
+        else:
+            invalidate_user_groups(pk_set or [])
+
+
+def user_saved_or_deleted(sender, instance, **kwargs):
+    """
+    Um usuário novo ou removido não herda grupos em cache pelo mesmo id, e
+    alterar is_active/is_staff/is_superuser invalida os JWTs sem estado
+    (outras gravações, como last_login ou a senha, não trocam a versão)
+    """
+    update_fields = kwargs.get("update_fields")
+    if kwargs.get("created", True):
+        invalidate_user_groups([instance.pk])
+    elif update_fields is None or update_fields & USER_TOKEN_FIELDS:
+        carregados = getattr(instance, "_token_values", {})
+        alterados = {
+            field
+            for field, value in _token_values(instance).items()
+            if carregados.get(field, _NAO_CARREGADO) != value
+        }
+        if update_fields is not None:
+            alterados &= update_fields
+        if alterados:
+            rotate_permissions_version([instance.pk])
+    instance._token_values = _token_values(instance)
+
+
+def group_saved_or_deleted(sender, instance, **kwargs):
+    """Grupo renomeado ou removido: descarta os grupos de todos os usuários"""
+    if not kwargs.get("created", False):
+        invalidate_all_groups()
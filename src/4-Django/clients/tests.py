@@ -1,6 +1,28 @@
-from django.test import TestCase
+from decimal import Decimal
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
 from django.core.exceptions import ValidationError
+import threading
+import time
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from order.models import Pedido
+from . import api_views, autocomplete, charts
+from .cache import get_or_compute, invalidate_list
+from .context_processors import user_groups
+from .groups import get_user_groups, get_user_permissions, permissions_version
 from .models import Client
+from .pagination import CachedCountPaginator
+from .permissions import GroupPermission, group_required
+from . import search as search_module
+from .search import search
 
 
 class ClientModelTest(TestCase):
@@ -98,3 +120,656 @@ class ClientModelTest(TestCase):
 
         # Verificar se o cliente não foi salvo
         self.assertEqual(Client.objects.filter(email="lucas@example.com").count(), 0)
+
+
+class ClientAPIQueryCountTest(APITestCase):
+    def setUp(self):
+        """
+        Cria um funcionário autenticado e clientes com pedidos
+        """
+        cache.clear()
+        self.user = User.objects.create_user(username="func", password="senha12345")
+        self.user.groups.add(Group.objects.create(name="Funcionários"))
+        self.client.force_authenticate(user=self.user)
+
+        for i in range(6):
+            cliente = Client.objects.create(
+                name=f"Cliente {i}", email=f"cliente{i}@example.com", age=30
+            )
+            for valor in ("10.00", "5.50"):
+                Pedido.objects.create(
+                    cliente=cliente,
+                    descricao="Pedido de teste com descrição",
+                    valor_total=valor,
+                )
+
+    def _count_queries(self, page_size):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/clients/", {"page_size": page_size})
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.data["results"]
+
+    def test_list_query_count_does_not_depend_on_page_size(self):
+        """
+        A listagem não deve fazer uma consulta por cliente
+        """
+        self._count_queries(2)  # aquece o cache de grupos do usuário
+        small, _ = self._count_queries(2)
+        large, results = self._count_queries(6)
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(results), 6)
+
+    def test_list_uses_annotated_totals(self):
+        """
+        Testa os totais de pedidos vindos da anotação
+        """
+        _, results = self._count_queries(6)
+
+        for item in results:
+            self.assertEqual(item["total_pedidos"], 2)
+            self.assertEqual(item["valor_total"], "15.50")
+
+    def test_detail_statistics_use_single_query(self):
+        """
+        Testa as estatísticas do detalhe calculadas numa única consulta
+        """
+        cliente = Client.objects.get(email="cliente0@example.com")
+        Pedido.objects.filter(cliente=cliente).update(status="enviado")
+
+        with self.assertNumQueries(1):
+            stats = cliente.get_pedidos_statistics()
+
+        self.assertEqual(stats["total_pedidos"], 2)
+        self.assertEqual(stats["por_status"], {"enviado": 2})
+
+        response = self.client.get(f"/api/clients/{cliente.id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_pedidos"], 2)
+        self.assertEqual(
+            Decimal(response.data["pedidos_stats"]["valor_total"]), Decimal("15.50")
+        )
+        self.assertEqual(response.data["pedidos_por_status"], {"enviado": 2})
+
+    def test_age_groups_are_grouped_in_database(self):
+        """
+        Testa as faixas etárias agrupadas no banco, iguais às de get_age_group
+        """
+        for i, age in enumerate([18, 24, 25, 39, 40, 59, 60, 90]):
+            Client.objects.create(
+                name=f"Idade {age}", email=f"idade{i}@example.com", age=age
+            )
+
+        esperado = {}
+        for client in Client.objects.all():
+            group = client.get_age_group()
+            esperado[group] = esperado.get(group, 0) + 1
+
+        with self.assertNumQueries(1):
+            self.assertEqual(Client.get_age_group_statistics(), esperado)
+
+        response = self.client.get("/api/clients/stats/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["age_groups"], esperado)
+
+    def test_quick_stats_aggregates_and_cache(self):
+        """
+        Testa as estatísticas rápidas: duas agregações de pedidos (tabela e
+        mês atual), uma contagem de clientes e nenhuma consulta enquanto o
+        cache for válido
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/dashboard/quick_stats/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_orders"], 12)
+        self.assertEqual(response.data["orders_today"], 12)
+        self.assertEqual(response.data["pending_orders"], 12)
+        self.assertEqual(response.data["total_clients"], 6)
+        sql = [q["sql"] for q in queries.captured_queries]
+        self.assertEqual(sum('FROM "order_pedido"' in q for q in sql), 2)
+        self.assertEqual(sum('FROM "clients_client"' in q for q in sql), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/api/dashboard/quick_stats/")
+        sql = [q["sql"] for q in queries.captured_queries]
+        self.assertFalse(any('FROM "order_pedido"' in q for q in sql))
+
+    @override_settings(TIME_ZONE="America/Sao_Paulo")
+    def test_quick_stats_uses_local_day(self):
+        """
+        Testa as estatísticas do dia no fuso atual: às 01h UTC ainda é o
+        dia anterior em São Paulo
+        """
+        from datetime import datetime, timezone as dt_timezone
+
+        agora = datetime(2024, 3, 11, 1, 0, tzinfo=dt_timezone.utc)  # 22h do dia 10
+        Pedido.objects.update(
+            data_pedido=datetime(2024, 3, 9, 12, tzinfo=dt_timezone.utc)
+        )
+        Pedido.objects.filter(pk=Pedido.objects.first().pk).update(
+            data_pedido=datetime(2024, 3, 10, 23, 30, tzinfo=dt_timezone.utc)
+        )
+        with patch("django.utils.timezone.now", return_value=agora):
+            response = self.client.get("/api/dashboard/quick_stats/")
+        self.assertEqual(response.data["orders_today"], 1)
+        self.assertTrue(cache.get("dashboard:quick_stats:2024-03-10"))
+
+    def test_charts_data_gap_filled_and_cached(self):
+        """
+        Testa as séries do dashboard sem lacunas, com os dias e meses
+        encerrados servidos pelo cache
+        """
+        from datetime import timedelta
+        from django.utils import timezone
+
+        dez_dias = timezone.now() - timedelta(days=10)
+        Pedido.objects.filter(cliente__email="cliente0@example.com").update(
+            data_pedido=dez_dias
+        )
+
+        response = self.client.get("/api/dashboard/charts_data/")
+        self.assertEqual(response.status_code, 200)
+        daily = response.data["daily_orders"]
+        self.assertEqual(len(daily), 31)
+        self.assertEqual(len(response.data["monthly_revenue"]), 12)
+        por_dia = {item["date"]: item["count"] for item in daily}
+        self.assertEqual(por_dia[dez_dias.date().isoformat()], 2)
+        self.assertEqual(por_dia[timezone.now().date().isoformat()], 10)
+
+        # Segunda carga: apenas os buckets atuais (dia e mês) vão ao banco
+        with patch.object(
+            charts, "_daily_buckets", wraps=charts._daily_buckets
+        ) as daily_buckets, patch.object(
+            charts, "_monthly_buckets", wraps=charts._monthly_buckets
+        ) as monthly_buckets:
+            again = self.client.get("/api/dashboard/charts_data/")
+        self.assertEqual(again.data["daily_orders"], daily)
+        hoje = timezone.now().date()
+        daily_buckets.assert_called_once_with(hoje, hoje + timedelta(days=1))
+        self.assertEqual(monthly_buckets.call_count, 1)
+
+        # Alterar um pedido antigo invalida o bucket do seu dia
+        pedido = Pedido.objects.filter(cliente__email="cliente0@example.com").first()
+        with self.captureOnCommitCallbacks(execute=True):
+            pedido.delete()
+        response = self.client.get("/api/dashboard/charts_data/")
+        por_dia = {
+            item["date"]: item["count"] for item in response.data["daily_orders"]
+        }
+        self.assertEqual(por_dia[dez_dias.date().isoformat()], 1)
+
+    def test_cursor_pagination_walks_all_pages_without_count(self):
+        """
+        A paginação por cursor percorre todos os clientes sem COUNT(*)
+        """
+        url, nomes = "/api/clients/?pagination=cursor&page_size=4", []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("count", response.data)
+            self.assertFalse(
+                any("COUNT(*)" in query["sql"] for query in queries.captured_queries)
+            )
+            nomes += [cliente["name"] for cliente in response.data["results"]]
+            url = response.data["next"]
+
+        self.assertEqual(nomes, [f"Cliente {i}" for i in range(6)])
+
+        # Sem o parâmetro, a paginação por número de página continua igual
+        response = self.client.get("/api/clients/", {"page_size": 4})
+        self.assertEqual(response.data["count"], 6)
+
+    def test_cursor_pagination_repeated_names_without_offset(self):
+        """
+        Nomes repetidos são paginados pela posição (name, id), sem OFFSET,
+        nos dois sentidos
+        """
+        for i in range(45):
+            Client.objects.create(
+                name="Maria Silva", email=f"maria{i}@example.com", age=30
+            )
+        esperado = list(
+            Client.objects.order_by("name", "id").values_list("id", flat=True)
+        )
+
+        url, ids, paginas = "/api/clients/?pagination=cursor&page_size=10", [], []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(
+                any("OFFSET" in query["sql"] for query in queries.captured_queries)
+            )
+            paginas.append([cliente["id"] for cliente in response.data["results"]])
+            ids += paginas[-1]
+            previous, url = response.data["previous"], response.data["next"]
+        self.assertEqual(ids, esperado)
+
+        # Voltando da última página chega-se à penúltima
+        response = self.client.get(previous)
+        self.assertEqual(
+            [cliente["id"] for cliente in response.data["results"]], paginas[-2]
+        )
+
+        # ?ordering= sem "id" recebe o id como desempate
+        response = self.client.get(
+            "/api/clients/",
+            {"pagination": "cursor", "ordering": "-name", "page_size": 10},
+        )
+        response = self.client.get(response.data["next"])
+        esperado = Client.objects.order_by("-name", "id").values_list("id", flat=True)
+        self.assertEqual(
+            [cliente["id"] for cliente in response.data["results"]],
+            list(esperado[10:20]),
+        )
+
+    def test_export_csv_streams_with_constant_queries(self):
+        """
+        A exportação em CSV é enviada em streaming, sem consulta por cliente
+        """
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/clients/clients/export-csv/")
+            content = b"".join(response.streaming_content).decode("utf-8")
+        self.assertTrue(response.streaming)
+        self.assertLess(len(queries), 6)
+
+        linhas = content.splitlines()
+        self.assertTrue(linhas[0].startswith("\ufeffID;Nome;Email"))
+        self.assertEqual(len(linhas), 7)
+        self.assertTrue(linhas[1].endswith(";2;15,50"))
+
+
+class GetOrComputeTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_requests_compute_once(self):
+        """
+        Requisições simultâneas pela mesma chave fazem um único cálculo
+        """
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return 42
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(get_or_compute("chave", compute, 10))
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [42] * 8)
+
+
+class CachedCountPaginatorTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        for i in range(5):
+            Client.objects.create(
+                name=f"Cliente {i}", email=f"cliente{i}@example.com", age=20 + i
+            )
+
+    def test_count_cached_per_filter_set(self):
+        """
+        A contagem fica em cache pelos filtros e é descartada ao alterar clientes
+        """
+        filtrados = Client.objects.filter(age__gte=21).filter(age__lte=23)
+        self.assertEqual(CachedCountPaginator(filtrados, 2, "clients").count, 3)
+
+        # Os mesmos filtros com outra ordenação usam o cache
+        mesmos = Client.objects.filter(age__gte=21).filter(age__lte=23)
+        with self.assertNumQueries(0):
+            paginator = CachedCountPaginator(mesmos.order_by("-name"), 2, "clients")
+            self.assertEqual(paginator.num_pages, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Client.objects.create(name="Novo", email="novo@example.com", age=22)
+        self.assertEqual(CachedCountPaginator(filtrados, 2, "clients").count, 4)
+
+    @override_settings(LIST_ESTIMATED_COUNT_THRESHOLD=1000)
+    def test_estimated_count_only_without_filters(self):
+        """
+        Listagens sem filtro em tabelas grandes usam a estimativa do banco
+        """
+        with patch("clients.pagination.estimated_row_count", return_value=250000):
+            todos = CachedCountPaginator(Client.objects.all(), 10, "clients")
+            self.assertEqual(todos.count, 250000)
+
+            filtrados = Client.objects.filter(age__gte=22)
+            self.assertEqual(CachedCountPaginator(filtrados, 10, "clients").count, 3)
+
+        invalidate_list("clients")
+        self.assertEqual(
+            CachedCountPaginator(Client.objects.all(), 10, "clients").count, 5
+        )
+
+
+class SearchIndexTest(APITestCase):
+    def setUp(self):
+        """
+        Cria um funcionário autenticado e clientes/pedidos para buscar
+        """
+        cache.clear()
+        self.user = User.objects.create_user(username="func", password="senha12345")
+        self.user.groups.add(Group.objects.create(name="Funcionários"))
+        self.client.force_authenticate(user=self.user)
+
+        self.joao = Client.objects.create(
+            name="João Silva", email="joao@example.com", age=30
+        )
+        self.maria = Client.objects.create(
+            name="Maria Souza", email="maria.silva@example.com", age=40
+        )
+        self.pedido = Pedido.objects.create(
+            cliente=self.joao,
+            descricao="Notebook com mochila de brinde",
+            valor_total="3500.00",
+        )
+
+    def buscar(self, texto, index="clients", queryset=None):
+        if queryset is None:
+            queryset = search_module.INDEXES[index].model.objects.all()
+        return list(search(queryset, texto, index).values_list("pk", flat=True))
+
+    def test_prefix_accents_and_ranking(self):
+        """
+        Termos como prefixo, sem acentos, com os mais relevantes primeiro
+        """
+        self.assertEqual(self.buscar("joao sil"), [self.joao.pk])
+        self.assertEqual(self.buscar("JOÃO"), [self.joao.pk])
+
+        ranking = (
+            search(Client.objects.all(), "silva", "clients")
+            .order_by("-search_rank")
+            .values_list("pk", flat=True)
+        )
+        self.assertEqual(set(ranking), {self.joao.pk, self.maria.pk})
+        self.assertEqual(self.buscar('"; DROP'), [])
+
+    def test_index_follows_writes(self):
+        """
+        O índice acompanha save, update em lote e exclusão
+        """
+        self.assertEqual(self.buscar("mochila", "pedidos"), [self.pedido.pk])
+        self.assertEqual(self.buscar("joão", "pedidos"), [self.pedido.pk])
+
+        # Renomear o cliente regrava os seus pedidos
+        self.joao.name = "Carlos Lima"
+        self.joao.save()
+        self.assertEqual(self.buscar("joão", "pedidos"), [])
+        self.assertEqual(self.buscar("carlos", "pedidos"), [self.pedido.pk])
+
+        Pedido.objects.filter(pk=self.pedido.pk).update(descricao="Monitor gamer")
+        self.assertEqual(self.buscar("mochila", "pedidos"), [])
+        self.assertEqual(self.buscar("monitor", "pedidos"), [self.pedido.pk])
+
+        Client.objects.filter(pk=self.maria.pk).update(name="Ana Paula")
+        self.assertEqual(self.buscar("ana"), [self.maria.pk])
+
+        self.joao.delete()
+        self.assertEqual(self.buscar("carlos"), [])
+        self.assertEqual(self.buscar("monitor", "pedidos"), [])
+
+    def test_api_search_filter(self):
+        """
+        ?search= das APIs usa o índice e ordena por relevância
+        """
+        response = self.client.get("/api/clients/", {"search": "silva"})
+        self.assertEqual(response.data["count"], 2)
+
+        response = self.client.get("/api/pedidos/", {"search": "note"})
+        self.assertEqual(
+            [pedido["id"] for pedido in response.data["results"]], [self.pedido.pk]
+        )
+
+    def test_rebuild_command(self):
+        """
+        O comando recria o índice a partir das tabelas
+        """
+        search_module.INDEXES["clients"].remove([self.joao.pk, self.maria.pk])
+        self.assertEqual(self.buscar("silva"), [])
+
+        call_command("rebuild_search_index", "clients", stdout=StringIO())
+        self.assertEqual(len(self.buscar("silva")), 2)
+
+
+class ClientAutocompleteTest(APITestCase):
+    def setUp(self):
+        """
+        Cria um funcionário autenticado, alguns clientes e um índice novo
+        """
+        cache.clear()
+        self.user = User.objects.create_user(username="func", password="senha12345")
+        self.user.groups.add(Group.objects.create(name="Funcionários"))
+        self.client.force_authenticate(user=self.user)
+
+        self.joao = Client.objects.create(
+            name="João Silva", email="joao@example.com", age=30
+        )
+        self.joana = Client.objects.create(
+            name="Joana Dias", email="jd@example.com", age=40
+        )
+        self.index = patch.object(
+            autocomplete, "client_index", autocomplete.ClientPrefixIndex(interval=0)
+        ).start()
+        self.addCleanup(patch.stopall)
+        patch.object(api_views, "client_index", self.index).start()
+
+    def nomes(self, q, **params):
+        response = self.client.get("/api/clients/autocomplete/", {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [item["name"] for item in response.data]
+
+    def test_prefix_search(self):
+        """
+        Busca por prefixo do nome, de uma palavra do nome e do email
+        """
+        self.assertEqual(self.nomes("JOA"), ["Joana Dias", "João Silva"])
+        self.assertEqual(self.nomes("joão s"), ["João Silva"])
+        self.assertEqual(self.nomes("dia"), ["Joana Dias"])
+        self.assertEqual(self.nomes("jd@"), ["Joana Dias"])
+        self.assertEqual(self.nomes("jo", limit=1), ["Joana Dias"])
+        self.assertEqual(self.nomes(""), [])
+
+    def test_index_follows_writes(self):
+        """
+        O índice já carregado acompanha os sinais e as alterações em lote
+        """
+        self.nomes("jo")  # carrega o índice
+        with self.assertNumQueries(0):
+            self.index.search("jo")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.joao.name = "Carlos Silva"
+            self.joao.save()
+            Client.objects.create(name="Joaquim Reis", email="jr@example.com", age=50)
+            self.joana.delete()
+        self.assertEqual(self.nomes("joan"), [])
+        self.assertEqual(self.nomes("joão s"), [])
+        self.assertEqual(self.nomes("joaq"), ["Joaquim Reis"])
+        self.assertEqual(self.nomes("silva"), ["Carlos Silva"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Client.objects.filter(name="Joaquim Reis").update(name="Bruno Reis")
+        self.assertEqual(self.nomes("joaq"), [])
+        self.assertEqual(self.nomes("reis"), ["Bruno Reis"])
+
+    def test_other_process_changes_applied_off_search_path(self):
+        """
+        O índice de outro processo (com thread de atualização) não consulta
+        o banco nas buscas e aplica alterações e remoções ao atualizar, sem
+        contar nem varrer os clientes
+        """
+        outro = autocomplete.ClientPrefixIndex(interval=60, autostart=False)
+        outro.load()
+        self.nomes("jo")  # carrega o índice deste processo
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.joana.delete()
+            Client.objects.filter(pk=self.joao.pk).update(name="Carlos Silva")
+            Client.objects.create(name="Joaquim Reis", email="jr@example.com", age=50)
+
+        with self.assertNumQueries(0):
+            nomes = [item["name"] for item in outro.search("jo")]
+        self.assertEqual(nomes, ["Joana Dias", "João Silva"])
+
+        with CaptureQueriesContext(connection) as queries:
+            outro.refresh()
+        sql = " ".join(query["sql"] for query in queries.captured_queries)
+        self.assertNotIn("COUNT(", sql)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(
+            [item["name"] for item in outro.search("jo")],
+            ["Carlos Silva", "Joaquim Reis"],
+        )
+        self.assertEqual([item["name"] for item in outro.search("joana")], [])
+        self.assertEqual(len(outro), 2)
+
+    @override_settings(AUTOCOMPLETE_REFRESH_INTERVAL=5)
+    def test_no_refresh_thread_with_per_process_cache(self):
+        """
+        Com um cache por processo o índice não inicia a thread e aplica as
+        escritas na hora; com um cache compartilhado usa o intervalo
+        """
+        index = autocomplete.ClientPrefixIndex()
+        self.assertEqual(index.interval, 0)
+        index.search("jo")
+        self.assertIsNone(index._worker)
+        index.upsert(99, "Joaquim Reis", "jr@example.com")
+        self.assertEqual(index._pending, {})
+
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+        with override_settings(CACHES=redis):
+            self.assertEqual(index.interval, 5)
+
+    def test_pending_writes_searchable_before_merge(self):
+        """
+        Escritas ficam num buffer de pendentes, visível nas buscas, até a
+        incorporação à lista ordenada
+        """
+        index = autocomplete.ClientPrefixIndex(interval=60, autostart=False)
+        index.load()
+        index.upsert(99, "Joaquim Reis", "jr@example.com")
+        index.upsert(self.joao.pk, "Carlos Silva", "joao@example.com")
+        index.remove(self.joana.pk)
+
+        def nomes(q):
+            return [item["name"] for item in index.search(q)]
+
+        def verificar():
+            self.assertEqual(nomes("jo"), ["Carlos Silva", "Joaquim Reis"])
+            self.assertEqual(nomes("silva"), ["Carlos Silva"])
+            self.assertEqual(nomes("joão s"), [])
+            self.assertEqual(nomes("dias"), [])
+
+        verificar()
+        index._merge_pending()
+        self.assertEqual(index._pending, {})
+        verificar()
+
+
+class GroupCacheTest(TestCase):
+    def setUp(self):
+        """
+        Cria um usuário no grupo Funcionários
+        """
+        cache.clear()
+        self.funcionarios = Group.objects.create(name="Funcionários")
+        self.gerentes = Group.objects.create(name="Gerentes")
+        self.user = User.objects.create_user(username="func", password="senha12345")
+        self.user.groups.add(self.funcionarios)
+        self.factory = RequestFactory()
+
+    def fresh_request(self):
+        """Requisição com um objeto user novo, como numa nova requisição"""
+        request = self.factory.get("/")
+        request.user = User.objects.get(pk=self.user.pk)
+        return request
+
+    def test_warm_cache_makes_no_queries(self):
+        """
+        Testa o decorator, a permissão do DRF e o template sem consultas
+        com o cache quente
+        """
+        get_user_groups(User.objects.get(pk=self.user.pk))
+
+        request = self.fresh_request()
+        view = type("View", (), {"required_groups": ["Funcionários"]})()
+        with self.assertNumQueries(0):
+            self.assertTrue(GroupPermission().has_permission(request, view))
+            response = group_required("Funcionários")(lambda r: HttpResponse())(request)
+            self.assertEqual(response.status_code, 200)
+            contexto = user_groups(request)
+            self.assertEqual(list(contexto["user_groups"]), ["Funcionários"])
+            self.assertEqual(
+                get_user_permissions(request.user), ["read", "update_status"]
+            )
+
+    def test_membership_changes_invalidate(self):
+        """
+        Testa a invalidação pelas alterações em User.groups nos dois sentidos
+        """
+        self.assertEqual(get_user_groups(self.user), {"Funcionários"})
+
+        self.user.groups.add(self.gerentes)
+        self.assertEqual(get_user_groups(self.user), {"Funcionários", "Gerentes"})
+
+        self.gerentes.user_set.remove(self.user)
+        request = self.fresh_request()
+        self.assertEqual(get_user_groups(request.user), {"Funcionários"})
+
+        self.funcionarios.user_set.clear()
+        request = self.fresh_request()
+        self.assertEqual(get_user_groups(request.user), frozenset())
+        response = group_required("Funcionários")(lambda r: HttpResponse())(request)
+        self.assertEqual(response.status_code, 403)
+
+    def test_group_rename_invalidates(self):
+        """
+        Testa que renomear um grupo descarta os grupos em cache
+        """
+        get_user_groups(self.user)
+        self.funcionarios.name = "Vendedores"
+        self.funcionarios.save()
+
+        request = self.fresh_request()
+        self.assertEqual(get_user_groups(request.user), {"Vendedores"})
+
+    def test_permissions_version_rotates_only_on_token_fields(self):
+        """
+        Testa que só is_active/is_staff/is_superuser trocam a versão de
+        permissões dos JWTs; senha, nome e last_login não
+        """
+        versao = permissions_version(self.user.pk)
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = "Ana"
+        user.save()
+        user.set_password("outrasenha123")
+        user.save()
+        user.last_login = timezone.now()
+        user.save(update_fields=["last_login"])
+        self.assertEqual(permissions_version(self.user.pk), versao)
+
+        user.is_staff = True
+        user.save()
+        nova = permissions_version(self.user.pk)
+        self.assertNotEqual(nova, versao)
+        user.save()
+        self.assertEqual(permissions_version(self.user.pk), nova)
+
+        # Campo adiado no carregamento e atribuído depois
+        adiado = User.objects.only("username").get(pk=self.user.pk)
+        adiado.is_active = False
+        adiado.save()
+        self.assertNotEqual(permissions_version(self.user.pk), nova)
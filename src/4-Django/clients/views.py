@@ -3,11 +3,15 @@ from django.http import JsonResponse, HttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.db.models import Q, Count, Sum, Avg
+from django.db.models import Count, Sum, Avg
 from django.contrib.auth.decorators import login_required
 from .models import Client
 from order.models import Pedido
 from .forms import ClientForm, ClientSearchForm
+from .groups import get_user_groups
+from .pagination import CachedCountPaginator
+from .search import search
+from .export import EXPORT_CHUNK_SIZE, formato_brasileiro, streaming_csv_response
 from .permissions import group_required
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
@@ -36,9 +40,7 @@ def get_clients(request):
         age_max = search_form.cleaned_data.get("age_max")
 
         if search_query:
-            clients_list = clients_list.filter(
-                Q(name__icontains=search_query) | Q(email__icontains=search_query)
-            )
+            clients_list = search(clients_list, search_query, "clients")
 
         if age_min:
             clients_list = clients_list.filter(age__gte=age_min)
@@ -46,13 +48,13 @@ def get_clients(request):
         if age_max:
             clients_list = clients_list.filter(age__lte=age_max)
 
-    # Configurar paginação
-    paginator = Paginator(clients_list, 10)
+    # Configurar paginação (contagem em cache por filtro)
+    paginator = CachedCountPaginator(clients_list, 10, "clients")
     page_number = request.GET.get("page")
     clients = paginator.get_page(page_number)
 
     # Verificar permissões para mostrar botões na template
-    user_groups = request.user.groups.values_list("name", flat=True)
+    user_groups = get_user_groups(request.user)
     can_create = (
         any(group in ["Administradores", "Gerentes"] for group in user_groups)
         or request.user.is_superuser
@@ -68,7 +70,7 @@ def get_clients(request):
         "clients.html",
         {
             "clients": clients,
-            "total_clients": clients_list.count(),
+            "total_clients": paginator.count,
             "search_form": search_form,
             "can_create": can_create,
             "can_edit": can_edit,
@@ -167,20 +169,12 @@ def detail_client(request, id):
     page_number = request.GET.get("page")
     pedidos = paginator.get_page(page_number)
 
-    # Estatísticas dos pedidos do cliente
-    pedidos_stats = client.pedidos.aggregate(
-        total_pedidos=Count("id"),
-        valor_total=Sum("valor_total"),
-        valor_medio=Avg("valor_total"),
-    )
-
-    # Pedidos por status
-    pedidos_por_status = (
-        client.pedidos.values("status").annotate(count=Count("id")).order_by("status")
-    )
+    # Estatísticas dos pedidos do cliente (totais e por status numa só consulta)
+    pedidos_stats = client.get_pedidos_statistics()
+    pedidos_por_status = pedidos_stats.pop("por_status")
 
     # Verificar permissões para mostrar botões na template
-    user_groups = request.user.groups.values_list("name", flat=True)
+    user_groups = get_user_groups(request.user)
     can_edit = (
         any(group in ["Administradores", "Gerentes"] for group in user_groups)
         or request.user.is_superuser
@@ -198,9 +192,7 @@ def detail_client(request, id):
             "client": client,
             "pedidos": pedidos,
             "pedidos_stats": pedidos_stats,
-            "pedidos_por_status": dict(
-                pedidos_por_status.values_list("status", "count")
-            ),
+            "pedidos_por_status": pedidos_por_status,
             "can_edit": can_edit,
             "can_delete": can_delete,
             "can_create_pedido": can_create_pedido,
@@ -546,11 +538,9 @@ def dashboard_pdf_report(request):
     elements.append(Spacer(1, 30))
 
     # Top 5 clientes
-    top_clientes = (
-        Client.objects.annotate(total_pedidos=Count("pedidos"))
-        .filter(total_pedidos__gt=0)
-        .order_by("-total_pedidos")[:5]
-    )
+    top_clientes = Client.objects.filter(total_pedidos__gt=0).order_by(
+        "-total_pedidos"
+    )[:5]
 
     if top_clientes:
         clientes_title = Paragraph(
@@ -683,9 +673,7 @@ def export_clients_csv(request):
         age_max = search_form.cleaned_data.get("age_max")
 
         if search_query:
-            clients_list = clients_list.filter(
-                Q(name__icontains=search_query) | Q(email__icontains=search_query)
-            )
+            clients_list = search(clients_list, search_query, "clients")
 
         if age_min:
             clients_list = clients_list.filter(age__gte=age_min)
@@ -693,19 +681,32 @@ def export_clients_csv(request):
         if age_max:
             clients_list = clients_list.filter(age__lte=age_max)
 
-    # Criar resposta CSV
-    response = HttpResponse(content_type="text/csv; charset=utf-8")
-    response["Content-Disposition"] = (
-        f'attachment; filename="clientes_{datetime.date.today()}.csv"'
+    # Contadores desnormalizados: nenhuma consulta extra por cliente
+    clients_list = clients_list.only(
+        "id",
+        "name",
+        "email",
+        "age",
+        "created_at",
+        "total_pedidos",
+        "valor_total_pedidos",
     )
 
-    # Adicionar BOM para UTF-8 (compatibilidade com Excel)
-    response.write("\ufeff")
-
-    writer = csv.writer(response, delimiter=";")
+    rows = (
+        [
+            client.id,
+            client.name,
+            client.email,
+            client.age,
+            client.created_at.strftime("%d/%m/%Y %H:%M"),
+            client.total_pedidos,
+            formato_brasileiro(client.valor_total_pedidos),
+        ]
+        for client in clients_list.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
 
-    # Cabeçalho
-    writer.writerow(
+    return streaming_csv_response(
+        f"clientes_{datetime.date.today()}.csv",
         [
             "ID",
             "Nome",
@@ -714,36 +715,10 @@ def export_clients_csv(request):
             "Data de Cadastro",
             "Total de Pedidos",
             "Valor Total em Pedidos",
-        ]
+        ],
+        rows,
     )
 
-    # Dados dos clientes
-    for client in clients_list:
-        # Estatísticas do cliente
-        pedidos_stats = client.pedidos.aggregate(
-            total_pedidos=Count("id"), valor_total=Sum("valor_total")
-        )
-
-        writer.writerow(
-            [
-                client.id,
-                client.name,
-                client.email,
-                client.age,
-                (
-                    client.created_at.strftime("%d/%m/%Y %H:%M")
-                    if hasattr(client, "created_at")
-                    else "N/A"
-                ),
-                pedidos_stats["total_pedidos"] or 0,
-                f"{pedidos_stats['valor_total'] or 0:.2f}".replace(
-                    ".", ","
-                ),  # Formato brasileiro
-            ]
-        )
-
-    return response
-
 
 @login_required
 @group_required("Administradores", "Gerentes")
@@ -791,13 +766,9 @@ def export_dashboard_csv(request):
     writer.writerow([])
 
     # Seção 3: Top Clientes
-    top_clientes = (
-        Client.objects.annotate(
-            total_pedidos=Count("pedidos"), valor_total=Sum("pedidos__valor_total")
-        )
-        .filter(total_pedidos__gt=0)
-        .order_by("-total_pedidos")[:10]
-    )
+    top_clientes = Client.objects.filter(total_pedidos__gt=0).order_by(
+        "-total_pedidos"
+    )[:10]
 
     writer.writerow(["=== TOP 10 CLIENTES ==="])
     writer.writerow(["Cliente", "Total de Pedidos", "Valor Total"])
@@ -806,7 +777,7 @@ def export_dashboard_csv(request):
             [
                 cliente.name,
                 cliente.total_pedidos,
-                f"{cliente.valor_total or 0:.2f}".replace(".", ","),
+                f"{cliente.valor_total_pedidos:.2f}".replace(".", ","),
             ]
         )
 
@@ -44,11 +44,60 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "clients.middleware.RequestTimeMiddleware",
+    "accounts.middleware.LastSeenMiddleware",
 ]
 
 LOG_REQUEST_TIME = True
 SLOW_REQUEST_THRESHOLD = 1000
 
+# Cache (memória local por padrão; use Redis/Memcached em produção para
+# compartilhar os valores entre processos)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+# Validade (segundos) das estatísticas rápidas do dashboard
+DASHBOARD_CACHE_TIMEOUT = 10
+
+# Validade (segundos) dos dias e meses encerrados dos gráficos do dashboard
+# (clients/charts.py); alterações em pedidos também descartam os valores
+DASHBOARD_CHARTS_CACHE_TIMEOUT = 300
+
+# Validade (segundos) das contagens/estatísticas das listagens HTML; os
+# valores também são descartados a cada alteração de pedido ou cliente
+LIST_CACHE_TIMEOUT = 60
+
+# Acima desse tamanho, listagens sem filtro usam a contagem estimada pelo
+# banco (PostgreSQL/MySQL) em vez de COUNT(*)
+LIST_ESTIMATED_COUNT_THRESHOLD = 100_000
+
+# Validade (segundos) dos grupos de cada usuário em cache (clients/groups.py);
+# alterações em User.groups e nos grupos também descartam os valores
+GROUPS_CACHE_TIMEOUT = 300
+
+# Intervalo (segundos) entre as gravações em lote de last_login/last_seen
+# (accounts/activity.py); 0 grava na hora, sem thread
+ACTIVITY_FLUSH_INTERVAL = config("ACTIVITY_FLUSH_INTERVAL", default=5, cast=float)
+
+# Intervalo (segundos) entre as atualizações do índice do autocomplete
+# (clients/autocomplete.py); 0 atualiza a cada escrita e busca, sem thread.
+# O índice fica na memória de cada processo (~0,62 KB por cliente: ~620 MB
+# por worker com 1 milhão de clientes) e cada worker roda a sua thread de
+# atualização. Só é usado com um cache compartilhado (veja CACHES); com
+# LocMemCache não há thread e cada processo vê apenas as próprias escritas
+AUTOCOMPLETE_REFRESH_INTERVAL = config(
+    "AUTOCOMPLETE_REFRESH_INTERVAL", default=5, cast=float
+)
+
+# Os testes zeram os dois intervalos acima (core/test_runner.py)
+TEST_RUNNER = "core.test_runner.TestRunner"
+
+# Busca textual (clients/search.py): "auto" usa FTS5 no SQLite e
+# SearchVector + trigramas no PostgreSQL; "basic" volta ao icontains
+SEARCH_BACKEND = "auto"
+
 ROOT_URLCONF = "core.urls"
 
 TEMPLATES = [
@@ -61,6 +110,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "clients.context_processors.user_groups",
             ],
         },
     },
@@ -68,10 +118,20 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "core.wsgi.application"
 
+# Autenticação JWT sem estado (accounts/authentication.py): o usuário vem
+# das claims do token, sem consultar User nem os grupos a cada requisição.
+# Requer um cache compartilhado entre os processos (veja CACHES); com
+# LocMemCache a aplicação não inicia
+JWT_STATELESS_AUTH = config("JWT_STATELESS_AUTH", default=False, cast=bool)
+
 # Configuração do Django REST Framework
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        (
+            "accounts.authentication.StatelessJWTAuthentication"
+            if JWT_STATELESS_AUTH
+            else "rest_framework_simplejwt.authentication.JWTAuthentication"
+        ),
         "rest_framework.authentication.SessionAuthentication",  # Manter para admin
     ],
     "DEFAULT_PERMISSION_CLASSES": [
@@ -102,7 +162,8 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
-    "UPDATE_LAST_LOGIN": True,
+    # last_login é gravado em lote por accounts/activity.py
+    "UPDATE_LAST_LOGIN": False,
     "ALGORITHM": "HS256",
     "SIGNING_KEY": SECRET_KEY,
     "VERIFYING_KEY": None,
@@ -122,7 +183,7 @@ SIMPLE_JWT = {
     "SLIDING_TOKEN_REFRESH_LIFETIME": timedelta(days=7),
     # Claims customizados
     "TOKEN_OBTAIN_SERIALIZER": "accounts.serializers.CustomTokenObtainPairSerializer",
-    "TOKEN_REFRESH_SERIALIZER": "rest_framework_simplejwt.serializers.TokenRefreshSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "accounts.serializers.CustomTokenRefreshSerializer",
     "TOKEN_VERIFY_SERIALIZER": "rest_framework_simplejwt.serializers.TokenVerifySerializer",
     "TOKEN_BLACKLIST_SERIALIZER": "rest_framework_simplejwt.serializers.TokenBlacklistSerializer",
     "SLIDING_TOKEN_OBTAIN_SERIALIZER": "rest_framework_simplejwt.serializers.TokenObtainSlidingSerializer",
@@ -0,0 +1,22 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+# Nos testes, as gravações em lote e o autocomplete rodam na hora, sem as
+# threads do processo (que escreveriam no banco de teste fora da transação)
+TEST_SETTINGS = {
+    "ACTIVITY_FLUSH_INTERVAL": 0,
+    "AUTOCOMPLETE_REFRESH_INTERVAL": 0,
+}
+
+
+class TestRunner(DiscoverRunner):
+    """DiscoverRunner com os ajustes de TEST_SETTINGS durante toda a execução"""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._test_settings = override_settings(**TEST_SETTINGS)
+        self._test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._test_settings.disable()
+        super().teardown_test_environment(**kwargs)
@@ -1,11 +1,9 @@
-from rest_framework.pagination import PageNumberPagination
-from rest_framework import viewsets, status, filters
+from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
-from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Count
+from .dates import filtrar_periodo
 from .models import Pedido
 from .serializers import (
     PedidoListSerializer,
@@ -15,17 +13,12 @@ from .serializers import (
     PedidoBulkActionSerializer,
     PedidoStatsSerializer,
 )
+from clients.filters import FullTextSearchFilter, RankedOrderingFilter
+from clients.export import keyset_rows, ndjson_response, parse_export_cursor
+from clients.pagination import OptionalCursorPagination
 from clients.permissions import GroupPermission
 
 
-class StandardResultsSetPagination(PageNumberPagination):
-    """Paginação padrão para a API"""
-
-    page_size = 20
-    page_size_query_param = "page_size"
-    max_page_size = 100
-
-
 class PedidoViewSet(viewsets.ModelViewSet):
     """
     ViewSet para gerenciamento de pedidos
@@ -42,20 +35,37 @@ class PedidoViewSet(viewsets.ModelViewSet):
     - bulk_actions: Ações em lote (Admin apenas)
     - stats: Estatísticas de pedidos
     - overdue: Pedidos atrasados
+    - export: Exportação completa em NDJSON por cursor
     """
 
     queryset = Pedido.objects.select_related("cliente").all()
     permission_classes = [IsAuthenticated, GroupPermission]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = OptionalCursorPagination
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter,
+        FullTextSearchFilter,
+        RankedOrderingFilter,
     ]
     filterset_fields = ["status", "prioridade", "cliente"]
+    search_index = "pedidos"
     search_fields = ["numero_pedido", "cliente__name", "descricao"]
     ordering_fields = ["data_pedido", "valor_total", "data_entrega_prevista"]
-    ordering = ["-data_pedido"]
+    ordering = ["-data_pedido", "id"]
+    export_fields = [
+        "id",
+        "numero_pedido",
+        "cliente_id",
+        "descricao",
+        "valor_total",
+        "status",
+        "prioridade",
+        "data_pedido",
+        "data_entrega_prevista",
+        "data_entrega_realizada",
+        "observacoes",
+        "created_at",
+        "updated_at",
+    ]
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -99,10 +109,12 @@ class PedidoViewSet(viewsets.ModelViewSet):
         valor_min = self.request.query_params.get("valor_min")
         valor_max = self.request.query_params.get("valor_max")
 
-        if data_inicio:
-            queryset = queryset.filter(data_pedido__date__gte=data_inicio)
-        if data_fim:
-            queryset = queryset.filter(data_pedido__date__lte=data_fim)
+        # Datas inválidas são ignoradas
+        for inicio, fim in ((data_inicio, None), (None, data_fim)):
+            try:
+                queryset = filtrar_periodo(queryset, inicio, fim)
+            except ValueError:
+                pass
         if valor_min:
             queryset = queryset.filter(valor_total__gte=valor_min)
         if valor_max:
@@ -110,6 +122,28 @@ class PedidoViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Exportação completa em NDJSON (um pedido por linha), sem paginação
+        GET /api/pedidos/export/?since=2024-01-01T00:00:00Z&after_id=10
+
+        Ordenada por (updated_at, id); para uma carga incremental, repita com
+        since/after_id iguais ao updated_at/id da última linha recebida.
+        """
+        try:
+            since, after_id = parse_export_cursor(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = keyset_rows(
+            self.filter_queryset(self.get_queryset()),
+            self.export_fields,
+            since=since,
+            after_id=after_id,
+        )
+        return ndjson_response(rows)
+
     @action(detail=True, methods=["patch"])
     def update_status(self, request, pk=None):
         """
@@ -221,17 +255,10 @@ class PedidoViewSet(viewsets.ModelViewSet):
         status_stats = Pedido.get_status_statistics()
 
         # Estatísticas por prioridade
-        priority_stats = dict(
-            Pedido.objects.values("prioridade")
-            .annotate(count=Count("id"))
-            .values_list("prioridade", "count")
-        )
+        priority_stats = Pedido.get_priority_statistics()
 
         # Pedidos atrasados
-        overdue_count = Pedido.objects.filter(
-            data_entrega_prevista__lt=timezone.now().date(),
-            status__in=["pendente", "processando", "enviado"],
-        ).count()
+        overdue_count = Pedido.objects.atrasados().count()
 
         stats_data = {
             "total_orders": revenue_stats["total_orders"],
@@ -254,10 +281,7 @@ class PedidoViewSet(viewsets.ModelViewSet):
         GET /api/pedidos/overdue/
         """
         overdue_pedidos = (
-            Pedido.objects.filter(
-                data_entrega_prevista__lt=timezone.now().date(),
-                status__in=["pendente", "processando", "enviado"],
-            )
+            Pedido.objects.atrasados()
             .select_related("cliente")
             .order_by("data_entrega_prevista")
         )
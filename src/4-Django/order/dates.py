@@ -0,0 +1,83 @@
+"""
+Filtros de período sobre DateTimeField (data_pedido) que usam o índice.
+
+data_pedido__date__gte/__lte aplicam DATE() (ou a conversão de fuso) à
+coluna, o que impede o banco de usar o índice de data_pedido. Aqui os
+dias pedidos viram um intervalo semiaberto de datetimes com fuso:
+
+    início <= data_pedido < início do dia seguinte ao fim
+
+comparando a coluna diretamente. Os dias são os do fuso atual (o mesmo
+usado por TruncDate e pelo rollup diário).
+"""
+
+import datetime
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+
+def parse_data(value):
+    """
+    Converte "AAAA-MM-DD" (ou date/datetime) em date
+
+    Returns:
+        date: O dia, ou None se value for vazio
+
+    Raises:
+        ValueError: Se a data for inválida
+    """
+    if not value:
+        return None
+    if isinstance(value, datetime.datetime):
+        return (
+            timezone.localtime(value).date()
+            if timezone.is_aware(value)
+            else value.date()
+        )
+    if isinstance(value, datetime.date):
+        return value
+    parsed = parse_date(str(value))
+    if parsed is None:
+        raise ValueError(f"Data inválida: {value}")
+    return parsed
+
+
+def inicio_do_dia(dia):
+    """Meia-noite do dia no fuso atual (datetime com fuso)"""
+    return timezone.make_aware(datetime.datetime.combine(dia, datetime.time.min))
+
+
+def intervalo(inicio=None, fim=None, campo="data_pedido"):
+    """
+    Lookups de um período de dias (inclusivo nas duas pontas)
+
+    Args:
+        inicio: Primeiro dia (date ou "AAAA-MM-DD"), ou None
+        fim: Último dia (date ou "AAAA-MM-DD"), ou None
+        campo (str): DateTimeField filtrado
+
+    Returns:
+        dict: {campo__gte: início, campo__lt: dia seguinte ao fim}
+
+    Raises:
+        ValueError: Se alguma data for inválida
+    """
+    inicio, fim = parse_data(inicio), parse_data(fim)
+    lookups = {}
+    if inicio:
+        lookups[f"{campo}__gte"] = inicio_do_dia(inicio)
+    if fim:
+        lookups[f"{campo}__lt"] = inicio_do_dia(fim + datetime.timedelta(days=1))
+    return lookups
+
+
+def q_periodo(inicio=None, fim=None, campo="data_pedido"):
+    """O mesmo que intervalo(), como Q (ex.: filtros de Count/Sum)"""
+    return Q(**intervalo(inicio, fim, campo))
+
+
+def filtrar_periodo(queryset, inicio=None, fim=None, campo="data_pedido"):
+    """Filtra o queryset pelo período de dias (veja intervalo())"""
+    return queryset.filter(**intervalo(inicio, fim, campo))
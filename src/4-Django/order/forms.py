@@ -2,6 +2,7 @@ from django import forms
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from .models import Pedido
+from clients.forms import ClientAutocompleteWidget
 from clients.models import Client
 
 
@@ -34,18 +35,21 @@ class PedidoForm(forms.ModelForm):
             "valor_total": forms.NumberInput(
                 attrs={"step": "0.01", "min": "0", "placeholder": "0.00"}
             ),
-            "cliente": forms.Select(attrs={"class": "form-control"}),
+            "cliente": ClientAutocompleteWidget(
+                attrs={
+                    "class": "form-control",
+                    "placeholder": "Digite o nome ou email do cliente...",
+                }
+            ),
             "status": forms.Select(attrs={"class": "form-control"}),
             "prioridade": forms.Select(attrs={"class": "form-control"}),
         }
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Ordenar clientes por nome
-        self.fields["cliente"].queryset = Client.objects.all().order_by("name")
-
-        # Definir labels e help_text personalizados
-        self.fields["cliente"].empty_label = "Selecione um cliente"
+        # O seletor busca os clientes pela API; o queryset só valida o id
+        # enviado e carrega o cliente já selecionado
+        self.fields["cliente"].queryset = Client.objects.all()
 
         # Tornar campos obrigatórios mais claros
         for field_name, field in self.fields.items():
@@ -91,10 +95,11 @@ class PedidoSearchForm(forms.Form):
     )
 
     cliente = forms.ModelChoiceField(
-        queryset=Client.objects.all().order_by("name"),
+        queryset=Client.objects.all(),
         required=False,
-        empty_label="Todos os clientes",
-        widget=forms.Select(attrs={"class": "form-control"}),
+        widget=ClientAutocompleteWidget(
+            attrs={"class": "form-control", "placeholder": "Todos os clientes"}
+        ),
         label="Cliente",
     )
 
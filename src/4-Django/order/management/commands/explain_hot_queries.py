@@ -0,0 +1,114 @@
+import re
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from clients.models import Client
+from order.dates import filtrar_periodo
+from order.models import Pedido
+
+
+def _cliente_id():
+    return Client.objects.values_list("pk", flat=True).first() or 0
+
+
+# nome -> (descrição, função que monta o queryset)
+HOT_QUERIES = {
+    "atrasados": (
+        "Pedidos em aberto com entrega vencida",
+        lambda: Pedido.objects.atrasados().order_by("data_entrega_prevista"),
+    ),
+    "cliente_recentes": (
+        "Linha do tempo de um cliente",
+        lambda: Pedido.objects.filter(cliente_id=_cliente_id()).order_by(
+            "-data_pedido"
+        )[:10],
+    ),
+    "status_recentes": (
+        "Listagem filtrada por status, mais recentes primeiro",
+        lambda: Pedido.objects.filter(status="pendente").order_by("-data_pedido")[:25],
+    ),
+    "periodo": (
+        "Pedidos dos últimos 30 dias",
+        lambda: filtrar_periodo(
+            Pedido.objects.order_by("-data_pedido"),
+            timezone.localdate() - timedelta(days=30),
+            timezone.localdate(),
+        ),
+    ),
+    "listagem": (
+        "Primeira página da listagem (paginação por cursor)",
+        lambda: Pedido.objects.order_by("-data_pedido", "id")[:25],
+    ),
+    "exportacao": (
+        "Lote da exportação incremental",
+        lambda: Pedido.objects.filter(
+            updated_at__gte=timezone.now() - timedelta(days=1)
+        ).order_by("updated_at", "id")[:2000],
+    ),
+    "numero": (
+        "Busca pelo número do pedido",
+        lambda: Pedido.objects.filter(numero_pedido="PED000001"),
+    ),
+}
+
+# Linhas do plano que indicam leitura da tabela inteira
+FULL_SCAN = re.compile(r"\bSCAN order_pedido\b(?! USING)|Seq Scan on order_pedido")
+
+
+class Command(BaseCommand):
+    help = (
+        "Mostra o EXPLAIN das consultas de pedidos mais usadas, para conferir "
+        "quais índices cada uma usa (SQLite e PostgreSQL)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "queries",
+            nargs="*",
+            metavar="consulta",
+            help=f"Consultas a explicar (padrão: todas): {', '.join(HOT_QUERIES)}",
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Executa as consultas (EXPLAIN ANALYZE, só no PostgreSQL)",
+        )
+
+    def handle(self, *args, **options):
+        names = options["queries"] or list(HOT_QUERIES)
+        unknown = [name for name in names if name not in HOT_QUERIES]
+        if unknown:
+            raise CommandError(f"Consulta(s) desconhecida(s): {', '.join(unknown)}")
+
+        explain_options = {}
+        if options["analyze"]:
+            if connection.vendor != "postgresql":
+                raise CommandError("--analyze só é suportado no PostgreSQL")
+            explain_options = {"analyze": True, "buffers": True}
+
+        sem_indice = 0
+        for name in names:
+            description, build = HOT_QUERIES[name]
+            plan = build().explain(**explain_options)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{name}: {description}"))
+            self.stdout.write(plan)
+            if FULL_SCAN.search(plan):
+                sem_indice += 1
+                self.stdout.write(self.style.WARNING("Leitura completa da tabela"))
+            self.stdout.write("")
+
+        if sem_indice:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{sem_indice} consulta(s) sem índice em {connection.vendor}"
+                )
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Todas as consultas usam índices em {connection.vendor}"
+                )
+            )
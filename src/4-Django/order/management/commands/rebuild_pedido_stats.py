@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from order.models import Pedido, PedidoDailyStats
+
+
+class Command(BaseCommand):
+    help = "Recria o rollup diário de pedidos (PedidoDailyStats) a partir dos pedidos"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Linhas inseridas por lote (padrão: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        grupos = PedidoDailyStats.grupos(Pedido.objects.all())
+
+        with transaction.atomic():
+            removidas, _ = PedidoDailyStats.objects.all().delete()
+            self.stdout.write(f"{removidas} linha(s) antigas removidas")
+
+            lote, total = [], 0
+            for grupo in grupos.iterator(chunk_size=batch_size):
+                lote.append(
+                    PedidoDailyStats(
+                        data=grupo["dia"],
+                        status=grupo["status"],
+                        prioridade=grupo["prioridade"],
+                        cliente_id=grupo["cliente_id"],
+                        quantidade=grupo["quantidade"],
+                        valor_total=grupo["soma"],
+                    )
+                )
+                if len(lote) >= batch_size:
+                    PedidoDailyStats.objects.bulk_create(lote)
+                    total += len(lote)
+                    lote = []
+            PedidoDailyStats.objects.bulk_create(lote)
+            total += len(lote)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rollup recriado com {total} linha(s) de estatísticas")
+        )
@@ -1,9 +1,187 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
 from django.core.exceptions import ValidationError
 from django.urls import reverse
+from django.utils import timezone
 from clients.models import Client  # Importando o modelo Client
 from decimal import Decimal
 
+# Campos do pedido que definem a sua linha no PedidoDailyStats
+ROLLUP_FIELDS = {"data_pedido", "status", "prioridade", "cliente", "valor_total"}
+# As mesmas colunas, na ordem da chave do rollup
+ROLLUP_COLUMNS = ("data_pedido", "status", "prioridade", "cliente_id", "valor_total")
+# Campos gravados no índice de busca (clients/search.py)
+SEARCH_FIELDS = {"numero_pedido", "descricao", "cliente"}
+# Campos que entram nas séries dos gráficos do dashboard (clients/charts.py)
+CHART_FIELDS = {"data_pedido", "status", "valor_total"}
+# Status em que um pedido ainda pode ficar atrasado
+STATUS_EM_ABERTO = ["pendente", "processando", "enviado"]
+
+
+def _data_local(momento):
+    """Dia do pedido no fuso horário atual (o mesmo usado pelo TruncDate)"""
+    if timezone.is_aware(momento):
+        momento = timezone.localtime(momento)
+    return momento.date()
+
+
+def atualizar_contadores_cliente(
+    cliente_id, quantidade, valor, momento=None, recalcular_ultimo=False
+):
+    """
+    Atualiza total_pedidos, valor_total_pedidos e ultimo_pedido_em de um
+    cliente com F(), sem ler a linha antes
+
+    Args:
+        cliente_id (int): Cliente afetado
+        quantidade (int): Variação do total de pedidos
+        valor (Decimal): Variação do valor total
+        momento (datetime): data_pedido de um pedido novo do cliente
+        recalcular_ultimo (bool): Recalcula ultimo_pedido_em a partir dos
+            pedidos (quando um pedido saiu do cliente)
+    """
+    from django.db.models import Case, OuterRef, Subquery, Value, When
+
+    alteracao = {
+        "total_pedidos": F("total_pedidos") + quantidade,
+        "valor_total_pedidos": F("valor_total_pedidos") + valor,
+    }
+    if recalcular_ultimo:
+        alteracao["ultimo_pedido_em"] = Subquery(
+            Pedido.objects.filter(cliente_id=OuterRef("pk"))
+            .order_by("-data_pedido")
+            .values("data_pedido")[:1]
+        )
+    elif momento is not None:
+        alteracao["ultimo_pedido_em"] = Case(
+            When(ultimo_pedido_em__gte=momento, then=F("ultimo_pedido_em")),
+            default=Value(momento),
+        )
+    Client.objects.filter(pk=cliente_id).update(**alteracao)
+
+
+def registrar_alteracao(antigo, novo, momento=None):
+    """
+    Propaga a criação, alteração ou remoção de um pedido para o rollup
+    diário e para os contadores do cliente
+
+    Args:
+        antigo (tuple): Estado anterior (chave, valor) ou None se é novo
+        novo (tuple): Estado atual (chave, valor) ou None se foi removido
+        momento (datetime): data_pedido do pedido
+    """
+    if antigo == novo:
+        return
+    PedidoDailyStats.registrar_alteracao(antigo, novo)
+
+    cliente_antigo = antigo[0][3] if antigo else None
+    cliente_novo = novo[0][3] if novo else None
+    if cliente_antigo == cliente_novo:
+        if antigo[1] != novo[1]:
+            atualizar_contadores_cliente(cliente_novo, 0, novo[1] - antigo[1])
+        return
+    if antigo is not None:
+        atualizar_contadores_cliente(
+            cliente_antigo, -1, -antigo[1], recalcular_ultimo=True
+        )
+    if novo is not None:
+        atualizar_contadores_cliente(cliente_novo, 1, novo[1], momento=momento)
+
+
+def _totais_por_cliente(pedidos):
+    from django.db.models import Count, Sum
+
+    return {
+        linha["cliente_id"]: (linha["quantidade"], linha["soma"])
+        for linha in pedidos.order_by()
+        .values("cliente_id")
+        .annotate(quantidade=Count("id"), soma=Sum("valor_total"))
+    }
+
+
+class PedidoQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """
+        Atualização em lote que mantém o PedidoDailyStats consistente.
+
+        Se algum campo do rollup for alterado, os grupos afetados são
+        subtraídos antes e somados de novo depois do UPDATE, na mesma
+        transação. Os contadores dos clientes recebem a diferença, e o
+        índice de busca é regravado se algum campo buscável mudar.
+
+        Se mudar algum campo dos gráficos, os buckets (dia e mês) dos
+        pedidos afetados, antes e depois do UPDATE, saem do cache após o
+        commit: os buckets encerrados não expiram sozinhos.
+
+        updated_at é atualizado (como no save()) para que as exportações
+        incrementais por updated_at enxerguem a alteração.
+        """
+        from clients.cache import invalidate_list
+        from clients.charts import invalidate_buckets
+        from clients.search import update_index
+
+        kwargs.setdefault("updated_at", timezone.now())
+        campos = {field.removesuffix("_id") for field in kwargs}
+        alterados = campos & ROLLUP_FIELDS
+        if not alterados and not campos & SEARCH_FIELDS:
+            count = super().update(**kwargs)
+        elif not alterados:
+            with transaction.atomic(using=self.db):
+                ids = list(self.values_list("pk", flat=True))
+                count = super().update(**kwargs)
+                update_index("pedidos", self.model.objects.filter(pk__in=ids))
+        else:
+            with transaction.atomic(using=self.db):
+                ids = list(self.values_list("pk", flat=True))
+                afetados = self.model.objects.filter(pk__in=ids)
+                dias = set()
+                if campos & CHART_FIELDS:
+                    dias.update(afetados.datetimes("data_pedido", "day"))
+                antes = _totais_por_cliente(afetados)
+                PedidoDailyStats.aplicar_grupos(afetados, sinal=-1)
+                count = super().update(**kwargs)
+                PedidoDailyStats.aplicar_grupos(afetados, sinal=1)
+                depois = _totais_por_cliente(afetados)
+                if campos & CHART_FIELDS:
+                    dias.update(afetados.datetimes("data_pedido", "day"))
+
+                for cliente_id in antes.keys() | depois.keys():
+                    quantidade_antes, valor_antes = antes.get(cliente_id, (0, 0))
+                    quantidade_depois, valor_depois = depois.get(cliente_id, (0, 0))
+                    if (quantidade_antes, valor_antes) != (
+                        quantidade_depois,
+                        valor_depois,
+                    ):
+                        atualizar_contadores_cliente(
+                            cliente_id,
+                            quantidade_depois - quantidade_antes,
+                            valor_depois - valor_antes,
+                            recalcular_ultimo=quantidade_antes != quantidade_depois,
+                        )
+
+                if campos & SEARCH_FIELDS:
+                    update_index("pedidos", afetados)
+
+                def invalidar_graficos():
+                    for dia in dias:
+                        invalidate_buckets(dia)
+
+                transaction.on_commit(invalidar_graficos, using=self.db)
+
+        # Contagens/estatísticas da listagem em cache deixam de valer
+        transaction.on_commit(lambda: invalidate_list("pedidos"), using=self.db)
+        return count
+
+    def atrasados(self, hoje=None):
+        """
+        Pedidos em aberto com a entrega prevista antes de hoje
+        (coberto pelo índice parcial pedido_atrasados_idx)
+        """
+        hoje = hoje or timezone.now().date()
+        return self.filter(data_entrega_prevista__lt=hoje, status__in=STATUS_EM_ABERTO)
+
 
 class Pedido(models.Model):
     STATUS_CHOICES = [
@@ -25,6 +203,8 @@ class Pedido(models.Model):
         Client,  # Referência ao modelo Client
         on_delete=models.CASCADE,
         related_name="pedidos",
+        # Coberto por (cliente, status) e (cliente, -data_pedido)
+        db_index=False,
         verbose_name="Cliente",
         help_text="Cliente que fez o pedido",
     )
@@ -93,16 +273,40 @@ class Pedido(models.Model):
 
     updated_at = models.DateTimeField(verbose_name="Atualizado em", auto_now=True)
 
+    objects = PedidoQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Pedido"
         verbose_name_plural = "Pedidos"
         ordering = ["-data_pedido"]  # Mais recentes primeiro
+        # Índices conferidos com `manage.py explain_hot_queries`.
+        # numero_pedido já tem o índice do unique; data_pedido, status e
+        # cliente (o índice da FK) são prefixos dos índices compostos abaixo.
         indexes = [
-            models.Index(fields=["numero_pedido"]),
             models.Index(fields=["cliente", "status"]),
-            models.Index(fields=["data_pedido"]),
-            models.Index(fields=["status"]),
             models.Index(fields=["prioridade"]),
+            # Linha do tempo do cliente (cliente ORDER BY -data_pedido)
+            models.Index(
+                fields=["cliente", "-data_pedido"], name="pedido_cliente_recentes_idx"
+            ),
+            # Listagem filtrada por status, mais recentes primeiro
+            models.Index(
+                fields=["status", "-data_pedido"], name="pedido_status_recentes_idx"
+            ),
+            # Pedidos atrasados. Parcial por "entrega prevista não nula": o
+            # SQLite só usa um índice parcial se o WHERE da consulta implicar
+            # a condição, e data_entrega_prevista < ? implica IS NOT NULL
+            # (um status IN (...) com parâmetros nunca casaria)
+            models.Index(
+                fields=["status", "data_entrega_prevista"],
+                condition=models.Q(data_entrega_prevista__isnull=False),
+                name="pedido_atrasados_idx",
+            ),
+            # Ordenação da listagem (paginação por cursor) e períodos de
+            # data_pedido (order/dates.py)
+            models.Index(fields=["-data_pedido", "id"], name="pedido_list_cursor_idx"),
+            # Cursor das exportações incrementais (api/pedidos/export/)
+            models.Index(fields=["updated_at", "id"], name="pedido_export_cursor_idx"),
         ]
         constraints = [
             models.CheckConstraint(
@@ -166,7 +370,65 @@ class Pedido(models.Model):
 
         # Executar validações
         self.full_clean()
-        super().save(*args, **kwargs)
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and not ROLLUP_FIELDS & {
+            field.removesuffix("_id") for field in update_fields
+        }:
+            # Nenhuma coluna do rollup é gravada: nada a propagar
+            super().save(*args, **kwargs)
+            return
+
+        # Pedido e rollup diário gravados na mesma transação. O estado
+        # anterior é o do banco, com a linha travada: duas requisições que
+        # carregaram o mesmo pedido não o tiram da mesma linha do rollup
+        # (nem do mesmo cliente) duas vezes
+        with transaction.atomic():
+            antigo = self._rollup_no_banco() if self.pk is not None else None
+            super().save(*args, **kwargs)
+            if update_fields is None:
+                estado = self._rollup_estado()
+            else:
+                # Só parte das colunas foi gravada: o resto vem do banco
+                estado = self._rollup_no_banco()
+            registrar_alteracao(antigo, estado, self.data_pedido)
+
+    def _rollup_no_banco(self):
+        """
+        Estado do rollup gravado no banco, com a linha travada até o fim da
+        transação
+
+        Returns:
+            tuple: Como _rollup_estado(), ou None se o pedido não existe
+        """
+        linha = (
+            Pedido.objects.select_for_update()
+            .filter(pk=self.pk)
+            .values_list(*ROLLUP_COLUMNS)
+            .first()
+        )
+        if linha is None:
+            return None
+        data_pedido, status, prioridade, cliente_id, valor_total = linha
+        return (
+            (_data_local(data_pedido), status, prioridade, cliente_id),
+            Decimal(str(valor_total)),
+        )
+
+    def _rollup_estado(self):
+        """
+        Returns:
+            tuple: ((data, status, prioridade, cliente_id), valor_total)
+        """
+        return (
+            (
+                _data_local(self.data_pedido),
+                self.status,
+                self.prioridade,
+                self.cliente_id,
+            ),
+            Decimal(str(self.valor_total)),
+        )
 
     def generate_order_number(self):
         """
@@ -263,44 +525,254 @@ class Pedido(models.Model):
     @classmethod
     def get_status_statistics(cls):
         """
-        Retorna estatísticas por status
+        Retorna estatísticas por status (lidas do PedidoDailyStats)
         """
-        from django.db.models import Count
+        from django.db.models import Sum
 
         stats = (
-            cls.objects.values("status").annotate(count=Count("id")).order_by("status")
+            PedidoDailyStats.objects.values("status")
+            .annotate(count=Sum("quantidade"))
+            .filter(count__gt=0)
+            .order_by("status")
         )
 
         return {item["status"]: item["count"] for item in stats}
 
     @classmethod
-    def get_revenue_statistics(cls):
+    def get_priority_statistics(cls):
         """
-        Retorna estatísticas de receita
+        Retorna estatísticas por prioridade (lidas do PedidoDailyStats)
         """
-        from django.db.models import Sum, Avg, Count
-        from django.utils import timezone
+        from django.db.models import Sum
 
-        # Estatísticas gerais
-        total_stats = cls.objects.exclude(status="cancelado").aggregate(
-            total_orders=Count("id"),
-            total_revenue=Sum("valor_total"),
-            average_order_value=Avg("valor_total"),
+        stats = (
+            PedidoDailyStats.objects.values("prioridade")
+            .annotate(count=Sum("quantidade"))
+            .filter(count__gt=0)
+            .order_by("prioridade")
         )
 
-        # Estatísticas do mês atual
-        current_month = timezone.now().replace(day=1)
-        monthly_stats = (
-            cls.objects.filter(data_pedido__gte=current_month)
-            .exclude(status="cancelado")
-            .aggregate(monthly_orders=Count("id"), monthly_revenue=Sum("valor_total"))
+        return {item["prioridade"]: item["count"] for item in stats}
+
+    @classmethod
+    def get_revenue_statistics(cls):
+        """
+        Retorna estatísticas de receita (lidas do PedidoDailyStats)
+        """
+        from django.db.models import Q, Sum
+
+        current_month = timezone.localdate().replace(day=1)
+        stats = PedidoDailyStats.objects.exclude(status="cancelado").aggregate(
+            total_orders=Sum("quantidade"),
+            total_revenue=Sum("valor_total"),
+            monthly_orders=Sum("quantidade", filter=Q(data__gte=current_month)),
+            monthly_revenue=Sum("valor_total", filter=Q(data__gte=current_month)),
         )
 
+        total_orders = stats["total_orders"] or 0
+        total_revenue = stats["total_revenue"] or Decimal("0.00")
         return {
-            "total_orders": total_stats["total_orders"] or 0,
-            "total_revenue": total_stats["total_revenue"] or Decimal("0.00"),
-            "average_order_value": total_stats["average_order_value"]
-            or Decimal("0.00"),
-            "monthly_orders": monthly_stats["monthly_orders"] or 0,
-            "monthly_revenue": monthly_stats["monthly_revenue"] or Decimal("0.00"),
+            "total_orders": total_orders,
+            "total_revenue": total_revenue,
+            "average_order_value": (
+                total_revenue / total_orders if total_orders else Decimal("0.00")
+            ),
+            "monthly_orders": stats["monthly_orders"] or 0,
+            "monthly_revenue": stats["monthly_revenue"] or Decimal("0.00"),
+        }
+
+
+class PedidoDailyStats(models.Model):
+    """
+    Rollup diário dos pedidos: quantidade e soma dos valores por
+    (data, status, prioridade, cliente).
+
+    Mantido de forma incremental por Pedido.save(), pelo sinal post_delete
+    e por PedidoQuerySet.update(). O comando rebuild_pedido_stats recria a
+    tabela a partir dos pedidos.
+    """
+
+    data = models.DateField(verbose_name="Data")
+    status = models.CharField(
+        verbose_name="Status", max_length=20, choices=Pedido.STATUS_CHOICES
+    )
+    prioridade = models.CharField(
+        verbose_name="Prioridade", max_length=10, choices=Pedido.PRIORIDADE_CHOICES
+    )
+    cliente = models.ForeignKey(
+        Client,
+        on_delete=models.CASCADE,
+        related_name="estatisticas_diarias",
+        verbose_name="Cliente",
+    )
+    quantidade = models.IntegerField(verbose_name="Quantidade", default=0)
+    valor_total = models.DecimalField(
+        verbose_name="Valor Total", max_digits=14, decimal_places=2, default=0
+    )
+
+    class Meta:
+        verbose_name = "Estatística Diária de Pedidos"
+        verbose_name_plural = "Estatísticas Diárias de Pedidos"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["data", "status", "prioridade", "cliente"],
+                name="pedido_daily_stats_unico",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["status", "data"]),
+            models.Index(fields=["cliente", "data"]),
+        ]
+
+    def __str__(self):
+        return f"{self.data} {self.status}/{self.prioridade} - {self.quantidade}"
+
+    @classmethod
+    def aplicar(cls, chave, quantidade, valor):
+        """
+        Soma (ou subtrai) quantidade e valor na linha da chave com F(),
+        criando a linha se ainda não existir
+
+        Args:
+            chave (tuple): (data, status, prioridade, cliente_id)
+            quantidade (int): Variação da quantidade de pedidos
+            valor (Decimal): Variação do valor total
+        """
+        data, status, prioridade, cliente_id = chave
+        filtro = {
+            "data": data,
+            "status": status,
+            "prioridade": prioridade,
+            "cliente_id": cliente_id,
+        }
+        alteracao = {
+            "quantidade": F("quantidade") + quantidade,
+            "valor_total": F("valor_total") + valor,
         }
+
+        if cls.objects.filter(**filtro).update(**alteracao):
+            if quantidade < 0:
+                cls.objects.filter(**filtro, quantidade__lte=0).delete()
+            return
+
+        # Sem linha para subtrair (ex.: cliente removido em cascata)
+        if quantidade <= 0:
+            return
+
+        try:
+            with transaction.atomic():
+                cls.objects.create(**filtro, quantidade=quantidade, valor_total=valor)
+        except IntegrityError:
+            # Outra transação criou a linha ao mesmo tempo
+            cls.objects.filter(**filtro).update(**alteracao)
+
+    @classmethod
+    def registrar_alteracao(cls, antigo, novo):
+        """
+        Move um pedido de uma linha do rollup para outra
+
+        Args:
+            antigo (tuple): Estado anterior (chave, valor) ou None se é novo
+            novo (tuple): Estado atual (chave, valor) ou None se foi removido
+        """
+        if antigo == novo:
+            return
+        if antigo is not None:
+            cls.aplicar(antigo[0], -1, -antigo[1])
+        if novo is not None:
+            cls.aplicar(novo[0], 1, novo[1])
+
+    @classmethod
+    def grupos(cls, pedidos):
+        """
+        Agrupa pedidos pelas chaves do rollup (consulta feita no banco)
+
+        Returns:
+            QuerySet de dicts com data, status, prioridade, cliente_id,
+            quantidade e valor_total
+        """
+        from django.db.models import Count, Sum
+        from django.db.models.functions import TruncDate
+
+        return (
+            pedidos.order_by()
+            .annotate(dia=TruncDate("data_pedido"))
+            .values("dia", "status", "prioridade", "cliente_id")
+            .annotate(quantidade=Count("id"), soma=Sum("valor_total"))
+        )
+
+    @classmethod
+    def aplicar_grupos(cls, pedidos, sinal):
+        """Soma (sinal=1) ou subtrai (sinal=-1) os grupos de um queryset"""
+        for grupo in cls.grupos(pedidos):
+            cls.aplicar(
+                (
+                    grupo["dia"],
+                    grupo["status"],
+                    grupo["prioridade"],
+                    grupo["cliente_id"],
+                ),
+                sinal * grupo["quantidade"],
+                sinal * grupo["soma"],
+            )
+
+
+# Signals para invalidar os buckets dos gráficos do dashboard
+@receiver(post_save, sender=Pedido)
+@receiver(post_delete, sender=Pedido)
+def invalidate_caches(sender, instance, **kwargs):
+    """
+    Um pedido criado, alterado ou removido muda o dia e o mês em que foi
+    feito; remove esses buckets do cache das séries do dashboard e descarta
+    as contagens/estatísticas em cache da listagem de pedidos
+    """
+    from clients.cache import invalidate_list
+    from clients.charts import invalidate_buckets
+
+    transaction.on_commit(lambda: invalidate_list("pedidos"))
+    # Pedido já removido por outra transação: data_pedido não foi carregado
+    if "data_pedido" in instance.get_deferred_fields():
+        return
+    if instance.data_pedido:
+        data_pedido = instance.data_pedido
+        transaction.on_commit(lambda: invalidate_buckets(data_pedido))
+
+
+@receiver(pre_delete, sender=Pedido)
+def lock_rollup_state(sender, instance, **kwargs):
+    """
+    Lê e trava a linha do pedido antes da exclusão (na transação do
+    delete()), para retirar do rollup o estado gravado no banco. Se outra
+    transação já removeu o pedido, não há nada a retirar
+    """
+    instance._rollup_removido = instance._rollup_no_banco()
+    # Carregado com only()/defer(): os outros sinais usam data_pedido etc.
+    deferidos = set(ROLLUP_COLUMNS) & instance.get_deferred_fields()
+    if deferidos and instance._rollup_removido is not None:
+        instance.refresh_from_db(fields=deferidos)
+
+
+@receiver(post_delete, sender=Pedido)
+def remove_from_statistics(sender, instance, **kwargs):
+    """
+    Retira o pedido removido do rollup diário e dos contadores do cliente.
+    Também é chamado para cada pedido em exclusões em lote (queryset.delete()
+    e cascata do cliente), dentro da transação da exclusão
+    """
+    registrar_alteracao(getattr(instance, "_rollup_removido", None), None)
+
+
+@receiver(post_save, sender=Pedido)
+def update_search_index(sender, instance, **kwargs):
+    """Regrava o pedido no índice de busca (na transação do save)"""
+    from clients.search import update_index
+
+    update_index("pedidos", Pedido.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Pedido)
+def remove_from_search_index(sender, instance, **kwargs):
+    """Retira o pedido removido do índice de busca"""
+    from clients.search import remove_from_index
+
+    remove_from_index("pedidos", [instance.pk])
@@ -1,6 +1,7 @@
 # myapp/permissions.py
 from rest_framework import permissions
 from django.http import HttpResponseForbidden
+from clients.groups import in_groups
 
 
 class GroupPermission(permissions.BasePermission):
@@ -18,8 +19,8 @@ class GroupPermission(permissions.BasePermission):
             return True
 
         # Verificar se o usuário pertence a algum dos grupos obrigatórios
-        user_groups = request.user.groups.values_list("name", flat=True)
-        return any(group in user_groups for group in required_groups)
+        # (grupos em cache, veja clients/groups.py)
+        return in_groups(request.user, required_groups)
 
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
@@ -48,8 +49,7 @@ def group_required(*group_names):
                 if request.user.is_superuser:
                     return view_func(request, *args, **kwargs)
 
-                user_groups = request.user.groups.values_list("name", flat=True)
-                if any(group in user_groups for group in group_names):
+                if in_groups(request.user, group_names):
                     return view_func(request, *args, **kwargs)
 
             return HttpResponseForbidden(
@@ -1,3 +1,832 @@
-from django.test import TestCase
+import datetime
+import gzip
+import json
+from io import StringIO
+from decimal import Decimal
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from unittest.mock import patch
+from rest_framework.test import APITestCase
+from clients import charts
+from clients.models import Client
+from . import views
+from .dates import filtrar_periodo, intervalo
+from .forms import PedidoForm
+from .models import Pedido, PedidoDailyStats
 
-# Create your tests here.
+
+class PedidoDailyStatsTest(TestCase):
+    def setUp(self):
+        """
+        Cria dois clientes com alguns pedidos
+        """
+        self.ana = Client.objects.create(name="Ana", email="ana@example.com", age=30)
+        self.beto = Client.objects.create(name="Beto", email="beto@example.com", age=40)
+        self.pedidos = [
+            Pedido.objects.create(
+                cliente=cliente,
+                descricao="Pedido de teste com descrição",
+                valor_total=valor,
+                prioridade=prioridade,
+            )
+            for cliente, valor, prioridade in [
+                (self.ana, "10.00", "media"),
+                (self.ana, "20.00", "media"),
+                (self.ana, "5.00", "alta"),
+                (self.beto, "100.00", "baixa"),
+            ]
+        ]
+
+    def rollup(self):
+        """Linhas do rollup como {(status, prioridade, cliente): (qtd, valor)}"""
+        return {
+            (linha.status, linha.prioridade, linha.cliente_id): (
+                linha.quantidade,
+                linha.valor_total,
+            )
+            for linha in PedidoDailyStats.objects.all()
+        }
+
+    def esperado(self):
+        """O mesmo agrupamento calculado a partir dos pedidos"""
+        return {
+            (g["status"], g["prioridade"], g["cliente_id"]): (
+                g["quantidade"],
+                g["soma"],
+            )
+            for g in PedidoDailyStats.grupos(Pedido.objects.all())
+        }
+
+    def test_create_updates_rollup(self):
+        """
+        Testa o rollup preenchido ao criar pedidos
+        """
+        self.assertEqual(
+            self.rollup()[("pendente", "media", self.ana.id)], (2, Decimal("30.00"))
+        )
+        self.assertEqual(self.rollup(), self.esperado())
+
+    def test_save_moves_order_between_rows(self):
+        """
+        Testa a mudança de status e valor num pedido existente
+        """
+        pedido = Pedido.objects.get(pk=self.pedidos[0].pk)
+        pedido.status = "processando"
+        pedido.valor_total = Decimal("12.00")
+        pedido.save()
+
+        rollup = self.rollup()
+        self.assertEqual(rollup[("pendente", "media", self.ana.id)], (1, Decimal("20")))
+        self.assertEqual(
+            rollup[("processando", "media", self.ana.id)], (1, Decimal("12"))
+        )
+        self.assertEqual(rollup, self.esperado())
+
+    @override_settings(TIME_ZONE="America/Sao_Paulo")
+    def test_save_near_midnight_invalidates_local_day_bucket(self):
+        """
+        Testa a invalidação do bucket do dia no fuso atual: às 01h UTC
+        ainda é o dia anterior em São Paulo
+        """
+        cache.clear()
+        hoje = timezone.localdate()
+        mes_passado = hoje.replace(day=1) - datetime.timedelta(days=1)
+        momento = datetime.datetime.combine(
+            mes_passado + datetime.timedelta(days=1),
+            datetime.time(1),
+            tzinfo=datetime.timezone.utc,
+        )
+        Pedido.objects.filter(pk=self.pedidos[0].pk).update(data_pedido=momento)
+
+        def pedidos_do_dia():
+            return {
+                item["date"]: item["count"]
+                for item in charts.daily_orders(hoje, days=40)
+            }[mes_passado.isoformat()]
+
+        self.assertEqual(pedidos_do_dia(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Pedido.objects.get(pk=self.pedidos[0].pk).delete()
+        self.assertEqual(pedidos_do_dia(), 0)
+
+    def test_stale_instances_use_stored_state(self):
+        """
+        Testa duas cópias carregadas do mesmo pedido salvas uma depois da
+        outra (duas requisições): a segunda sai da linha gravada pela
+        primeira, não da linha que ela carregou
+        """
+        primeira = Pedido.objects.get(pk=self.pedidos[0].pk)
+        segunda = Pedido.objects.get(pk=self.pedidos[0].pk)
+
+        primeira.status = "enviado"
+        primeira.save()
+        segunda.status = "processando"
+        segunda.save()
+        rollup = self.rollup()
+        self.assertEqual(rollup[("pendente", "media", self.ana.id)], (1, Decimal("20")))
+        self.assertNotIn(("enviado", "media", self.ana.id), rollup)
+        self.assertEqual(rollup, self.esperado())
+
+        # Remover duas cópias: a segunda não encontra mais o pedido
+        copias = [Pedido.objects.get(pk=self.pedidos[1].pk) for _ in range(2)]
+        for copia in copias:
+            copia.delete()
+        self.assertEqual(self.rollup(), self.esperado())
+
+    def test_save_deferred_instance_is_not_counted_again(self):
+        """
+        Testa o save de pedidos carregados com only()/defer(): o estado
+        anterior vem do banco e o pedido não é contado como novo
+        """
+        pedido = Pedido.objects.only("id", "descricao").get(pk=self.pedidos[0].pk)
+        pedido.descricao = "Descrição alterada do pedido"
+        pedido.save()
+        self.assertEqual(
+            self.rollup()[("pendente", "media", self.ana.id)], (2, Decimal("30.00"))
+        )
+
+        pedido = Pedido.objects.defer("status").get(pk=self.pedidos[1].pk)
+        pedido.status = "enviado"
+        pedido.save()
+        rollup = self.rollup()
+        self.assertEqual(rollup[("pendente", "media", self.ana.id)], (1, Decimal("10")))
+        self.assertEqual(rollup[("enviado", "media", self.ana.id)], (1, Decimal("20")))
+        self.assertEqual(rollup, self.esperado())
+
+    def test_bulk_update_and_delete(self):
+        """
+        Testa as ações em lote (update/delete em querysets)
+        """
+        Pedido.objects.filter(cliente=self.ana).update(status="enviado")
+        self.assertEqual(self.rollup(), self.esperado())
+
+        Pedido.objects.filter(prioridade="media").update(prioridade="urgente")
+        self.assertEqual(self.rollup(), self.esperado())
+
+        Pedido.objects.filter(valor_total__lt=15).delete()
+        self.assertEqual(self.rollup(), self.esperado())
+
+        self.beto.delete()
+        self.assertEqual(self.rollup(), self.esperado())
+
+    def test_bulk_status_update_invalidates_closed_chart_buckets(self):
+        """
+        Testa a mudança de status em lote de pedidos do mês passado: os
+        buckets encerrados (dia e mês) saem do cache após o commit
+        """
+        cache.clear()
+        hoje = timezone.localdate()
+        mes_passado = hoje.replace(day=1) - datetime.timedelta(days=1)
+        momento = timezone.make_aware(
+            datetime.datetime.combine(mes_passado, datetime.time(12))
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Pedido.objects.filter(cliente=self.ana).update(data_pedido=momento)
+
+        def receita_mes_passado():
+            return charts.monthly_revenue(hoje)[-2]
+
+        def pedidos_do_dia():
+            return {
+                item["date"]: item["count"]
+                for item in charts.daily_orders(hoje, days=40)
+            }[mes_passado.isoformat()]
+
+        self.assertEqual(receita_mes_passado()["orders"], 0)
+        self.assertEqual(pedidos_do_dia(), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Pedido.objects.filter(cliente=self.ana).update(status="entregue")
+
+        self.assertEqual(receita_mes_passado()["orders"], 3)
+        self.assertEqual(receita_mes_passado()["revenue"], Decimal("35.00"))
+
+        # Mover os pedidos para hoje tira-os também do dia em que estavam
+        with self.captureOnCommitCallbacks(execute=True):
+            Pedido.objects.filter(cliente=self.ana).update(data_pedido=timezone.now())
+
+        self.assertEqual(receita_mes_passado()["orders"], 0)
+        self.assertEqual(pedidos_do_dia(), 0)
+
+    def test_statistics_read_rollup(self):
+        """
+        Testa as estatísticas do modelo calculadas pelo rollup
+        """
+        with self.assertNumQueries(1):
+            stats = Pedido.get_revenue_statistics()
+        self.assertEqual(stats["total_orders"], 4)
+        self.assertEqual(stats["total_revenue"], Decimal("135.00"))
+        self.assertEqual(stats["monthly_orders"], 4)
+        self.assertEqual(Pedido.get_status_statistics(), {"pendente": 4})
+        self.assertEqual(
+            Pedido.get_priority_statistics(), {"alta": 1, "baixa": 1, "media": 2}
+        )
+
+    def test_rebuild_command(self):
+        """
+        Testa o comando que recria o rollup do zero
+        """
+        esperado = self.rollup()
+        PedidoDailyStats.objects.all().delete()
+        PedidoDailyStats.objects.create(
+            data="2020-01-01", status="pendente", prioridade="baixa", cliente=self.ana
+        )
+
+        call_command("rebuild_pedido_stats", stdout=StringIO())
+
+        self.assertEqual(self.rollup(), esperado)
+
+
+class ClientCountersTest(TestCase):
+    def setUp(self):
+        """
+        Cria dois clientes, um deles com pedidos
+        """
+        self.ana = Client.objects.create(name="Ana", email="ana@example.com", age=30)
+        self.beto = Client.objects.create(name="Beto", email="beto@example.com", age=40)
+        self.pedidos = [
+            Pedido.objects.create(
+                cliente=self.ana,
+                descricao="Pedido de teste com descrição",
+                valor_total=valor,
+            )
+            for valor in ["10.00", "20.00", "5.00"]
+        ]
+
+    def contadores(self, cliente):
+        """Contadores gravados no banco comparados com os pedidos reais"""
+        cliente.refresh_from_db()
+        pedidos = Pedido.objects.filter(cliente=cliente)
+        ultimo = pedidos.order_by("-data_pedido").first()
+        self.assertEqual(cliente.total_pedidos, pedidos.count())
+        self.assertEqual(
+            cliente.valor_total_pedidos,
+            sum((p.valor_total for p in pedidos), Decimal("0.00")),
+        )
+        self.assertEqual(
+            cliente.ultimo_pedido_em, ultimo.data_pedido if ultimo else None
+        )
+        return cliente.total_pedidos, cliente.valor_total_pedidos
+
+    def test_create_and_save(self):
+        """
+        Testa os contadores ao criar e alterar pedidos
+        """
+        self.assertEqual(self.contadores(self.ana), (3, Decimal("35.00")))
+        self.assertEqual(self.contadores(self.beto), (0, Decimal("0.00")))
+
+        pedido = Pedido.objects.get(pk=self.pedidos[0].pk)
+        pedido.valor_total = Decimal("12.50")
+        pedido.save()
+        self.assertEqual(self.contadores(self.ana), (3, Decimal("37.50")))
+
+        pedido.cliente = self.beto
+        pedido.save()
+        self.assertEqual(self.contadores(self.ana), (2, Decimal("25.00")))
+        self.assertEqual(self.contadores(self.beto), (1, Decimal("12.50")))
+
+    def test_stale_instance_moves_from_stored_client(self):
+        """
+        Testa uma cópia desatualizada do pedido que muda de cliente: o
+        pedido sai do cliente gravado no banco, não do que foi carregado
+        """
+        carla = Client.objects.create(name="Carla", email="carla@example.com", age=50)
+        antiga = Pedido.objects.get(pk=self.pedidos[0].pk)
+
+        atual = Pedido.objects.get(pk=self.pedidos[0].pk)
+        atual.cliente = self.beto
+        atual.save()
+
+        antiga.cliente = carla
+        antiga.valor_total = Decimal("15.00")
+        antiga.save()
+        self.assertEqual(self.contadores(self.ana), (2, Decimal("25.00")))
+        self.assertEqual(self.contadores(self.beto), (0, Decimal("0.00")))
+        self.assertEqual(self.contadores(carla), (1, Decimal("15.00")))
+
+    def test_save_deferred_instance_keeps_counters(self):
+        """
+        Testa que salvar (ou remover) um pedido carregado com only()/defer()
+        não conta o pedido de novo nos contadores do cliente
+        """
+        pedido = Pedido.objects.only("id", "descricao").get(pk=self.pedidos[0].pk)
+        pedido.descricao = "Descrição alterada do pedido"
+        pedido.save()
+        self.assertEqual(self.contadores(self.ana), (3, Decimal("35.00")))
+
+        pedido = Pedido.objects.defer("valor_total", "cliente").get(
+            pk=self.pedidos[1].pk
+        )
+        pedido.valor_total = Decimal("25.00")
+        pedido.save()
+        self.assertEqual(self.contadores(self.ana), (3, Decimal("40.00")))
+
+        pedido = Pedido.objects.only("id", "cliente").get(pk=self.pedidos[2].pk)
+        pedido.cliente = self.beto
+        pedido.save()
+        self.assertEqual(self.contadores(self.ana), (2, Decimal("35.00")))
+        self.assertEqual(self.contadores(self.beto), (1, Decimal("5.00")))
+
+        Pedido.objects.only("id").get(pk=self.pedidos[0].pk).delete()
+        self.assertEqual(self.contadores(self.ana), (1, Decimal("25.00")))
+
+    def test_client_save_keeps_counters(self):
+        """
+        Testa que salvar um cliente carregado antes dos pedidos não zera os contadores
+        """
+        antigo = Client.objects.get(pk=self.beto.pk)
+        Pedido.objects.create(
+            cliente=self.beto, descricao="Pedido de teste com descrição", valor_total=7
+        )
+        antigo.name = "Beto Silva"
+        antigo.save()
+        self.assertEqual(self.contadores(self.beto), (1, Decimal("7.00")))
+
+    def test_bulk_update_and_delete(self):
+        """
+        Testa os contadores nas ações em lote e na exclusão
+        """
+        Pedido.objects.filter(valor_total__gte=10).update(cliente=self.beto)
+        self.assertEqual(self.contadores(self.ana), (1, Decimal("5.00")))
+        self.assertEqual(self.contadores(self.beto), (2, Decimal("30.00")))
+
+        Pedido.objects.filter(cliente=self.beto).update(valor_total=Decimal("1.00"))
+        self.assertEqual(self.contadores(self.beto), (2, Decimal("2.00")))
+
+        Pedido.objects.filter(cliente=self.beto).first().delete()
+        self.assertEqual(self.contadores(self.beto), (1, Decimal("1.00")))
+
+        Pedido.objects.all().delete()
+        self.assertEqual(self.contadores(self.ana), (0, Decimal("0.00")))
+        self.assertEqual(self.contadores(self.beto), (0, Decimal("0.00")))
+
+    def test_reconcile_command(self):
+        """
+        Testa o comando que corrige contadores divergentes
+        """
+        Client.objects.filter(pk=self.ana.pk).update(
+            total_pedidos=99, valor_total_pedidos=0, ultimo_pedido_em=None
+        )
+
+        out = StringIO()
+        call_command("reconcile_client_counters", "--dry-run", stdout=out)
+        self.assertIn("1 cliente(s)", out.getvalue())
+        self.ana.refresh_from_db()
+        self.assertEqual(self.ana.total_pedidos, 99)
+
+        out = StringIO()
+        call_command("reconcile_client_counters", stdout=out)
+        self.assertIn("1 cliente(s) corrigido(s)", out.getvalue())
+        self.assertEqual(self.contadores(self.ana), (3, Decimal("35.00")))
+
+
+class ExportPedidosCSVTest(TestCase):
+    def setUp(self):
+        """
+        Cria um funcionário logado e alguns pedidos
+        """
+        user = User.objects.create_user(username="func", password="senha12345")
+        user.groups.add(Group.objects.create(name="Funcionários"))
+        self.client.force_login(user)
+
+        cliente = Client.objects.create(name="Ana", email="ana@example.com", age=30)
+        for valor, status in [("10.50", "pendente"), ("20.00", "entregue")]:
+            Pedido.objects.create(
+                cliente=cliente,
+                descricao="Pedido de teste com descrição",
+                valor_total=valor,
+                status=status,
+            )
+
+    def test_streaming_export_with_filters(self):
+        """
+        Testa o CSV em streaming com os filtros da listagem
+        """
+        response = self.client.get("/order/pedidos/export-csv/", {"status": "pendente"})
+        self.assertTrue(response.streaming)
+        linhas = b"".join(response.streaming_content).decode("utf-8").splitlines()
+
+        self.assertTrue(linhas[0].startswith("\ufeffID;Número do Pedido"))
+        self.assertEqual(len(linhas), 2)
+        self.assertIn(";10,50;", linhas[1])
+
+    def test_gzip_export(self):
+        """
+        Testa o CSV compactado em gzip
+        """
+        response = self.client.get("/order/pedidos/export-csv/", {"compress": "gzip"})
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn('.csv.gz"', response["Content-Disposition"])
+
+        content = gzip.decompress(b"".join(response.streaming_content))
+        self.assertEqual(len(content.decode("utf-8").splitlines()), 3)
+
+
+class PedidoListTest(TestCase):
+    def setUp(self):
+        """
+        Cria um funcionário logado e pedidos de um cliente
+        """
+        cache.clear()
+        user = User.objects.create_user(username="func", password="senha12345")
+        user.groups.add(Group.objects.create(name="Funcionários"))
+        self.client.force_login(user)
+
+        self.cliente = Client.objects.create(
+            name="Ana", email="ana@example.com", age=30
+        )
+        for valor in ["10.50", "20.00"]:
+            Pedido.objects.create(
+                cliente=self.cliente,
+                descricao="Pedido de teste com descrição",
+                valor_total=valor,
+            )
+
+    @override_settings(LIST_ESTIMATED_COUNT_THRESHOLD=1000)
+    def test_unfiltered_list_uses_estimated_count(self):
+        """
+        Sem estatísticas em cache, a paginação usa a estimativa do banco
+        """
+        with patch("clients.pagination.estimated_row_count", return_value=250000):
+            response = self.client.get("/order/pedidos/")
+        self.assertEqual(response.context["pedidos"].paginator.count, 250000)
+        self.assertEqual(response.context["stats"]["total_pedidos"], 2)
+
+    def test_cached_stats_provide_count(self):
+        """
+        Com as estatísticas em cache, a contagem vem delas sem nova consulta
+        """
+        self.client.get("/order/pedidos/", {"status": "pendente"})
+        with patch("clients.pagination.cached_count") as cached_count:
+            response = self.client.get("/order/pedidos/", {"status": "pendente"})
+        cached_count.assert_not_called()
+        self.assertEqual(response.context["pedidos"].paginator.count, 2)
+
+    def test_client_rename_invalidates_list(self):
+        """
+        Renomear o cliente descarta a busca em cache pelo nome dele
+        """
+        response = self.client.get("/order/pedidos/", {"search": "Ana"})
+        self.assertEqual(response.context["stats"]["total_pedidos"], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cliente.name = "Beatriz"
+            self.cliente.save()
+        response = self.client.get("/order/pedidos/", {"search": "Ana"})
+        self.assertEqual(response.context["stats"]["total_pedidos"], 0)
+        self.assertEqual(response.context["pedidos"].paginator.count, 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Client.objects.filter(pk=self.cliente.pk).update(name="Ana Maria")
+        response = self.client.get("/order/pedidos/", {"search": "Ana"})
+        self.assertEqual(response.context["stats"]["total_pedidos"], 2)
+
+
+class PedidoExportAPITest(APITestCase):
+    def setUp(self):
+        """
+        Cria um funcionário autenticado e alguns pedidos
+        """
+        user = User.objects.create_user(username="func", password="senha12345")
+        user.groups.add(Group.objects.create(name="Funcionários"))
+        self.client.force_authenticate(user=user)
+
+        cliente = Client.objects.create(name="Ana", email="ana@example.com", age=30)
+        for valor in ["10.00", "20.00", "30.00", "40.00", "50.00"]:
+            Pedido.objects.create(
+                cliente=cliente,
+                descricao="Pedido de teste com descrição",
+                valor_total=valor,
+            )
+
+    def export(self, **params):
+        response = self.client.get("/api/pedidos/export/", params)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        content = b"".join(response.streaming_content).decode("utf-8")
+        return [json.loads(linha) for linha in content.splitlines()]
+
+    def test_export_walks_keyset_in_batches(self):
+        """
+        Testa a exportação completa em lotes e a retomada pelo cursor
+        """
+        with patch("clients.export.EXPORT_CHUNK_SIZE", 2):
+            linhas = self.export()
+            esperado = list(
+                Pedido.objects.order_by("updated_at", "id").values_list("id", flat=True)
+            )
+            self.assertEqual([linha["id"] for linha in linhas], esperado)
+            self.assertEqual(linhas[0]["valor_total"], "10.00")
+
+            retomada = self.export(
+                since=linhas[2]["updated_at"], after_id=linhas[2]["id"]
+            )
+            self.assertEqual([linha["id"] for linha in retomada], esperado[3:])
+
+    def test_export_since_includes_bulk_updates(self):
+        """
+        Testa que alterações em lote aparecem na carga incremental
+        """
+        corte = timezone.now()
+        Pedido.objects.filter(valor_total__gte=40).update(status="enviado")
+
+        linhas = self.export(since=corte.isoformat())
+        self.assertEqual(len(linhas), 2)
+        self.assertEqual({linha["status"] for linha in linhas}, {"enviado"})
+
+    def test_list_cursor_pagination(self):
+        """
+        Testa a listagem paginada por cursor (mais recentes primeiro)
+        """
+        url, ids = "/api/pedidos/?pagination=cursor&page_size=2", []
+        while url:
+            response = self.client.get(url)
+            ids += [pedido["id"] for pedido in response.data["results"]]
+            url = response.data["next"]
+
+        esperado = Pedido.objects.order_by("-data_pedido", "id")
+        self.assertEqual(ids, list(esperado.values_list("id", flat=True)))
+
+        # data_entrega_prevista aceita NULL e não serve de posição: vale a
+        # ordenação padrão
+        response = self.client.get(
+            "/api/pedidos/",
+            {"pagination": "cursor", "ordering": "data_entrega_prevista"},
+        )
+        self.assertEqual(
+            [pedido["id"] for pedido in response.data["results"]],
+            list(esperado.values_list("id", flat=True)),
+        )
+
+    def test_invalid_cursor(self):
+        """
+        Testa os parâmetros inválidos
+        """
+        response = self.client.get("/api/pedidos/export/", {"since": "ontem"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get("/api/pedidos/export/", {"after_id": "3"})
+        self.assertEqual(response.status_code, 400)
+
+
+class ClientPickerTest(TestCase):
+    def setUp(self):
+        """
+        Cria um gerente e vários clientes
+        """
+        self.clientes = [
+            Client.objects.create(
+                name=f"Cliente {i}", email=f"cliente{i}@example.com", age=30
+            )
+            for i in range(30)
+        ]
+        self.user = User.objects.create_user(username="gerente", password="senha12345")
+        self.user.groups.add(Group.objects.create(name="Gerentes"))
+
+    def test_form_renders_only_selected_client(self):
+        """
+        Testa o seletor: sem um <option> por cliente e só o cliente
+        selecionado lido do banco
+        """
+        cliente = self.clientes[7]
+        with self.assertNumQueries(1):
+            html = str(PedidoForm(initial={"cliente": cliente})["cliente"])
+        self.assertNotIn("<option", html)
+        self.assertIn('data-client-autocomplete="/api/clients/autocomplete/"', html)
+        self.assertIn(f'name="cliente" value="{cliente.pk}"', html)
+        self.assertIn('value="Cliente 7 (cliente7@example.com)"', html)
+
+        form = PedidoForm(
+            data={
+                "cliente": cliente.pk,
+                "descricao": "Pedido de teste com descrição",
+                "valor_total": "10.00",
+                "status": "pendente",
+                "prioridade": "media",
+            }
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data["cliente"], cliente)
+
+    def test_create_pedido_page_does_not_list_clients(self):
+        """
+        Testa a página de criação de pedido com o seletor por busca
+        """
+        self.client.force_login(self.user)
+        response = self.client.get("/order/pedidos/criar/")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "data-client-autocomplete")
+        self.assertNotContains(response, "cliente29@example.com")
+
+
+class PeriodoFilterTest(TestCase):
+    def setUp(self):
+        """
+        Cria pedidos nas bordas de dois dias (fuso de São Paulo)
+        """
+        cliente = Client.objects.create(name="Ana", email="ana@example.com", age=30)
+        self.momentos = {
+            "antes": datetime.datetime(2024, 3, 9, 23, 59, 59),
+            "inicio": datetime.datetime(2024, 3, 10, 0, 0),
+            "fim": datetime.datetime(2024, 3, 11, 23, 59, 59),
+            "depois": datetime.datetime(2024, 3, 12, 0, 0),
+        }
+        self.pedidos = {}
+        with timezone.override("America/Sao_Paulo"):
+            for nome, momento in self.momentos.items():
+                pedido = Pedido.objects.create(
+                    cliente=cliente,
+                    descricao="Pedido de teste com descrição",
+                    valor_total="10.00",
+                )
+                Pedido.objects.filter(pk=pedido.pk).update(
+                    data_pedido=timezone.make_aware(momento)
+                )
+                self.pedidos[nome] = pedido.pk
+
+    def test_intervalo_inclui_os_dias_inteiros(self):
+        """
+        Testa o período inclusivo nas duas pontas, no fuso atual
+        """
+        with timezone.override("America/Sao_Paulo"):
+            pedidos = filtrar_periodo(Pedido.objects.all(), "2024-03-10", "2024-03-11")
+            self.assertEqual(
+                set(pedidos.values_list("pk", flat=True)),
+                {self.pedidos["inicio"], self.pedidos["fim"]},
+            )
+            # O mesmo resultado do filtro por __date
+            por_data = Pedido.objects.filter(
+                data_pedido__date__gte=datetime.date(2024, 3, 10),
+                data_pedido__date__lte=datetime.date(2024, 3, 11),
+            )
+            self.assertEqual(set(pedidos), set(por_data))
+
+    def test_intervalo_aberto_e_datas_invalidas(self):
+        """
+        Testa períodos com uma só ponta e datas inválidas
+        """
+        self.assertEqual(intervalo(), {})
+        self.assertEqual(list(intervalo(inicio="2024-03-10")), ["data_pedido__gte"])
+        self.assertEqual(list(intervalo(fim="2024-03-10")), ["data_pedido__lt"])
+        with self.assertRaises(ValueError):
+            intervalo("10/03/2024")
+
+    def test_intervalo_usa_o_indice(self):
+        """
+        Testa que o período compara a coluna e usa o índice de data_pedido
+        """
+        plano = filtrar_periodo(
+            Pedido.objects.order_by(), "2024-03-10", "2024-03-11"
+        ).explain()
+        self.assertIn("USING", plano)
+        self.assertIn("data_pedido>? AND data_pedido<?", plano)
+
+        # Com __date a coluna passa por uma função e a tabela é varrida
+        plano_data = (
+            Pedido.objects.filter(data_pedido__date__gte=datetime.date(2024, 3, 10))
+            .order_by()
+            .explain()
+        )
+        self.assertIn("SCAN", plano_data)
+
+    def login(self):
+        user = User.objects.create_user(username="func", password="senha12345")
+        user.groups.add(Group.objects.create(name="Funcionários"))
+        self.client.force_login(user)
+        return user
+
+    def planos_do_periodo(self, executar):
+        """
+        EXPLAIN QUERY PLAN das consultas de pedidos filtradas por período
+        feitas por executar()
+        """
+        with CaptureQueriesContext(connection) as queries:
+            executar()
+        planos = []
+        for query in queries.captured_queries:
+            if '"order_pedido"."data_pedido" >=' not in query["sql"]:
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                planos.append(" ".join(row[-1] for row in cursor.fetchall()))
+        return planos
+
+    def test_views_usam_o_indice(self):
+        """
+        Testa que as consultas por período das views leem um intervalo de
+        índice com data_pedido
+        """
+        cache.clear()
+        user = self.login()
+        periodo = {"data_inicio": "2024-03-10", "data_fim": "2024-03-11"}
+        request = RequestFactory().get("/", periodo)
+        request.user = user
+
+        def relatorio():
+            with patch("order.views.render", return_value=HttpResponse()):
+                views.reports_pedidos(request)
+
+        execucoes = {
+            "reports_pedidos": relatorio,
+            "pedidos_pdf_report": lambda: self.client.get(
+                "/order/pedidos/pdf/", periodo
+            ),
+            "PedidoViewSet": lambda: self.client.get("/api/pedidos/", periodo),
+            "quick_stats": lambda: self.client.get("/api/dashboard/quick_stats/"),
+        }
+        for view, executar in execucoes.items():
+            with self.subTest(view=view):
+                planos = self.planos_do_periodo(executar)
+                self.assertTrue(planos)
+                for plano in planos:
+                    self.assertRegex(
+                        plano, r"USING (COVERING )?INDEX \w+ \([^)]*data_pedido>\?"
+                    )
+                    self.assertNotRegex(plano, r"SCAN order_pedido(?! USING)")
+
+    @override_settings(TIME_ZONE="America/Sao_Paulo")
+    def test_views_incluem_o_fim_do_dia_local(self):
+        """
+        Testa que as views incluem o pedido das 23:59 locais do último dia
+        (já no dia seguinte em UTC)
+        """
+        cache.clear()
+        self.login()
+        periodo = {"data_inicio": "2024-03-10", "data_fim": "2024-03-11"}
+        esperados = {self.pedidos["inicio"], self.pedidos["fim"]}
+
+        response = self.client.get("/api/pedidos/", periodo)
+        self.assertEqual({item["id"] for item in response.data["results"]}, esperados)
+
+        response = self.client.get("/order/pedidos/", periodo)
+        self.assertEqual(
+            {pedido.pk for pedido in response.context["pedidos"]}, esperados
+        )
+
+        meio_dia = timezone.make_aware(datetime.datetime(2024, 3, 11, 12, 0))
+        with patch("django.utils.timezone.now", return_value=meio_dia):
+            response = self.client.get("/api/dashboard/quick_stats/")
+        self.assertEqual(response.data["orders_today"], 1)
+        self.assertEqual(response.data["orders_this_month"], 4)
+
+
+class HotQueriesIndexTest(TestCase):
+    def test_explain_hot_queries(self):
+        """
+        Testa que o plano de cada consulta principal usa o seu índice
+        """
+        Client.objects.create(name="Ana", email="ana@example.com", age=30)
+        indices = {
+            "atrasados": "pedido_atrasados_idx",
+            "cliente_recentes": "pedido_cliente_recentes_idx",
+            "status_recentes": "pedido_status_recentes_idx",
+            "periodo": "pedido_list_cursor_idx",
+            "listagem": "pedido_list_cursor_idx",
+            "exportacao": "pedido_export_cursor_idx",
+            "numero": "sqlite_autoindex_order_pedido",
+        }
+        for consulta, indice in indices.items():
+            with self.subTest(consulta=consulta):
+                out = StringIO()
+                call_command("explain_hot_queries", consulta, stdout=out)
+                saida = out.getvalue()
+                self.assertIn(f"USING INDEX {indice}", saida)
+                self.assertNotIn("Leitura completa da tabela", saida)
+
+    def test_invalid_options(self):
+        """
+        Testa consultas desconhecidas e --analyze fora do PostgreSQL
+        """
+        with self.assertRaises(CommandError):
+            call_command("explain_hot_queries", "inexistente", stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command("explain_hot_queries", "--analyze", stdout=StringIO())
+
+    def test_atrasados(self):
+        """
+        Testa os pedidos atrasados (em aberto e com entrega vencida)
+        """
+        cliente = Client.objects.create(name="Ana", email="ana@example.com", age=30)
+        ontem = timezone.now().date() - datetime.timedelta(days=1)
+        for status in ["pendente", "entregue"]:
+            pedido = Pedido.objects.create(
+                cliente=cliente,
+                descricao="Pedido de teste com descrição",
+                valor_total="10.00",
+                status=status,
+            )
+            # save() não aceita entrega prevista no passado
+            Pedido.objects.filter(pk=pedido.pk).update(data_entrega_prevista=ontem)
+        Pedido.objects.create(
+            cliente=cliente,
+            descricao="Pedido de teste com descrição",
+            valor_total="10.00",
+        )
+
+        atrasados = Pedido.objects.atrasados()
+        self.assertEqual(list(atrasados.values_list("status", flat=True)), ["pendente"])
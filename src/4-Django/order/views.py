@@ -1,16 +1,24 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.http import HttpResponse
 from django.contrib.auth.decorators import login_required
+from django.conf import settings
+from django.core.cache import cache
 from django.contrib import messages
-from django.db.models import Q, Count, Sum, Avg
+from django.db.models import Count, Sum, Avg
 from django.core.paginator import Paginator
 from django.http import JsonResponse
 from django.utils import timezone
 from django.views.decorators.http import require_POST
-from .models import Pedido
+from .dates import filtrar_periodo, parse_data
+from .models import Pedido, PedidoDailyStats
 from .forms import PedidoForm, PedidoSearchForm, PedidoStatusForm, PedidoBulkActionForm
 from .permissions import group_required
+from clients.cache import get_or_compute, queryset_cache_key
+from clients.export import EXPORT_CHUNK_SIZE, formato_brasileiro, streaming_csv_response
+from clients.groups import get_user_groups
 from clients.models import Client
+from clients.pagination import CachedCountPaginator
+from clients.search import search
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -18,79 +26,107 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER
 from io import BytesIO
-from datetime import datetime
-import csv
 
 
-@login_required
-@group_required("Administradores", "Gerentes", "Funcionários")
-def get_pedidos(request):
-    """
-    Listar pedidos com busca avançada e paginação
-    Todos os grupos autenticados podem visualizar
+def filtrar_pedidos(pedidos_list, search_form):
     """
-    search_form = PedidoSearchForm(request.GET)
-    pedidos_list = Pedido.objects.select_related("cliente").order_by("-data_pedido")
-
-    # Aplicar filtros de busca se o formulário for válido
-    if search_form.is_valid():
-        search_query = search_form.cleaned_data.get("search")
-        cliente = search_form.cleaned_data.get("cliente")
-        status = search_form.cleaned_data.get("status")
-        prioridade = search_form.cleaned_data.get("prioridade")
-        data_inicio = search_form.cleaned_data.get("data_inicio")
-        data_fim = search_form.cleaned_data.get("data_fim")
-        valor_min = search_form.cleaned_data.get("valor_min")
-        valor_max = search_form.cleaned_data.get("valor_max")
-
-        # Filtro de busca textual
-        if search_query:
-            pedidos_list = pedidos_list.filter(
-                Q(numero_pedido__icontains=search_query)
-                | Q(cliente__name__icontains=search_query)
-                | Q(descricao__icontains=search_query)
-            )
+    Aplica os filtros do PedidoSearchForm (listagem e exportação)
 
-        # Filtro por cliente
-        if cliente:
-            pedidos_list = pedidos_list.filter(cliente=cliente)
+    Returns:
+        QuerySet: pedidos_list filtrado (inalterado se o formulário for inválido)
+    """
+    if not search_form.is_valid():
+        return pedidos_list
+
+    search_query = search_form.cleaned_data.get("search")
+    cliente = search_form.cleaned_data.get("cliente")
+    status = search_form.cleaned_data.get("status")
+    prioridade = search_form.cleaned_data.get("prioridade")
+    data_inicio = search_form.cleaned_data.get("data_inicio")
+    data_fim = search_form.cleaned_data.get("data_fim")
+    valor_min = search_form.cleaned_data.get("valor_min")
+    valor_max = search_form.cleaned_data.get("valor_max")
+
+    # Filtro de busca textual
+    if search_query:
+        pedidos_list = search(pedidos_list, search_query, "pedidos")
+
+    # Filtro por cliente
+    if cliente:
+        pedidos_list = pedidos_list.filter(cliente=cliente)
+
+    # Filtro por status
+    if status:
+        pedidos_list = pedidos_list.filter(status=status)
 
-        # Filtro por status
-        if status:
-            pedidos_list = pedidos_list.filter(status=status)
+    # Filtro por prioridade
+    if prioridade:
+        pedidos_list = pedidos_list.filter(prioridade=prioridade)
 
-        # Filtro por prioridade
-        if prioridade:
-            pedidos_list = pedidos_list.filter(prioridade=prioridade)
+    # Filtro por intervalo de datas (intervalo semiaberto, usa o índice)
+    pedidos_list = filtrar_periodo(pedidos_list, data_inicio, data_fim)
 
-        # Filtro por intervalo de datas
-        if data_inicio:
-            pedidos_list = pedidos_list.filter(data_pedido__date__gte=data_inicio)
+    # Filtro por intervalo de valores
+    if valor_min is not None:
+        pedidos_list = pedidos_list.filter(valor_total__gte=valor_min)
 
-        if data_fim:
-            pedidos_list = pedidos_list.filter(data_pedido__date__lte=data_fim)
+    if valor_max is not None:
+        pedidos_list = pedidos_list.filter(valor_total__lte=valor_max)
 
-        # Filtro por intervalo de valores
-        if valor_min is not None:
-            pedidos_list = pedidos_list.filter(valor_total__gte=valor_min)
+    return pedidos_list
 
-        if valor_max is not None:
-            pedidos_list = pedidos_list.filter(valor_total__lte=valor_max)
 
-    # Calcular estatísticas dos resultados filtrados
+def _estatisticas_listagem(pedidos_list):
+    """Quantidade, soma e média dos pedidos filtrados numa única consulta"""
+    # Aliases diferentes dos campos: Avg("valor_total") não pode referenciar
+    # um agregado chamado valor_total
     stats = pedidos_list.aggregate(
-        total_pedidos=Count("id"),
-        valor_total=Sum("valor_total"),
-        valor_medio=Avg("valor_total"),
+        total=Count("id"), soma=Sum("valor_total"), media=Avg("valor_total")
     )
+    return {
+        "total_pedidos": stats["total"],
+        "valor_total": stats["soma"],
+        "valor_medio": stats["media"],
+    }
+
+
+@login_required
+@group_required("Administradores", "Gerentes", "Funcionários")
+def get_pedidos(request):
+    """
+    Listar pedidos com busca avançada e paginação
+    Todos os grupos autenticados podem visualizar
+    """
+    search_form = PedidoSearchForm(request.GET)
+    pedidos_list = Pedido.objects.select_related("cliente").order_by("-data_pedido")
+
+    pedidos_list = filtrar_pedidos(pedidos_list, search_form)
+
+    # Calcular estatísticas dos resultados filtrados (em cache por filtro,
+    # descartadas a cada alteração de pedido)
+    stats_key = queryset_cache_key("pedidos", pedidos_list, "stats")
+    stats = cache.get(stats_key)
+    count = None
+    if stats is None:
+        stats = get_or_compute(
+            stats_key,
+            lambda: _estatisticas_listagem(pedidos_list),
+            settings.LIST_CACHE_TIMEOUT,
+        )
+    else:
+        # Estatísticas em cache: a contagem já vem nelas. Senão o paginator
+        # usa a contagem em cache (ou a estimativa do banco, sem filtros)
+        count = stats["total_pedidos"]
 
     # Configurar paginação
-    paginator = Paginator(pedidos_list, 15)  # 15 pedidos por página
+    paginator = CachedCountPaginator(
+        pedidos_list, 15, "pedidos", count=count
+    )  # 15 pedidos por página
     page_number = request.GET.get("page")
     pedidos = paginator.get_page(page_number)
 
     # Verificar permissões para mostrar botões na template
-    user_groups = request.user.groups.values_list("name", flat=True)
+    user_groups = get_user_groups(request.user)
     can_create = (
         any(group in ["Administradores", "Gerentes"] for group in user_groups)
         or request.user.is_superuser
@@ -205,7 +241,7 @@ def detail_pedido(request, id):
     pedido = get_object_or_404(Pedido, id=id)
 
     # Verificar permissões para mostrar botões na template
-    user_groups = request.user.groups.values_list("name", flat=True)
+    user_groups = get_user_groups(request.user)
     can_edit = (
         any(group in ["Administradores", "Gerentes"] for group in user_groups)
         or request.user.is_superuser
@@ -365,30 +401,24 @@ def dashboard_pedidos(request):
     stats_status = Pedido.get_status_statistics()
 
     # Pedidos por prioridade
-    stats_prioridade = (
-        Pedido.objects.values("prioridade")
-        .annotate(count=Count("id"))
-        .order_by("prioridade")
-    )
+    stats_prioridade = Pedido.get_priority_statistics()
 
-    # Pedidos atrasados
-    pedidos_atrasados = Pedido.objects.filter(
-        data_entrega_prevista__lt=timezone.now().date(),
-        status__in=["pendente", "processando", "enviado"],
-    ).count()
+    # Pedidos atrasados (depende da entrega prevista, fora do rollup)
+    pedidos_atrasados = Pedido.objects.atrasados().count()
 
     # Pedidos do mês atual
-    inicio_mes = timezone.now().replace(
-        day=1, hour=0, minute=0, second=0, microsecond=0
+    inicio_mes = timezone.localdate().replace(day=1)
+    pedidos_mes_count = (
+        PedidoDailyStats.objects.filter(data__gte=inicio_mes).aggregate(
+            total=Sum("quantidade")
+        )["total"]
+        or 0
     )
-    pedidos_mes = Pedido.objects.filter(data_pedido__gte=inicio_mes)
 
     # Top 5 clientes por quantidade de pedidos
-    top_clientes = (
-        Client.objects.annotate(total_pedidos=Count("pedidos"))
-        .filter(total_pedidos__gt=0)
-        .order_by("-total_pedidos")[:5]
-    )
+    top_clientes = Client.objects.filter(total_pedidos__gt=0).order_by(
+        "-total_pedidos"
+    )[:5]
 
     return render(
         request,
@@ -396,11 +426,9 @@ def dashboard_pedidos(request):
         {
             "stats_gerais": stats_gerais,
             "stats_status": stats_status,
-            "stats_prioridade": dict(
-                stats_prioridade.values_list("prioridade", "count")
-            ),
+            "stats_prioridade": stats_prioridade,
             "pedidos_atrasados": pedidos_atrasados,
-            "pedidos_mes_count": pedidos_mes.count(),
+            "pedidos_mes_count": pedidos_mes_count,
             "top_clientes": top_clientes,
         },
     )
@@ -418,7 +446,7 @@ def ajax_update_pedido_status(request, id):
     pedido = get_object_or_404(Pedido, id=id)
 
     # Verificar permissões
-    user_groups = request.user.groups.values_list("name", flat=True)
+    user_groups = get_user_groups(request.user)
     if not (
         any(
             group in ["Administradores", "Gerentes", "Funcionários"]
@@ -524,7 +552,7 @@ def client_pedidos(request, client_id):
     )
 
     # Verificar permissões
-    user_groups = request.user.groups.values_list("name", flat=True)
+    user_groups = get_user_groups(request.user)
     can_create = (
         any(group in ["Administradores", "Gerentes"] for group in user_groups)
         or request.user.is_superuser
@@ -551,6 +579,22 @@ def client_pedidos(request, client_id):
     )
 
 
+def _clientes_do_rollup(linhas):
+    """
+    Converte linhas do rollup agrupadas por cliente em objetos Client com
+    total_pedidos e valor_total, mantendo a ordem das linhas
+    """
+    linhas = [linha for linha in linhas if linha["total_pedidos"]]
+    clientes = Client.objects.in_bulk([linha["cliente"] for linha in linhas])
+    resultado = []
+    for linha in linhas:
+        cliente = clientes[linha["cliente"]]
+        cliente.total_pedidos = linha["total_pedidos"]
+        cliente.valor_total = linha["valor_total"]
+        resultado.append(cliente)
+    return resultado
+
+
 @login_required
 @group_required("Administradores", "Gerentes", "Funcionários")
 def reports_pedidos(request):
@@ -562,82 +606,74 @@ def reports_pedidos(request):
     data_inicio = request.GET.get("data_inicio", "")
     data_fim = request.GET.get("data_fim", "")
 
-    # Query base
+    # Query base: pedidos (lista de atrasados) e rollup diário (estatísticas)
     pedidos = Pedido.objects.all()
+    rollup = PedidoDailyStats.objects.all()
 
     # Aplicar filtros de data se fornecidos
     if data_inicio:
         try:
-            data_inicio_parsed = timezone.datetime.strptime(
-                data_inicio, "%Y-%m-%d"
-            ).date()
-            pedidos = pedidos.filter(data_pedido__date__gte=data_inicio_parsed)
+            data_inicio_parsed = parse_data(data_inicio)
+            pedidos = filtrar_periodo(pedidos, inicio=data_inicio_parsed)
+            rollup = rollup.filter(data__gte=data_inicio_parsed)
         except ValueError:
             messages.error(request, "Data de início inválida.")
 
     if data_fim:
         try:
-            data_fim_parsed = timezone.datetime.strptime(data_fim, "%Y-%m-%d").date()
-            pedidos = pedidos.filter(data_pedido__date__lte=data_fim_parsed)
+            data_fim_parsed = parse_data(data_fim)
+            pedidos = filtrar_periodo(pedidos, fim=data_fim_parsed)
+            rollup = rollup.filter(data__lte=data_fim_parsed)
         except ValueError:
             messages.error(request, "Data de fim inválida.")
 
     # Estatísticas gerais
-    stats_gerais = pedidos.aggregate(
-        total_pedidos=Count("id"),
+    stats_gerais = rollup.aggregate(
+        total_pedidos=Sum("quantidade"),
         valor_total=Sum("valor_total"),
-        valor_medio=Avg("valor_total"),
+    )
+    stats_gerais["valor_medio"] = (
+        stats_gerais["valor_total"] / stats_gerais["total_pedidos"]
+        if stats_gerais["total_pedidos"]
+        else None
     )
 
     # Pedidos por status
     pedidos_por_status = (
-        pedidos.values("status")
-        .annotate(count=Count("id"), valor_total=Sum("valor_total"))
+        rollup.values("status")
+        .annotate(count=Sum("quantidade"), valor_total=Sum("valor_total"))
         .order_by("status")
     )
 
     # Pedidos por prioridade
     pedidos_por_prioridade = (
-        pedidos.values("prioridade")
-        .annotate(count=Count("id"), valor_total=Sum("valor_total"))
+        rollup.values("prioridade")
+        .annotate(count=Sum("quantidade"), valor_total=Sum("valor_total"))
         .order_by("prioridade")
     )
 
-    # Top 10 clientes por valor
-    top_clientes_valor = (
-        Client.objects.annotate(
-            total_pedidos=Count("pedidos", filter=Q(pedidos__in=pedidos)),
-            valor_total=Sum("pedidos__valor_total", filter=Q(pedidos__in=pedidos)),
-        )
-        .filter(total_pedidos__gt=0)
-        .order_by("-valor_total")[:10]
+    # Top 10 clientes por valor e por quantidade
+    por_cliente = rollup.values("cliente").annotate(
+        total_pedidos=Sum("quantidade"), valor_total=Sum("valor_total")
     )
-
-    # Top 10 clientes por quantidade
-    top_clientes_quantidade = (
-        Client.objects.annotate(
-            total_pedidos=Count("pedidos", filter=Q(pedidos__in=pedidos))
-        )
-        .filter(total_pedidos__gt=0)
-        .order_by("-total_pedidos")[:10]
+    top_clientes_valor = _clientes_do_rollup(por_cliente.order_by("-valor_total")[:10])
+    top_clientes_quantidade = _clientes_do_rollup(
+        por_cliente.order_by("-total_pedidos")[:10]
     )
 
     # Pedidos por mês (últimos 12 meses)
     from django.db.models.functions import TruncMonth
 
     pedidos_por_mes = (
-        pedidos.filter(data_pedido__gte=timezone.now() - timezone.timedelta(days=365))
-        .annotate(mes=TruncMonth("data_pedido"))
+        rollup.filter(data__gte=timezone.localdate() - timezone.timedelta(days=365))
+        .annotate(mes=TruncMonth("data"))
         .values("mes")
-        .annotate(count=Count("id"), valor_total=Sum("valor_total"))
+        .annotate(count=Sum("quantidade"), valor_total=Sum("valor_total"))
         .order_by("mes")
     )
 
     # Pedidos atrasados
-    pedidos_atrasados = pedidos.filter(
-        data_entrega_prevista__lt=timezone.now().date(),
-        status__in=["pendente", "processando", "enviado"],
-    )
+    pedidos_atrasados = pedidos.atrasados()
 
     return render(
         request,
@@ -675,17 +711,15 @@ def pedidos_pdf_report(request):
     # Aplicar filtros
     if data_inicio:
         try:
-            data_inicio_parsed = datetime.datetime.strptime(
-                data_inicio, "%Y-%m-%d"
-            ).date()
-            pedidos = pedidos.filter(data_pedido__date__gte=data_inicio_parsed)
+            data_inicio_parsed = parse_data(data_inicio)
+            pedidos = filtrar_periodo(pedidos, inicio=data_inicio_parsed)
         except ValueError:
             pass
 
     if data_fim:
         try:
-            data_fim_parsed = datetime.datetime.strptime(data_fim, "%Y-%m-%d").date()
-            pedidos = pedidos.filter(data_pedido__date__lte=data_fim_parsed)
+            data_fim_parsed = parse_data(data_fim)
+            pedidos = filtrar_periodo(pedidos, fim=data_fim_parsed)
         except ValueError:
             pass
 
@@ -700,7 +734,7 @@ def pedidos_pdf_report(request):
     # Criar o PDF
     response = HttpResponse(content_type="application/pdf")
     response["Content-Disposition"] = (
-        f'attachment; filename="relatorio_pedidos_{datetime.date.today()}.pdf"'
+        f'attachment; filename="relatorio_pedidos_{timezone.localdate()}.pdf"'
     )
 
     buffer = BytesIO()
@@ -742,11 +776,7 @@ def pedidos_pdf_report(request):
         elements.append(Spacer(1, 20))
 
     # Estatísticas
-    stats = pedidos.aggregate(
-        total_pedidos=Count("id"),
-        valor_total=Sum("valor_total"),
-        valor_medio=Avg("valor_total"),
-    )
+    stats = _estatisticas_listagem(pedidos)
 
     stats_title = Paragraph("Resumo Estatístico", styles["Heading2"])
     elements.append(stats_title)
@@ -756,7 +786,7 @@ def pedidos_pdf_report(request):
         ["Total de Pedidos:", str(stats["total_pedidos"] or 0)],
         ["Valor Total:", f"R$ {stats['valor_total'] or 0:.2f}"],
         ["Valor Médio:", f"R$ {stats['valor_medio'] or 0:.2f}"],
-        ["Data do Relatório:", datetime.date.today().strftime("%d/%m/%Y")],
+        ["Data do Relatório:", timezone.localdate().strftime("%d/%m/%Y")],
     ]
 
     stats_table = Table(stats_data, colWidths=[2 * inch, 3 * inch])
@@ -846,62 +876,39 @@ def pedidos_pdf_report(request):
 def export_pedidos_csv(request):
     """
     Exportar lista de pedidos para CSV com filtros
+
+    O arquivo é enviado em streaming; com ?compress=gzip vai compactado
     """
     # Aplicar os mesmos filtros da view get_pedidos
     search_form = PedidoSearchForm(request.GET)
-    pedidos_list = Pedido.objects.select_related("cliente").order_by("-data_pedido")
-
-    if search_form.is_valid():
-        search_query = search_form.cleaned_data.get("search")
-        cliente = search_form.cleaned_data.get("cliente")
-        status = search_form.cleaned_data.get("status")
-        prioridade = search_form.cleaned_data.get("prioridade")
-        data_inicio = search_form.cleaned_data.get("data_inicio")
-        data_fim = search_form.cleaned_data.get("data_fim")
-        valor_min = search_form.cleaned_data.get("valor_min")
-        valor_max = search_form.cleaned_data.get("valor_max")
-
-        if search_query:
-            pedidos_list = pedidos_list.filter(
-                Q(numero_pedido__icontains=search_query)
-                | Q(cliente__name__icontains=search_query)
-                | Q(descricao__icontains=search_query)
-            )
-
-        if cliente:
-            pedidos_list = pedidos_list.filter(cliente=cliente)
-
-        if status:
-            pedidos_list = pedidos_list.filter(status=status)
-
-        if prioridade:
-            pedidos_list = pedidos_list.filter(prioridade=prioridade)
-
-        if data_inicio:
-            pedidos_list = pedidos_list.filter(data_pedido__date__gte=data_inicio)
-
-        if data_fim:
-            pedidos_list = pedidos_list.filter(data_pedido__date__lte=data_fim)
-
-        if valor_min is not None:
-            pedidos_list = pedidos_list.filter(valor_total__gte=valor_min)
-
-        if valor_max is not None:
-            pedidos_list = pedidos_list.filter(valor_total__lte=valor_max)
-
-    # Criar resposta CSV
-    response = HttpResponse(content_type="text/csv; charset=utf-8")
-    response["Content-Disposition"] = (
-        f'attachment; filename="pedidos_{datetime.date.today()}.csv"'
+    pedidos_list = filtrar_pedidos(
+        Pedido.objects.select_related("cliente").order_by("-data_pedido"),
+        search_form,
     )
 
-    # Adicionar BOM para UTF-8
-    response.write("\ufeff")
-
-    writer = csv.writer(response, delimiter=";")
+    rows = (
+        [
+            pedido.id,
+            pedido.numero_pedido,
+            pedido.cliente.name,
+            pedido.cliente.email,
+            pedido.data_pedido.strftime("%d/%m/%Y %H:%M"),
+            (
+                pedido.data_entrega_prevista.strftime("%d/%m/%Y")
+                if pedido.data_entrega_prevista
+                else "N/A"
+            ),
+            pedido.get_status_display(),
+            pedido.get_prioridade_display(),
+            formato_brasileiro(pedido.valor_total),
+            pedido.descricao or "",
+            pedido.observacoes or "",
+        ]
+        for pedido in pedidos_list.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
 
-    # Cabeçalho
-    writer.writerow(
+    return streaming_csv_response(
+        f"pedidos_{timezone.localdate()}.csv",
         [
             "ID",
             "Número do Pedido",
@@ -914,29 +921,7 @@ def export_pedidos_csv(request):
             "Valor Total",
             "Descrição",
             "Observações",
-        ]
+        ],
+        rows,
+        compress=request.GET.get("compress") == "gzip",
     )
-
-    # Dados dos pedidos
-    for pedido in pedidos_list:
-        writer.writerow(
-            [
-                pedido.id,
-                pedido.numero_pedido,
-                pedido.cliente.name,
-                pedido.cliente.email,
-                pedido.data_pedido.strftime("%d/%m/%Y %H:%M"),
-                (
-                    pedido.data_entrega_prevista.strftime("%d/%m/%Y")
-                    if pedido.data_entrega_prevista
-                    else "N/A"
-                ),
-                pedido.get_status_display(),
-                pedido.get_prioridade_display(),
-                f"{pedido.valor_total:.2f}".replace(".", ","),
-                pedido.descricao or "",
-                pedido.observacoes or "",
-            ]
-        )
-
-    return response
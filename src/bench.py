@@ -0,0 +1,235 @@
+"""
+Executor de benchmarks e controle de regressões dos exercícios.
+
+O executor procura arquivos bench_*.py ao lado dos exercícios
+(ex.: "3 - POO/bench_ex24.py") e roda cada função bench_*.
+
+Convenções de um módulo de benchmark:
+    - Cada função bench_* recebe o tamanho da entrada n, prepara os dados
+      e devolve a função (sem argumentos) que será cronometrada.
+    - SIZES define os tamanhos de entrada. Pode ser uma lista (vale para
+      todas as funções) ou um dicionário {nome_da_funcao: [tamanhos]}.
+
+Para cada combinação (função, n) são feitas execuções de aquecimento,
+depois repetições cronometradas com perf_counter_ns e, por fim, uma
+execução com tracemalloc para medir o pico de memória.
+
+Uso:
+    python bench.py                      # roda e compara com a baseline
+    python bench.py --update             # grava os resultados como baseline
+    python bench.py -k ex24 --repeat 10  # filtra pelo nome
+"""
+
+import argparse
+import fnmatch
+import importlib.util
+import inspect
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = SRC_DIR / "bench_baseline.json"
+DEFAULT_SIZES = [100, 1_000, 10_000]
+DEFAULT_TOLERANCE = 0.25  # 25% acima da baseline é considerado regressão
+# Diferenças de memória menores que isso são ruído do próprio interpretador
+MIN_PEAK_INCREASE = 4 * 1024
+
+
+def discover(root=SRC_DIR):
+    """
+    Encontra os módulos de benchmark dos exercícios.
+
+    Args:
+        root (Path): Diretório que contém as pastas dos exercícios
+
+    Returns:
+        list: Caminhos dos arquivos bench_*.py em ordem alfabética
+    """
+    return sorted(root.glob("*/bench_*.py"))
+
+
+def load_module(path):
+    """
+    Importa um módulo de benchmark a partir do caminho do arquivo.
+
+    A pasta do exercício é adicionada ao sys.path para que o módulo possa
+    importar o exercício diretamente (ex.: "from ex24 import items").
+    """
+    folder = str(path.parent)
+    if folder not in sys.path:
+        sys.path.insert(0, folder)
+
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def collect(path):
+    """
+    Lista os casos (nome, função, tamanhos) de um módulo de benchmark.
+    """
+    module = load_module(path)
+    sizes = getattr(module, "SIZES", DEFAULT_SIZES)
+
+    cases = []
+    for name, func in inspect.getmembers(module, inspect.isfunction):
+        if not name.startswith("bench_") or func.__module__ != module.__name__:
+            continue
+        func_sizes = (
+            sizes.get(name, DEFAULT_SIZES) if isinstance(sizes, dict) else sizes
+        )
+        cases.append((name, func, func_sizes))
+    return cases
+
+
+def measure(bench, n, warmup=1, repeat=5):
+    """
+    Mede uma função de benchmark para um tamanho de entrada.
+
+    Args:
+        bench: Função bench_* do módulo
+        n (int): Tamanho da entrada
+        warmup (int): Execuções descartadas antes da medição
+        repeat (int): Execuções cronometradas
+
+    Returns:
+        dict: min_ns, median_ns e peak_bytes
+    """
+    run = bench(n)
+
+    for _ in range(warmup):
+        run()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        run()
+        timings.append(time.perf_counter_ns() - start)
+
+    # Memória medida separadamente: o tracemalloc distorce o tempo
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "min_ns": min(timings),
+        "median_ns": int(statistics.median(timings)),
+        "peak_bytes": peak,
+    }
+
+
+def run_all(paths, pattern=None, warmup=1, repeat=5):
+    """
+    Executa todos os benchmarks encontrados.
+
+    Returns:
+        dict: Resultados indexados por "pasta/arquivo::funcao[n=N]"
+    """
+    results = {}
+    for path in paths:
+        for name, bench, sizes in collect(path):
+            for n in sizes:
+                key = f"{path.parent.name}/{path.name}::{name}[n={n}]"
+                if pattern and not fnmatch.fnmatch(key, f"*{pattern}*"):
+                    continue
+                results[key] = measure(bench, n, warmup=warmup, repeat=repeat)
+                print(
+                    f"{key:<70} {results[key]['median_ns'] / 1e6:10.3f} ms"
+                    f" {results[key]['peak_bytes'] / 1024:10.1f} KiB"
+                )
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compara os resultados com a baseline.
+
+    Args:
+        results (dict): Resultados da execução atual
+        baseline (dict): Resultados gravados anteriormente
+        tolerance (float): Aumento relativo permitido (0.25 = 25%)
+
+    Returns:
+        list: Mensagens descrevendo cada regressão encontrada
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        for metric in ("median_ns", "peak_bytes"):
+            limit = previous[metric] * (1 + tolerance)
+            if metric == "peak_bytes":
+                limit = max(limit, previous[metric] + MIN_PEAK_INCREASE)
+            if previous[metric] and current[metric] > limit:
+                increase = current[metric] / previous[metric] - 1
+                regressions.append(
+                    f"{key}: {metric} {previous[metric]} -> {current[metric]}"
+                    f" (+{increase:.0%}, tolerância {tolerance:.0%})"
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-k", dest="pattern", help="Filtra casos pelo nome")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        help="Aumento relativo permitido (padrão: valor gravado na baseline)",
+    )
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--update", action="store_true", help="Grava os resultados como baseline"
+    )
+    args = parser.parse_args(argv)
+
+    results = run_all(discover(), args.pattern, args.warmup, args.repeat)
+
+    stored = {}
+    if args.baseline.exists():
+        stored = json.loads(args.baseline.read_text(encoding="utf-8"))
+    tolerance = args.tolerance
+    if tolerance is None:
+        tolerance = stored.get("tolerance", DEFAULT_TOLERANCE)
+
+    if args.update:
+        # Mantém casos não executados (ex.: quando há filtro -k)
+        merged = {**stored.get("results", {}), **results}
+        args.baseline.write_text(
+            json.dumps(
+                {"tolerance": tolerance, "results": merged}, indent=2, sort_keys=True
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+        print(f"\nBaseline gravada em {args.baseline}")
+        return 0
+
+    if not stored:
+        print("\nNenhuma baseline encontrada. Use --update para criar uma.")
+        return 0
+
+    regressions = compare(results, stored.get("results", {}), tolerance)
+    if regressions:
+        print("\nRegressões encontradas:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+
+    print("\nNenhuma regressão encontrada.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
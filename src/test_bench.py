@@ -0,0 +1,95 @@
+import io
+import json
+import tempfile
+from contextlib import redirect_stdout
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import bench
+
+CHAVE = "3 - POO/bench_ex24.py::bench_items_streaming[n=100]"
+
+
+def resultado(median_ns, peak_bytes):
+    return {"min_ns": median_ns, "median_ns": median_ns, "peak_bytes": peak_bytes}
+
+
+class TesteCompare(unittest.TestCase):
+    def setUp(self):
+        """Baseline com um caso de 1 ms e 100 KiB"""
+        self.baseline = {CHAVE: resultado(1_000_000, 100 * 1024)}
+
+    def test_dentro_da_tolerancia(self):
+        """Testa que aumentos até a tolerância não são regressões"""
+        atual = {CHAVE: resultado(1_250_000, 125 * 1024)}
+        self.assertEqual(bench.compare(atual, self.baseline, 0.25), [])
+
+    def test_acima_da_tolerancia(self):
+        """Testa a regressão de tempo e de memória acima da tolerância"""
+        atual = {CHAVE: resultado(1_300_000, 130 * 1024)}
+        regressoes = bench.compare(atual, self.baseline, 0.25)
+        self.assertEqual(len(regressoes), 2)
+        self.assertIn("median_ns 1000000 -> 1300000 (+30%", regressoes[0])
+        self.assertIn("peak_bytes", regressoes[1])
+
+    def test_ruido_de_memoria(self):
+        """Testa que aumentos pequenos de memória são ignorados"""
+        baseline = {CHAVE: resultado(1_000_000, 1000)}
+        atual = {CHAVE: resultado(1_000_000, 1000 + bench.MIN_PEAK_INCREASE)}
+        self.assertEqual(bench.compare(atual, baseline, 0.25), [])
+
+    def test_casos_novos_ou_zerados(self):
+        """Testa casos ausentes da baseline e métricas zeradas"""
+        atual = {CHAVE: resultado(5, 5), "novo::bench_x[n=1]": resultado(5, 5)}
+        self.assertEqual(bench.compare(atual, {CHAVE: resultado(0, 0)}, 0.25), [])
+
+
+class TesteBaseline(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.arquivo = Path(self.pasta.name) / "baseline.json"
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def executar(self, resultados, *args):
+        """Roda o main() com os resultados informados, sem medir nada"""
+        with patch.object(bench, "run_all", return_value=resultados), redirect_stdout(
+            io.StringIO()
+        ):
+            return bench.main(["--baseline", str(self.arquivo), *args])
+
+    def test_update_e_comparacao(self):
+        """Testa a gravação da baseline e a comparação com ela"""
+        self.assertEqual(self.executar({CHAVE: resultado(1000, 10)}, "--update"), 0)
+        gravado = json.loads(self.arquivo.read_text(encoding="utf-8"))
+        self.assertEqual(gravado["tolerance"], bench.DEFAULT_TOLERANCE)
+        self.assertEqual(gravado["results"][CHAVE]["median_ns"], 1000)
+
+        self.assertEqual(self.executar({CHAVE: resultado(1100, 10)}), 0)
+        self.assertEqual(self.executar({CHAVE: resultado(2000, 10)}), 1)
+        # A tolerância pode ser ampliada na linha de comando
+        self.assertEqual(
+            self.executar({CHAVE: resultado(2000, 10)}, "--tolerance", "1.5"), 0
+        )
+
+    def test_update_mantem_casos_nao_executados(self):
+        """Testa que um --update filtrado preserva os outros casos"""
+        self.executar({CHAVE: resultado(1000, 10)}, "--update")
+        self.executar({"outro::bench_y[n=1]": resultado(5, 5)}, "--update", "-k", "y")
+        gravado = json.loads(self.arquivo.read_text(encoding="utf-8"))
+        self.assertEqual(set(gravado["results"]), {CHAVE, "outro::bench_y[n=1]"})
+
+    def test_baseline_commitada_cobre_os_benchmarks(self):
+        """Testa que a baseline do repositório tem todos os casos atuais"""
+        gravado = json.loads(bench.DEFAULT_BASELINE.read_text(encoding="utf-8"))
+        for path in bench.discover():
+            for name, _, sizes in bench.collect(path):
+                for n in sizes:
+                    chave = f"{path.parent.name}/{path.name}::{name}[n={n}]"
+                    self.assertIn(chave, gravado["results"])
+
+
+if __name__ == "__main__":
+    unittest.main()